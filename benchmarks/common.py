@@ -0,0 +1,173 @@
+"""
+Funciones compartidas por los benchmarks: base de datos de prueba con datos,
+peticiones a las aplicaciones WSGI y ASGI reales y reporte de latencias.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import time
+import uuid
+from datetime import date, timedelta
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ticket_manager.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from events.models import Event, Ticket  # noqa: E402
+
+
+@contextlib.contextmanager
+def test_database():
+    """
+    Crea una base de datos de prueba y la elimina al terminar.
+    La cache de respuestas se desactiva para que todas las peticiones lleguen a la base de datos.
+    """
+    settings.ALLOWED_HOSTS = ["localhost"]
+    settings.GRAPHQL_RESPONSE_CACHE_TTL = 0
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        if connection.pool is not None:
+            connection.close_pool()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+GENRES = ["Rock", "Jazz", "Pop", "Salsa", "Teatro", "Ópera", "Comedia", "Cine"]
+
+
+def seed(
+    total_events: int, tickets_per_event: int, start_offset: int = 1
+) -> list[Event]:
+    """
+    Crea eventos con sus boletos vendidos, que comienzan a partir de 'start_offset' días
+    desde hoy (0 para eventos en curso)
+    """
+    today = date.today()
+    events = Event.objects.bulk_create(
+        [
+            Event(
+                name=f"{GENRES[i % len(GENRES)]} Fest {i}",
+                start=today + timedelta(days=start_offset + i % 300),
+                end=today + timedelta(days=start_offset + 301),
+                total_tickets=300,
+                total_sold_tickets=tickets_per_event,
+            )
+            for i in range(total_events)
+        ]
+    )
+    Ticket.objects.bulk_create(
+        [
+            Ticket(id=uuid.uuid4(), event=event)
+            for event in events
+            for _ in range(tickets_per_event)
+        ]
+    )
+    return events
+
+
+def graphql_body(query: str, variables: dict | None = None) -> bytes:
+    return json.dumps({"query": query, "variables": variables}).encode()
+
+
+def wsgi_request(application, path: str, body: bytes) -> tuple[float, bytes]:
+    """
+    Envía una petición POST a la aplicación WSGI y regresa los segundos que tardó
+    y el contenido de la respuesta
+    """
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "PATH_INFO": path,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.url_scheme": "http",
+    }
+    statuses = []
+    started = time.perf_counter()
+    response = application(environ, lambda status, headers: statuses.append(status))
+    content = b"".join(response)
+    response.close()
+    elapsed = time.perf_counter() - started
+    assert statuses[0].startswith("200"), statuses[0]
+    return elapsed, content
+
+
+async def asgi_request(application, path: str, body: bytes) -> float:
+    """
+    Envía una petición POST a la aplicación ASGI y regresa los segundos que tardó
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "server": ("localhost", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    statuses = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        # La petición ya se leyó completa; se espera hasta que termine la respuesta
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    started = time.perf_counter()
+    await application(scope, receive, send)
+    elapsed = time.perf_counter() - started
+    assert statuses[0] == 200, statuses[0]
+    return elapsed
+
+
+def summarize(name: str, total: float, latencies: list[float]) -> dict:
+    """
+    Calcula el rendimiento y los percentiles de latencia de una ejecución
+    """
+    quantiles = statistics.quantiles(sorted(latencies), n=100)
+    return {
+        "mode": name,
+        "requests": len(latencies),
+        "throughput": round(len(latencies) / total, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+
+def print_summary(result: dict) -> None:
+    print(
+        f"{result['mode']:20} {result['throughput']:>8} req/s  "
+        f"p50 {result['p50_ms']:>8} ms  p95 {result['p95_ms']:>8} ms  "
+        f"p99 {result['p99_ms']:>8} ms"
+    )
@@ -0,0 +1,93 @@
+"""
+Compara la latencia de las peticiones con el pool de conexiones activado y desactivado.
+
+Cada modo se ejecuta en su propio proceso, porque el pool se configura al iniciar Django
+con la variable de entorno DB_POOL. Sin pool, cada petición abre y cierra su conexión
+(DB_CONN_MAX_AGE=0), que es el costo que el pool evita.
+
+Uso:
+    python -m benchmarks.db_pool --requests 500 --concurrency 8
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+QUERY = "query ($id: UUID!) { event(id: $id) { name totalSoldTickets } }"
+
+
+def run(args) -> dict:
+    # Django se configura aquí para que tome la variable DB_POOL de este proceso
+    from benchmarks.common import (
+        graphql_body,
+        seed,
+        summarize,
+        test_database,
+        wsgi_request,
+    )
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+
+    from ticket_manager.db import pool_stats
+
+    with test_database():
+        events = seed(args.events, 1)
+        connection.close()
+
+        application = get_wsgi_application()
+        bodies = [
+            graphql_body(QUERY, {"id": str(events[i % len(events)].id)})
+            for i in range(args.requests)
+        ]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            latencies = list(
+                executor.map(
+                    lambda b: wsgi_request(application, "/graphql/", b)[0], bodies
+                )
+            )
+        result = summarize(args.mode, time.perf_counter() - started, latencies)
+        result["pool"] = pool_stats().get("default")
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--mode", choices=["pool", "no-pool"])
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run(args)))
+        return
+
+    from benchmarks.common import print_summary
+
+    for mode in ("no-pool", "pool"):
+        env = {
+            **os.environ,
+            "DB_POOL": "1" if mode == "pool" else "0",
+            "DB_CONN_MAX_AGE": "0",
+            "DB_POOL_MAX_SIZE": str(args.concurrency),
+        }
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.db_pool", *sys.argv[1:], "--mode", mode],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print_summary(result)
+        if result["pool"]:
+            print(f"         pool: {result['pool']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Benchmark de las operaciones de la API de GraphQL.
+
+Crea una base de datos de prueba con eventos próximos y en curso y sus boletos, y envía
+cada operación a la aplicación WSGI con varias peticiones en curso a la vez. Por operación
+reporta latencia p50/p95/p99, rendimiento, consultas SQL por petición y errores, y escribe
+el resultado como JSON para compararlo entre versiones.
+
+Uso:
+    python -m benchmarks.graphql_api --requests 200 --concurrency 8 --output resultado.json
+    python -m benchmarks.graphql_api --compare anterior.json
+"""
+
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import django
+from benchmarks.common import (
+    graphql_body,
+    print_summary,
+    seed,
+    summarize,
+    test_database,
+    wsgi_request,
+)
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+
+from events.models import Ticket
+
+# Cada operación recibe los datos creados y regresa la consulta de la siguiente petición
+OPERATIONS = {
+    "events": lambda data: ("{ events(first: 20) { id name start end } }", None),
+    "events_with_tickets": lambda data: (
+        "{ events(first: 20) { id name tickets { id redeemed } } }",
+        None,
+    ),
+    "events_search": lambda data: (
+        '{ events(search: "rock", first: 20) { id name } }',
+        None,
+    ),
+    "events_full_text": lambda data: (
+        '{ events(search: "rock fest", searchMode: FULL_TEXT, first: 20) { id name } }',
+        None,
+    ),
+    "events_connection": lambda data: (
+        "{ eventsConnection(first: 20) { totalCount edges { cursor node { id } } } }",
+        None,
+    ),
+    "event": lambda data: (
+        "query ($id: UUID!) { event(id: $id) { id name totalSoldTickets } }",
+        {"id": next(data["events"])},
+    ),
+    "sell_ticket": lambda data: (
+        "mutation ($id: UUID!) { sellTicket(eventId: $id) { ok ticket { id } } }",
+        {"id": next(data["events"])},
+    ),
+    "redeem_ticket": lambda data: (
+        "mutation ($id: UUID!) { redeemTicket(ticketId: $id) { ok } }",
+        {"id": next(data["redeemable"])},
+    ),
+    "refund_ticket": lambda data: (
+        "mutation ($id: UUID!) { refundTicket(ticketId: $id) { ok } }",
+        {"id": next(data["refundable"])},
+    ),
+}
+
+
+def seed_data(args) -> dict:
+    """
+    Crea los eventos y boletos, y los iteradores de ids que usan las operaciones.
+    Los boletos canjeados o reembolsados no se repiten entre peticiones.
+    """
+    upcoming = seed(args.events, args.tickets)
+    # Eventos en curso con suficientes boletos para todos los canjes
+    ongoing = seed(args.requests // 300 + 1, 300, start_offset=0)
+
+    def ticket_ids(events):
+        tickets = Ticket.objects.filter(event__in=events).order_by("id")
+        return iter(str(ticket_id) for ticket_id in tickets.values_list("id", flat=True))
+
+    lock = threading.Lock()
+
+    def locked(iterator):
+        # Los iteradores se comparten entre los hilos de las peticiones
+        while True:
+            with lock:
+                value = next(iterator, None)
+            if value is None:
+                return
+            yield value
+
+    return {
+        "events": locked(itertools.cycle([str(event.id) for event in upcoming])),
+        "redeemable": locked(ticket_ids(ongoing)),
+        "refundable": locked(ticket_ids(upcoming)),
+    }
+
+
+def run_operation(application, name: str, data: dict, args) -> dict:
+    queries = threading.local()
+    counts = []
+    errors = []
+
+    def count(execute, sql, params, many, context):
+        queries.count += 1
+        return execute(sql, params, many, context)
+
+    def request(_):
+        query, variables = OPERATIONS[name](data)
+        queries.count = 0
+        with connection.execute_wrapper(count):
+            elapsed, content = wsgi_request(
+                application, "/graphql/", graphql_body(query, variables)
+            )
+        counts.append(queries.count)
+        if "errors" in json.loads(content):
+            errors.append(content)
+        return elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = list(executor.map(request, range(args.requests)))
+    result = summarize(name, time.perf_counter() - started, latencies)
+    result["queries_per_request"] = round(sum(counts) / len(counts), 2)
+    result["errors"] = len(errors)
+    return result
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, previous: dict) -> None:
+    previous_results = {result["mode"]: result for result in previous["results"]}
+    print("\nCambio contra", previous.get("revision") or "la ejecución anterior")
+    for result in current["results"]:
+        before = previous_results.get(result["mode"])
+        if not before:
+            continue
+        changes = []
+        for key in ("p50_ms", "p95_ms", "throughput", "queries_per_request"):
+            if before[key]:
+                change = (result[key] - before[key]) / before[key] * 100
+                changes.append(f"{key} {change:+.1f}%")
+        print(f"{result['mode']:20} " + "  ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=200, help="Por operación")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--tickets", type=int, default=20, help="Por evento")
+    parser.add_argument(
+        "--operations",
+        nargs="+",
+        choices=OPERATIONS,
+        default=list(OPERATIONS),
+    )
+    parser.add_argument("--output", help="Archivo donde se guarda el JSON")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior")
+    args = parser.parse_args()
+
+    with test_database():
+        data = seed_data(args)
+        connection.close()
+        application = get_wsgi_application()
+
+        results = []
+        for name in args.operations:
+            result = run_operation(application, name, data, args)
+            print_summary(result)
+            results.append(result)
+
+    report = {
+        "revision": git_revision(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "parameters": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "events": args.events,
+            "tickets": args.tickets,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(report, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Compara la vista síncrona (WSGI, /graphql/) con la asíncrona (ASGI, /graphql/async/).
+
+Crea una base de datos de prueba con eventos y boletos y envía la misma consulta a cada
+aplicación con varias peticiones en curso a la vez: en WSGI con un hilo por petición,
+como un servidor con '--concurrency' hilos, y en ASGI desde un solo ciclo de eventos.
+Con '--latency' cada consulta SQL espera esos milisegundos más, para simular una base de datos
+remota.
+
+Uso:
+    python -m benchmarks.graphql_async --requests 400 --concurrency 50 --latency 5
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import (
+    asgi_request,
+    graphql_body,
+    print_summary,
+    seed,
+    summarize,
+    test_database,
+    wsgi_request,
+)
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.db.backends.signals import connection_created
+
+QUERY = """
+query ($id: UUID!) {
+    event(id: $id) { name totalSoldTickets }
+    ticketsByEvent(eventId: $id) { id redeemed }
+    events(first: 10) { id name tickets { id } }
+}
+"""
+
+
+def add_latency(latency: float):
+    def delay(execute, sql, params, many, context):
+        time.sleep(latency)
+        return execute(sql, params, many, context)
+
+    def on_connection_created(sender, connection, **kwargs):
+        connection.execute_wrappers.append(delay)
+
+    connection_created.connect(on_connection_created, weak=False)
+
+
+def run_wsgi(bodies: list[bytes], concurrency: int) -> tuple[float, list[float]]:
+    application = get_wsgi_application()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(
+            executor.map(
+                lambda b: wsgi_request(application, "/graphql/", b)[0], bodies
+            )
+        )
+    return time.perf_counter() - started, latencies
+
+
+def run_asgi(bodies: list[bytes], concurrency: int) -> tuple[float, list[float]]:
+    application = get_asgi_application()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(body):
+        async with semaphore:
+            return await asgi_request(application, "/graphql/async/", body)
+
+    async def main():
+        return await asyncio.gather(*(limited(body) for body in bodies))
+
+    started = time.perf_counter()
+    latencies = asyncio.run(main())
+    return time.perf_counter() - started, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--tickets", type=int, default=20)
+    parser.add_argument(
+        "--latency", type=float, default=0, help="Milisegundos extra por consulta SQL"
+    )
+    args = parser.parse_args()
+
+    with test_database():
+        events = seed(args.events, args.tickets)
+        if args.latency:
+            add_latency(args.latency / 1000)
+        connection.close()
+
+        bodies = [
+            graphql_body(QUERY, {"id": str(events[i % len(events)].id)})
+            for i in range(args.requests)
+        ]
+        print_summary(summarize("wsgi", *run_wsgi(bodies, args.concurrency)))
+        print_summary(summarize("asgi", *run_asgi(bodies, args.concurrency)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compara el rendimiento de las ventas concurrentes de un solo evento con el inventario
+repartido en distinto número de filas.
+
+Con 0 filas todas las ventas apartan sus boletos con la fila del evento y esperan a que
+termine el commit de la venta anterior. Con más filas cada venta descuenta de una fila
+distinta. La latencia del commit se simula con '--commit-latency-ms'.
+
+Uso:
+    python -m benchmarks.inventory_slots --sales 2000 --concurrency 16 --slots 0 1 4 16
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+from benchmarks.common import print_summary, summarize, test_database
+from django.db import connection, transaction
+
+from events import inventory, services
+from events.models import Event, Ticket
+
+
+def sell(event_id, count: int, commit_latency: float) -> list[float]:
+    """
+    Vende 'count' boletos uno por uno y regresa los segundos que tardó cada venta.
+    Antes del commit espera 'commit_latency' segundos con la fila apartada bloqueada,
+    como tarda el commit con réplicas síncronas o una base de datos remota.
+    """
+    latencies = []
+    try:
+        for _ in range(count):
+            started = time.perf_counter()
+            with transaction.atomic():
+                services.sell_ticket(services.get_event_by_id(event_id))
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_sleep(%s)", [commit_latency])
+            latencies.append(time.perf_counter() - started)
+    finally:
+        connection.close()
+    return latencies
+
+
+def run(args, slots: int, sales: int) -> dict:
+    # Se crea con el ORM para no limitarse al máximo de boletos de las validaciones
+    event = Event.objects.create(
+        name=f"Mega Fest {slots}",
+        start=date.today() + timedelta(days=1),
+        end=date.today() + timedelta(days=2),
+        total_tickets=sales,
+    )
+    services.shard_inventory(event, slots)
+    # Cada proceso abre su propia conexión a la base de datos de prueba
+    connection.close()
+
+    workers = args.concurrency
+    shares = [sales // workers + (i < sales % workers) for i in range(workers)]
+    # Se usan procesos y no hilos para que el GIL no limite las ventas concurrentes
+    context = multiprocessing.get_context("fork")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        results = list(
+            executor.map(
+                sell,
+                [event.id] * workers,
+                shares,
+                [args.commit_latency_ms / 1000] * workers,
+            )
+        )
+    total = time.perf_counter() - started
+    result = summarize(f"{slots} filas", total, list(itertools.chain(*results)))
+
+    # Los boletos vendidos deben coincidir exactamente con el contador del evento
+    inventory.fold(event)
+    assert event.total_sold_tickets == sales, event.total_sold_tickets
+    assert Ticket.objects.filter(event=event).count() == sales
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sales", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--slots", type=int, nargs="+", default=[0, 1, 4, 16])
+    parser.add_argument("--commit-latency-ms", type=float, default=20)
+    args = parser.parse_args()
+
+    # 'total_tickets' es un entero pequeño en la base de datos
+    sales = min(args.sales, 32767)
+    with test_database():
+        for slots in args.slots:
+            print_summary(run(args, slots, sales))
+
+
+if __name__ == "__main__":
+    main()
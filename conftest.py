@@ -0,0 +1,12 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    La cache no se revierte con la base de datos, por eso se limpia en cada prueba
+    """
+    cache.clear()
+    yield
+    cache.clear()
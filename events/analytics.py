@@ -0,0 +1,118 @@
+"""
+Analítica de ventas y canjes por evento.
+Los servicios actualizan las tablas de resumen en la misma transacción en que venden,
+canjean o reembolsan boletos, así que las consultas de analítica solo leen unas cuantas
+filas por evento y nunca recorren la tabla de boletos.
+"""
+
+from collections import Counter
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from . import inventory
+from .models import Event, EventDailySales, EventHourlyRedemptions, Ticket
+
+
+def increment(model, keys: dict, **amounts: int) -> None:
+    """
+    Suma 'amounts' a los contadores de la fila de 'keys', creándola si no existe,
+    con un solo INSERT ... ON CONFLICT para que las ventas concurrentes no se pierdan
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = [connection.ops.quote_name(column) for column in (*keys, *amounts)]
+    conflict = ", ".join(columns[: len(keys)])
+    updates = ", ".join(
+        f"{column} = {table}.{column} + EXCLUDED.{column}"
+        for column in columns[len(keys) :]
+    )
+    placeholders = ", ".join(["%s"] * len(columns))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({conflict}) DO UPDATE SET {updates}",
+            [*keys.values(), *amounts.values()],
+        )
+
+
+def current_hour() -> datetime:
+    return timezone.now().replace(minute=0, second=0, microsecond=0)
+
+
+def record_sales(event_id, quantity: int) -> None:
+    keys = {"event_id": event_id, "day": timezone.localdate()}
+    increment(EventDailySales, keys, sold=quantity, refunded=0)
+
+
+def record_refunds(event_id, quantity: int) -> None:
+    keys = {"event_id": event_id, "day": timezone.localdate()}
+    increment(EventDailySales, keys, sold=0, refunded=quantity)
+
+
+def record_redemptions(per_event: Counter) -> None:
+    hour = current_hour()
+    # Mismo orden que las actualizaciones de los eventos para no bloquearse entre lotes
+    for event_id in sorted(per_event):
+        keys = {"event_id": event_id, "hour": hour}
+        increment(EventHourlyRedemptions, keys, redeemed=per_event[event_id])
+
+
+def get_event_analytics(event: Event) -> dict:
+    """
+    Ventas por día, canjes por hora y porcentaje de boletos vendidos de un evento
+    """
+    sold = event.total_sold_tickets
+    if event.inventory_slots:
+        sold, _ = inventory.current_counters(event)
+    sales = EventDailySales.objects.filter(event=event).order_by("day")
+    redemptions = EventHourlyRedemptions.objects.filter(event=event).order_by("hour")
+    return {
+        "event": event,
+        "sell_through_rate": sold / event.total_tickets,
+        "sales_per_day": list(sales),
+        "redemptions_per_hour": list(redemptions),
+    }
+
+
+aget_event_analytics = sync_to_async(get_event_analytics)
+
+
+def backfill_event(event_id) -> None:
+    """
+    Vuelve a calcular los resúmenes de un evento a partir de sus boletos.
+    Los boletos reembolsados ya no existen, así que las ventas quedan como los boletos
+    vigentes de cada día y los reembolsos anteriores se pierden.
+    """
+    with transaction.atomic():
+        # Se bloquea el evento para que no se vendan ni canjeen boletos mientras se cuentan
+        Event.objects.select_for_update().filter(pk=event_id).first()
+        EventDailySales.objects.filter(event_id=event_id).delete()
+        EventHourlyRedemptions.objects.filter(event_id=event_id).delete()
+
+        tickets = Ticket.objects.filter(event_id=event_id).order_by()
+        sales = (
+            tickets.annotate(day=TruncDate("created_at"))
+            .values("day")
+            .annotate(sold=Count("pk"))
+        )
+        EventDailySales.objects.bulk_create(
+            EventDailySales(event_id=event_id, day=row["day"], sold=row["sold"])
+            for row in sales
+        )
+        # Los boletos solo se modifican al canjearlos, así que 'updated_at' es la hora del canje
+        redemptions = (
+            tickets.filter(redeemed=True)
+            .annotate(hour=TruncHour("updated_at"))
+            .values("hour")
+            .annotate(redeemed=Count("pk"))
+        )
+        EventHourlyRedemptions.objects.bulk_create(
+            EventHourlyRedemptions(
+                event_id=event_id, hour=row["hour"], redeemed=row["redeemed"]
+            )
+            for row in redemptions
+        )
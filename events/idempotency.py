@@ -0,0 +1,98 @@
+"""
+Llaves de idempotencia para las mutaciones de boletos.
+Los clientes móviles reintentan las ventas cuando se agota el tiempo de espera, aunque la venta
+ya se haya guardado. Con una llave, el primer resultado se guarda junto con la venta y los
+reintentos lo reciben de 'IdempotencyKey' sin volver a ejecutar los servicios.
+"""
+
+import hashlib
+import json
+from collections.abc import Callable
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import serializers
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from graphql import GraphQLError
+
+from .models import Event, IdempotencyKey, Ticket
+
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+
+
+def request_hash(operation: str, arguments: dict) -> str:
+    """
+    Huella de la operación y sus argumentos, para rechazar una llave que se reutiliza
+    con otra petición
+    """
+    request = json.dumps([operation, arguments], sort_keys=True, default=str)
+    return hashlib.sha256(request.encode()).hexdigest()
+
+
+def run(
+    key: str | None, operation: str, arguments: dict, func: Callable[[], list[Ticket]]
+) -> list[Ticket]:
+    """
+    Ejecuta 'func', que regresa los boletos del resultado de la mutación, una sola vez por llave.
+    Si la llave ya se usó regresa una copia de los boletos que se guardaron la primera vez.
+    Si 'func' falla no se guarda nada y el reintento la vuelve a ejecutar.
+    """
+    if key is None:
+        return func()
+
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise GraphQLError(
+            f"La llave de idempotencia debe tener entre 1 y {MAX_KEY_LENGTH} caracteres"
+        )
+
+    fingerprint = request_hash(operation, arguments)
+    now = timezone.now()
+    with transaction.atomic():
+        IdempotencyKey.objects.filter(key=key, expires_at__lte=now).delete()
+        try:
+            # Un reintento concurrente con la misma llave espera aquí a que termine el primero
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    key=key,
+                    request_hash=fingerprint,
+                    expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+                )
+        except IntegrityError:
+            return replay(key, fingerprint)
+
+        instances = func()
+        record.response = serializers.serialize("json", instances)
+        record.save(update_fields=["response"])
+    return instances
+
+
+def replay(key: str, fingerprint: str) -> list[Ticket]:
+    """
+    Regresa los boletos guardados con la llave, que pueden ya no existir si se reembolsaron
+    """
+    record = IdempotencyKey.objects.get(key=key)
+    if record.request_hash != fingerprint:
+        raise GraphQLError("La llave de idempotencia ya se usó con otra operación")
+    tickets = [obj.object for obj in serializers.deserialize("json", record.response)]
+    # Se cargan los eventos de una vez, porque la vista asíncrona no puede cargarlos
+    # al resolver 'ticket.event'
+    events = Event.objects.in_bulk({ticket.event_id for ticket in tickets})
+    for ticket in tickets:
+        if ticket.event_id in events:
+            ticket.event = events[ticket.event_id]
+    return tickets
+
+
+def delete_expired_keys(batch_size: int = 1000) -> int:
+    """
+    Elimina por bloques las llaves vencidas y regresa cuántas se eliminaron
+    """
+    expired = IdempotencyKey.objects.filter(expires_at__lte=timezone.now())
+    deleted = 0
+    while True:
+        keys = list(expired.values_list("pk", flat=True)[:batch_size])
+        count, _ = IdempotencyKey.objects.filter(pk__in=keys).delete()
+        deleted += count
+        if len(keys) < batch_size:
+            return deleted
@@ -0,0 +1,219 @@
+"""
+Inventario repartido para eventos con muchas ventas concurrentes.
+Normalmente cada venta aparta boletos con una actualización condicional de la fila del evento,
+así que todas las ventas de un evento esperan a esa fila. Con 'Event.inventory_slots' los
+boletos disponibles se reparten en varias filas de 'InventorySlot' y cada venta o reserva
+descuenta de una fila al azar que no esté bloqueada. Cuando ninguna fila tiene boletos
+suficientes, se bloquean todas y se vuelven a repartir, así que nunca se venden más boletos
+que el total.
+Las ventas se acumulan en las filas y se suman a los contadores del evento con 'fold',
+que se ejecuta periódicamente y antes de las escrituras que necesitan los contadores exactos.
+Las lecturas suman las ventas de las filas sin bloquearlas con 'current_counters'.
+"""
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from . import analytics
+from .models import Event, InventorySlot, TicketHold
+
+
+def claim(event_id, quantity: int, sold: bool) -> bool:
+    """
+    Descuenta 'quantity' boletos de una fila al azar y, con 'sold', los suma a sus vendidos.
+    Regresa False si el evento no tiene boletos suficientes. Debe ejecutarse en una transacción.
+    """
+    slots = InventorySlot.objects.filter(
+        event_id=event_id, remaining__gte=quantity
+    ).order_by("?")
+    # Primero una fila que ninguna otra venta tenga bloqueada
+    slot_ids = slots.values_list("pk", flat=True)
+    slot_id = slot_ids.select_for_update(skip_locked=True).first()
+    if slot_id is None:
+        # Si todas están bloqueadas se espera a una sola, porque esperar a otra mientras
+        # se tiene una bloqueada puede bloquearse con otra venta
+        with transaction.atomic():
+            candidate = slot_ids.first()
+            slot_id = slot_ids.select_for_update().filter(pk=candidate).first()
+            if slot_id is None:
+                # La fila se quedó sin boletos, se libera antes de bloquear todas
+                transaction.set_rollback(True)
+    if slot_id is None:
+        return rebalance(event_id, quantity, sold)
+
+    InventorySlot.objects.filter(pk=slot_id).update(
+        remaining=F("remaining") - quantity,
+        sold=F("sold") + (quantity if sold else 0),
+    )
+    return True
+
+
+def rebalance(event_id, quantity: int = 0, sold: bool = False) -> bool:
+    """
+    Bloquea todas las filas del evento, descuenta 'quantity' boletos del total disponible
+    y reparte el resto en partes iguales. Regresa False si no hay boletos suficientes.
+    """
+    # Sin bloquear nada se descartan las ventas de un evento agotado
+    available = InventorySlot.objects.filter(event_id=event_id).aggregate(
+        total=Sum("remaining")
+    )["total"]
+    if available is None or available < quantity:
+        return False
+
+    slots = list(
+        InventorySlot.objects.select_for_update()
+        .filter(event_id=event_id)
+        .order_by("slot")
+    )
+    available = sum(slot.remaining for slot in slots)
+    if not slots or available < quantity:
+        return False
+
+    share, extra = divmod(available - quantity, len(slots))
+    for index, slot in enumerate(slots):
+        slot.remaining = share + (1 if index < extra else 0)
+    if sold:
+        slots[0].sold += quantity
+    InventorySlot.objects.bulk_update(slots, ["remaining", "sold"])
+    return True
+
+
+def _add_to_slot(event_id, **amounts: int) -> bool:
+    slot_id = (
+        InventorySlot.objects.filter(event_id=event_id)
+        .order_by("?")
+        .values_list("pk", flat=True)
+        .first()
+    )
+    # Si el inventario dejó de repartirse mientras tanto no se actualiza ninguna fila
+    return bool(
+        InventorySlot.objects.filter(pk=slot_id).update(
+            **{field: F(field) + amount for field, amount in amounts.items()}
+        )
+    )
+
+
+def release(event_id, quantity: int) -> bool:
+    """
+    Devuelve boletos reservados o reembolsados a los disponibles.
+    Regresa False si el evento ya no tiene el inventario repartido.
+    """
+    return _add_to_slot(event_id, remaining=quantity)
+
+
+def confirm(event_id, quantity: int) -> bool:
+    """
+    Cuenta como vendidos los boletos de una reserva confirmada, que ya se descontaron al reservar.
+    Regresa False si el evento ya no tiene el inventario repartido.
+    """
+    return _add_to_slot(event_id, sold=quantity)
+
+
+def held_tickets(event: Event) -> int:
+    """
+    Boletos apartados en las reservas pendientes del evento
+    """
+    holds = TicketHold.objects.filter(event=event)
+    return holds.aggregate(total=Sum("quantity"))["total"] or 0
+
+
+def pending_sales():
+    """
+    Subconsulta con los boletos vendidos en las filas del evento de la consulta externa
+    que aún no se suman a 'total_sold_tickets'
+    """
+    sold = (
+        InventorySlot.objects.filter(event=OuterRef("pk"))
+        .order_by()
+        .values("event")
+        .annotate(total=Sum("sold"))
+        .values("total")
+    )
+    return Coalesce(Subquery(sold), 0)
+
+
+def has_available_tickets() -> Exists:
+    """
+    Indica si alguna fila del evento de la consulta externa tiene boletos disponibles
+    """
+    return Exists(InventorySlot.objects.filter(event=OuterRef("pk"), remaining__gt=0))
+
+
+def current_counters(event: Event) -> tuple[int, int]:
+    """
+    'total_sold_tickets' y 'tickets_version' del evento contando las ventas de sus filas
+    que aún no se suman, leídos con una sola consulta y sin bloquear las filas.
+    Al sumarse, 'fold' aumenta la versión en los boletos sumados, así que la versión
+    de aquí no cambia con 'fold' y sí con cada venta.
+    """
+    sold, version, pending = (
+        Event.objects.filter(pk=event.pk)
+        .annotate(pending=pending_sales())
+        .values_list("total_sold_tickets", "tickets_version", "pending")
+        .get()
+    )
+    return sold + pending, version + pending
+
+
+acurrent_counters = sync_to_async(current_counters)
+
+
+def fold(event: Event) -> int:
+    """
+    Suma a 'total_sold_tickets' los boletos vendidos que se acumularon en las filas del evento
+    y actualiza los contadores de 'event'. Regresa el número de boletos sumados.
+    """
+    with transaction.atomic():
+        slots = InventorySlot.objects.filter(event=event)
+        locked = slots.select_for_update().order_by("slot")
+        sold = sum(locked.values_list("sold", flat=True))
+        if sold:
+            slots.update(sold=0)
+            analytics.record_sales(event.pk, sold)
+            Event.objects.filter(pk=event.pk).update(
+                total_sold_tickets=F("total_sold_tickets") + sold,
+                tickets_version=F("tickets_version") + sold,
+            )
+
+    event.total_sold_tickets, event.total_held_tickets, event.tickets_version = (
+        Event.objects.values_list(
+            "total_sold_tickets", "total_held_tickets", "tickets_version"
+        ).get(pk=event.pk)
+    )
+    return sold
+
+
+def configure(event: Event, slots: int) -> None:
+    """
+    Reparte los boletos disponibles del evento en 'slots' filas, o con 0 regresa a controlarlos
+    con los contadores del evento. Con el inventario repartido los boletos reservados ya están
+    descontados de las filas, así que no se cuentan en 'total_held_tickets'.
+    """
+    with transaction.atomic():
+        fold(event)
+        total_tickets, total_sold = (
+            Event.objects.select_for_update()
+            .values_list("total_tickets", "total_sold_tickets")
+            .get(pk=event.pk)
+        )
+        held = held_tickets(event)
+        InventorySlot.objects.filter(event=event).delete()
+
+        if slots:
+            share, extra = divmod(max(total_tickets - total_sold - held, 0), slots)
+            InventorySlot.objects.bulk_create(
+                InventorySlot(
+                    event=event,
+                    slot=index,
+                    remaining=share + (1 if index < extra else 0),
+                )
+                for index in range(slots)
+            )
+        event.inventory_slots = slots
+        event.total_held_tickets = 0 if slots else held
+        Event.objects.filter(pk=event.pk).update(
+            inventory_slots=event.inventory_slots,
+            total_held_tickets=event.total_held_tickets,
+        )
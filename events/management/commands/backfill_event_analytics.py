@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from events import analytics
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcula los resúmenes de ventas por día y canjes por hora de los eventos "
+        "a partir de sus boletos, para los datos anteriores a los resúmenes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "event_ids",
+            nargs="*",
+            help="Eventos que se recalculan; si no se indican, se recalculan todos",
+        )
+
+    def handle(self, *args, **options):
+        events = Event.objects.order_by("pk")
+        if options["event_ids"]:
+            events = events.filter(pk__in=options["event_ids"])
+
+        total = 0
+        # Cada evento se recalcula en su propia transacción para no bloquear las ventas de todos
+        for event_id in list(events.values_list("pk", flat=True)):
+            analytics.backfill_event(event_id)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Eventos recalculados: {total}"))
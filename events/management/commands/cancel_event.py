@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from graphql import GraphQLError
+
+from events import services
+from ticket_manager.response_cache import invalidate_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Cancela un evento y reembolsa sus boletos no canjeados por bloques. "
+        "Si se interrumpe, se puede volver a ejecutar para continuar"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("event_id")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Boletos que se reembolsan por transacción",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            event = services.get_event_by_id(options["event_id"])
+            progress = services.cancel_event(
+                event,
+                chunk_size=options["chunk_size"],
+                on_progress=lambda refunded: self.stdout.write(
+                    f"Boletos reembolsados: {refunded}"
+                ),
+            )
+        except GraphQLError as e:
+            raise CommandError(e.message)
+
+        invalidate_events(event.id)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Evento cancelado, boletos reembolsados: {progress['refunded']}"
+            )
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from events import idempotency
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina por bloques las llaves de idempotencia vencidas. "
+        "Se puede ejecutar periódicamente, por ejemplo con cron"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Llaves que se eliminan por consulta",
+        )
+
+    def handle(self, *args, **options):
+        deleted = idempotency.delete_expired_keys(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Llaves eliminadas: {deleted}"))
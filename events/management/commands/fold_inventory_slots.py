@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from events import inventory
+from events.models import Event
+from ticket_manager.response_cache import invalidate_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Suma a los contadores de los eventos con inventario repartido los boletos "
+        "vendidos en sus filas. Se puede ejecutar periódicamente, por ejemplo con cron"
+    )
+
+    def handle(self, *args, **options):
+        folded = []
+        for event in Event.objects.filter(inventory_slots__gt=0):
+            if inventory.fold(event):
+                folded.append(event.id)
+
+        if folded:
+            invalidate_events(*folded)
+        self.stdout.write(self.style.SUCCESS(f"Eventos actualizados: {len(folded)}"))
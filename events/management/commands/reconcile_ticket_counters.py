@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from events import inventory
+from events.models import Event, Ticket
+
+
+def count_tickets(**filters):
+    """
+    Subconsulta que cuenta los boletos del evento de la consulta externa
+    """
+    tickets = (
+        Ticket.objects.filter(event=OuterRef("pk"), **filters)
+        .order_by()
+        .values("event")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    return Coalesce(Subquery(tickets), 0)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula los contadores de boletos vendidos y canjeados de los eventos "
+        "y corrige los que no coinciden con la tabla de boletos"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo muestra los eventos con contadores incorrectos",
+        )
+
+    def handle(self, *args, **options):
+        if not options["dry_run"]:
+            # Las ventas del inventario repartido aún no se cuentan en los eventos
+            for event in Event.objects.filter(inventory_slots__gt=0):
+                inventory.fold(event)
+
+        drifted = (
+            Event.objects.annotate(
+                sold=count_tickets(),
+                redeemed=count_tickets(redeemed=True),
+            )
+            .exclude(
+                total_sold_tickets=F("sold"),
+                total_redeemed_tickets=F("redeemed"),
+            )
+            .values_list("pk", flat=True)
+        )
+
+        fixed = 0
+        for event_id in list(drifted):
+            if options["dry_run"]:
+                self.stdout.write(f"Contadores incorrectos en el evento {event_id}")
+                fixed += 1
+                continue
+
+            with transaction.atomic():
+                event = Event.objects.filter(pk=event_id).first()
+                if event and event.inventory_slots:
+                    # Las filas del inventario se bloquean antes que el evento
+                    inventory.fold(event)
+                # Se bloquea el evento para que no cambien los boletos mientras se cuentan
+                Event.objects.select_for_update().filter(pk=event_id).first()
+                fixed += Event.objects.filter(pk=event_id).update(
+                    total_sold_tickets=count_tickets(),
+                    total_redeemed_tickets=count_tickets(redeemed=True),
+                )
+
+        self.stdout.write(self.style.SUCCESS(f"Eventos corregidos: {fixed}"))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from events import services
+from ticket_manager.response_cache import invalidate_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Libera por bloques las reservas de boletos vencidas y devuelve sus boletos "
+        "a los disponibles. Se puede ejecutar periódicamente, por ejemplo con cron"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Reservas que se liberan por transacción",
+        )
+
+    def handle(self, *args, **options):
+        released = services.release_expired_holds(batch_size=options["batch_size"])
+        if released:
+            # Los eventos con boletos liberados pueden volver a aparecer como disponibles
+            invalidate_events()
+        self.stdout.write(self.style.SUCCESS(f"Reservas liberadas: {released}"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+from graphql import GraphQLError
+
+from events import services
+from ticket_manager.response_cache import invalidate_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Reparte los boletos disponibles de un evento en varias filas de inventario "
+        "para que sus ventas concurrentes no esperen a la fila del evento. "
+        "Con --slots 0 los boletos vuelven a controlarse con los contadores del evento"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("event_id")
+        parser.add_argument(
+            "--slots",
+            type=int,
+            required=True,
+            help="Filas en las que se reparten los boletos disponibles",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            event = services.get_event_by_id(options["event_id"])
+            services.shard_inventory(event, options["slots"])
+        except GraphQLError as e:
+            raise CommandError(e.message)
+
+        invalidate_events(event.id)
+        slots = event.inventory_slots
+        self.stdout.write(self.style.SUCCESS(f"Filas de inventario del evento: {slots}"))
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_ticket_counters(apps, schema_editor):
+    Event = apps.get_model("events", "Event")
+    Ticket = apps.get_model("events", "Ticket")
+
+    def count(**filters):
+        tickets = (
+            Ticket.objects.filter(event=OuterRef("pk"), **filters)
+            .order_by()
+            .values("event")
+            .annotate(total=Count("pk"))
+            .values("total")
+        )
+        return Coalesce(Subquery(tickets), 0)
+
+    Event.objects.update(
+        total_sold_tickets=count(),
+        total_redeemed_tickets=count(redeemed=True),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='total_redeemed_tickets',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='total_sold_tickets',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_ticket_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_event_cancelled_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start', 'id'], name='event_start_id_idx'),
+        ),
+    ]
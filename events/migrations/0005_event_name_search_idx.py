@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:13
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # El índice GIN se construye sin bloquear las escrituras en tablas grandes
+    atomic = False
+
+    dependencies = [
+        ('events', '0004_event_start_id_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='event',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('name', config='simple'), name='event_name_search_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:14
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Los índices se construyen sin bloquear las escrituras en tablas grandes
+    atomic = False
+
+    dependencies = [
+        ('events', '0005_event_name_search_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='event',
+            index=models.Index(fields=['end'], name='event_end_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='ticket',
+            index=models.Index(fields=['event', 'redeemed', 'id'], name='ticket_event_redeemed_idx'),
+        ),
+    ]
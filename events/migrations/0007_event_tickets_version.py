@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='tickets_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:40
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # El índice se construye sin bloquear las escrituras en la tabla de eventos
+    atomic = False
+
+    dependencies = [
+        ('events', '0008_event_analytics'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='event',
+            index=django.contrib.postgres.indexes.GistIndex(models.Func(models.F('start'), django.db.models.functions.comparison.Greatest('start', 'end'), models.Value('[]'), function='daterange', output_field=django.contrib.postgres.fields.ranges.DateRangeField()), name='event_period_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:42
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_event_period_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='total_held_tickets',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TicketHold',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('quantity', models.PositiveSmallIntegerField()),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='events.event')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['expires_at'], name='ticket_hold_expires_at_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,9 @@
+from django.contrib.postgres.fields import DateRangeField
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.search import SearchVector
 from django.db import models
+from django.db.models import F, Func, Value
+from django.db.models.functions import Greatest
 import uuid
 
 
@@ -7,6 +12,14 @@ class Event(models.Model):
     Modelo que representa un evento.
     Se utiliza para almacenar la información de los eventos que se crean.
     Agrege los campos 'created_at' y 'updated_at' para llevar un registro de las fechas de creación y actualización.
+    Los campos 'total_sold_tickets' y 'total_redeemed_tickets' son contadores que se actualizan
+    en los servicios al vender, canjear y reembolsar boletos, para no contar los boletos en cada lectura.
+    El campo 'cancelled_at' indica cuándo se canceló el evento.
+    El campo 'tickets_version' aumenta cada vez que se venden o reembolsan boletos del evento.
+    El campo 'total_held_tickets' cuenta los boletos apartados en reservas ('TicketHold')
+    que aún no se confirman ni se liberan, y que ya no se pueden vender.
+    El campo 'inventory_slots' indica en cuántas filas de 'InventorySlot' se reparten
+    los boletos disponibles del evento, o 0 si se controlan con los contadores del evento.
     """
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -14,18 +27,39 @@ class Event(models.Model):
     start = models.DateField()
     end = models.DateField()
     total_tickets = models.PositiveSmallIntegerField()
-
-    @property
-    def total_sold_tickets(self) -> int:
-        return Ticket.objects.filter(event=self).count()
-
-    @property
-    def total_redeemed_tickets(self) -> int:
-        return Ticket.objects.filter(event=self, redeemed=True).count()
-
+    total_sold_tickets = models.PositiveIntegerField(default=0)
+    total_redeemed_tickets = models.PositiveIntegerField(default=0)
+    total_held_tickets = models.PositiveIntegerField(default=0)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+    tickets_version = models.PositiveBigIntegerField(default=0)
+    inventory_slots = models.PositiveSmallIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Orden estable para paginar los eventos por cursor
+            models.Index(fields=["start", "id"], name="event_start_id_idx"),
+            # Filtros por fecha de fin (eventos terminados o en curso)
+            models.Index(fields=["end"], name="event_end_idx"),
+            # Búsqueda de texto completo por nombre, debe coincidir con 'services.EVENT_SEARCH_VECTOR'
+            GinIndex(
+                SearchVector("name", config="simple"), name="event_name_search_idx"
+            ),
+            # Filtros por periodo (eventos activos en una fecha o en un rango),
+            # debe coincidir con 'services.EVENT_PERIOD'
+            GistIndex(
+                Func(
+                    F("start"),
+                    Greatest("start", "end"),
+                    Value("[]"),
+                    function="daterange",
+                    output_field=DateRangeField(),
+                ),
+                name="event_period_idx",
+            ),
+        ]
+
 
 class Ticket(models.Model):
     """
@@ -41,3 +75,112 @@ class Ticket(models.Model):
     redeemed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Boletos canjeados o pendientes de un evento, en orden para recorrerlos por bloques
+            models.Index(
+                fields=["event", "redeemed", "id"], name="ticket_event_redeemed_idx"
+            ),
+        ]
+
+
+class TicketHold(models.Model):
+    """
+    Modelo que representa una reserva temporal de boletos durante el pago.
+    Los boletos reservados se descuentan de los disponibles hasta que la reserva se confirma,
+    se libera o vence. Al confirmarla se crean los boletos y se elimina la reserva,
+    así que la tabla solo contiene las reservas pendientes.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    quantity = models.PositiveSmallIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Reservas vencidas en orden para liberarlas por bloques
+            models.Index(fields=["expires_at"], name="ticket_hold_expires_at_idx"),
+        ]
+
+
+class InventorySlot(models.Model):
+    """
+    Parte de los boletos disponibles de un evento con inventario repartido.
+    Cada venta o reserva descuenta de una sola parte, así que las ventas concurrentes
+    de un evento no esperan todas a la misma fila.
+    'sold' acumula los boletos vendidos que aún no se suman a 'Event.total_sold_tickets'.
+    """
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    slot = models.PositiveSmallIntegerField()
+    remaining = models.PositiveIntegerField(default=0)
+    sold = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "slot"], name="inventory_slot_unique"
+            ),
+        ]
+
+
+class EventDailySales(models.Model):
+    """
+    Resumen de las ventas de un evento por día, que mantienen los servicios al vender
+    y reembolsar boletos para que las consultas de analítica no recorran los boletos.
+    'refunded' cuenta los reembolsos en el día en que se hicieron.
+    """
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    day = models.DateField()
+    sold = models.PositiveIntegerField(default=0)
+    refunded = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "day"], name="event_daily_sales_unique"
+            ),
+        ]
+
+
+class EventHourlyRedemptions(models.Model):
+    """
+    Resumen de los canjes de boletos de un evento por hora, que mantienen los servicios al canjear
+    """
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE)
+    hour = models.DateTimeField()
+    redeemed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["event", "hour"], name="event_hourly_redemptions_unique"
+            ),
+        ]
+
+
+class IdempotencyKey(models.Model):
+    """
+    Modelo que guarda el resultado de una mutación que se envió con una llave de idempotencia,
+    para regresarlo en los reintentos del cliente sin volver a ejecutarla.
+    La llave se inserta en la misma transacción que la mutación, así que un reintento
+    concurrente espera a que termine y solo se guarda si la mutación tuvo éxito.
+    'response' contiene los boletos del resultado serializados en JSON.
+    """
+
+    key = models.CharField(max_length=255, primary_key=True)
+    request_hash = models.CharField(max_length=64)
+    response = models.TextField(blank=True)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Llaves vencidas para eliminarlas por bloques
+            models.Index(fields=["expires_at"], name="idempotency_expires_at_idx"),
+        ]
@@ -0,0 +1,208 @@
+"""
+Canje de boletos con commit agrupado, para los picos de entrada a un evento.
+
+Con 'REDEEM_GROUP_COMMIT' los canjes que llegan a un proceso se juntan durante
+'REDEEM_GROUP_COMMIT_INTERVAL_MS' y se guardan con 'services.redeem_tickets' en una sola
+transacción, en lugar de un commit por boleto. Cada petición espera a que su lote se guarde
+antes de responder, así un canje confirmado al lector nunca se pierde aunque el proceso se caiga.
+
+Antes de encolar el canje se marca el boleto en la cache compartida con 'cache.add', que
+rechaza de inmediato un segundo escaneo del mismo boleto en cualquier proceso. La marca de
+un canje pendiente vence pronto, para que un proceso caído no deje boletos bloqueados;
+la base de datos sigue siendo la que decide si el boleto ya se había canjeado.
+
+Si la petición deja de esperar a su lote, el boleto sigue en la cola y se puede guardar
+después. Se conserva la marca y se deja otra de canje sin confirmar, así el reintento del
+lector espera al mismo lote o recibe su resultado en lugar de rechazarse como canjeado.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from graphql import GraphQLError
+
+from events import services
+from events.models import Ticket
+
+ALREADY_REDEEMED = "Este boleto ya ha sido canjeado"
+RETRY = "No se pudo confirmar el canje del boleto, intente de nuevo"
+# Los boletos canjeados no vuelven a estar disponibles, la marca solo evita ir a la base de datos
+REDEEMED_CLAIM_TTL = 24 * 60 * 60
+# Tiempo en que el lector puede reintentar un canje que no se le confirmó
+UNCONFIRMED_TTL = 10 * 60
+# Valores de la marca del boleto: en un lote, canjeado por su lote o canjeado antes
+PENDING = "pending"
+REDEEMED = "redeemed"
+ALREADY = "already"
+
+
+def claim_key(ticket_id) -> str:
+    return f"events:redeemed:{str(ticket_id).lower()}"
+
+
+def unconfirmed_key(ticket_id) -> str:
+    return f"events:redeem-unconfirmed:{str(ticket_id).lower()}"
+
+
+def finish_claim(ticket_id, result: dict | None) -> None:
+    """
+    Deja la marca del boleto según el resultado de su lote, aunque la petición ya no lo espere.
+    Solo se conserva la marca de los boletos que sí están canjeados.
+    """
+    if result is not None and result["ok"]:
+        cache.set(claim_key(ticket_id), REDEEMED, timeout=REDEEMED_CLAIM_TTL)
+    elif result is not None and result["error"] == ALREADY_REDEEMED:
+        cache.set(claim_key(ticket_id), ALREADY, timeout=REDEEMED_CLAIM_TTL)
+    else:
+        cache.delete(claim_key(ticket_id))
+
+
+class RedemptionBatcher:
+    """
+    Hilo que recibe los canjes de las peticiones del proceso y los guarda por lotes
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        # Canjes encolados que aún no se guardan, por id del boleto
+        self.pending = {}
+
+    def submit(self, ticket_id) -> Future:
+        future = Future()
+        with self.lock:
+            self.pending[str(ticket_id).lower()] = future
+        self.queue.put((ticket_id, future))
+        self.ensure_started()
+        return future
+
+    def pending_future(self, ticket_id) -> Future | None:
+        with self.lock:
+            return self.pending.get(str(ticket_id).lower())
+
+    def resolve(self, ticket_id, future: Future, result=None, error=None) -> None:
+        finish_claim(ticket_id, result)
+        with self.lock:
+            if self.pending.get(str(ticket_id).lower()) is future:
+                del self.pending[str(ticket_id).lower()]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def ensure_started(self) -> None:
+        with self.lock:
+            # Después de un fork el hilo del proceso padre ya no existe
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name="redemption-batcher", daemon=True
+                )
+                self.thread.start()
+
+    def next_batch(self) -> list[tuple]:
+        """
+        Espera el primer canje y junta los que lleguen durante el intervalo,
+        sin pasar del máximo de boletos por lote
+        """
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + settings.REDEEM_GROUP_COMMIT_INTERVAL_MS / 1000
+        while len(batch) < settings.REDEEM_TICKETS_MAX_BATCH:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self, batch: list[tuple]) -> None:
+        ticket_ids = [ticket_id for ticket_id, _ in batch]
+        try:
+            results = services.redeem_tickets(ticket_ids)
+        except Exception as e:
+            for ticket_id, future in batch:
+                self.resolve(ticket_id, future, error=e)
+        else:
+            for (ticket_id, future), result in zip(batch, results):
+                self.resolve(ticket_id, future, result=result)
+        finally:
+            close_old_connections()
+
+    def run(self) -> None:
+        while True:
+            self.flush(self.next_batch())
+
+
+batcher = RedemptionBatcher()
+
+
+def wait(ticket_id, future: Future) -> Ticket:
+    """
+    Espera el resultado del lote del boleto. Si no llega a tiempo se marca el canje
+    como sin confirmar para que el reintento reciba el resultado del mismo lote.
+    """
+    try:
+        result = future.result(timeout=settings.REDEEM_GROUP_COMMIT_TIMEOUT)
+    except TimeoutError:
+        cache.set(unconfirmed_key(ticket_id), True, timeout=UNCONFIRMED_TTL)
+        raise GraphQLError(RETRY)
+
+    if not result["ok"]:
+        raise GraphQLError(result["error"])
+    return result["ticket"]
+
+
+def retry_unconfirmed(ticket_id) -> Ticket | None:
+    """
+    Confirma el canje de un boleto cuyo lote no terminó antes de que la petición anterior
+    dejara de esperarlo. Regresa None si ese lote falló y hay que volver a canjearlo.
+    """
+    future = batcher.pending_future(ticket_id)
+    if future is not None:
+        return wait(ticket_id, future)
+
+    claim = cache.get(claim_key(ticket_id))
+    if claim == REDEEMED:
+        # El lote se guardó después de que la petición anterior dejó de esperarlo
+        return services.get_ticket_by_id(ticket_id)
+    if claim == ALREADY:
+        raise GraphQLError(ALREADY_REDEEMED)
+    if claim == PENDING:
+        # El lote es de otro proceso y aún no termina
+        cache.set(unconfirmed_key(ticket_id), True, timeout=UNCONFIRMED_TTL)
+        raise GraphQLError(RETRY)
+    return None
+
+
+def redeem(ticket_id) -> Ticket:
+    """
+    Canjea un boleto en el siguiente lote del proceso, con las mismas reglas de negocio
+    que 'services.redeem_ticket'
+    """
+    if cache.delete(unconfirmed_key(ticket_id)):
+        ticket = retry_unconfirmed(ticket_id)
+        if ticket is not None:
+            return ticket
+
+    timeout = settings.REDEEM_GROUP_COMMIT_TIMEOUT
+    if not cache.add(claim_key(ticket_id), PENDING, timeout=timeout * 2):
+        raise GraphQLError(ALREADY_REDEEMED)
+
+    try:
+        future = batcher.submit(ticket_id)
+    except BaseException:
+        cache.delete(claim_key(ticket_id))
+        raise
+    return wait(ticket_id, future)
+
+
+# La espera del lote no usa el hilo de la petición, que puede seguir atendiendo otras consultas
+aredeem = sync_to_async(redeem, thread_sensitive=False)
@@ -1,6 +1,22 @@
-from .models import Event, Ticket
-from datetime import date
+from . import analytics, inventory
+from .models import Event, Ticket, TicketHold
+from asgiref.sync import sync_to_async
+from collections import Counter
+from collections.abc import Callable, Iterator
+from datetime import date, timedelta
+from django.conf import settings
+from django.contrib.postgres.fields import DateRangeField
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.core.cache import cache
+from django.db import transaction
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import F, Func, Q, QuerySet, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
 from graphql import GraphQLError
+import re
+import struct
+import uuid
 
 
 def validate_start(value: date) -> date:
@@ -68,6 +84,105 @@ def validate_all_fields(**kwargs) -> dict:
     return kwargs
 
 
+SEARCH_CONTAINS = "contains"
+SEARCH_FULL_TEXT = "full_text"
+
+# Debe coincidir con la expresión del índice 'event_name_search_idx' para que se utilice
+EVENT_SEARCH_VECTOR = SearchVector("name", config="simple")
+
+
+def build_search_query(search: str) -> SearchQuery | None:
+    """
+    Construye una búsqueda de texto completo donde cada palabra puede ser un prefijo,
+    por ejemplo "rock fest" encuentra "Rock Festival"
+    """
+    words = re.findall(r"\w+", search)
+    if not words:
+        return None
+    raw = " & ".join(f"{word}:*" for word in words)
+    return SearchQuery(raw, search_type="raw", config="simple")
+
+
+# Periodo del evento con ambas fechas incluidas, como en 'validate_start_end'.
+# 'Greatest' evita que el índice falle con eventos cuyas fechas estén invertidas.
+# Debe coincidir con la expresión del índice 'event_period_idx' para que se utilice
+EVENT_PERIOD = Func(
+    F("start"),
+    Greatest("start", "end"),
+    Value("[]"),
+    function="daterange",
+    output_field=DateRangeField(),
+)
+
+
+def validate_date_range(from_date: date | None, to_date: date | None) -> None:
+    """
+    Valida que la fecha inicial del rango no sea mayor que la fecha final
+    """
+    if from_date and to_date and from_date > to_date:
+        raise GraphQLError(
+            "La fecha inicial del rango no puede ser mayor que la fecha final"
+        )
+
+
+def filter_events(
+    search: str | None = None,
+    search_mode: str = SEARCH_CONTAINS,
+    upcoming: bool = False,
+    active_on: date | None = None,
+    from_date: date | None = None,
+    to_date: date | None = None,
+    hide_sold_out: bool = False,
+) -> QuerySet[Event]:
+    """
+    Obtiene los eventos que cumplen con los filtros, ordenados por fecha de inicio.
+    Con la búsqueda de texto completo se ordenan primero por relevancia.
+    Las fechas siguen las reglas de venta y canje: un evento próximo ('upcoming') aún no
+    comienza, uno activo en 'active_on' ya comenzó y no ha terminado en esa fecha,
+    y 'from_date'/'to_date' regresan los eventos cuyo periodo se cruza con el rango.
+    """
+    qs = Event.objects.order_by("start", "id")
+
+    if upcoming:
+        qs = qs.filter(start__gt=date.today())
+
+    periods = []
+    if active_on:
+        periods.append(DateRange(active_on, active_on, "[]"))
+    validate_date_range(from_date, to_date)
+    if from_date or to_date:
+        # Un extremo vacío del rango no tiene límite
+        periods.append(DateRange(from_date, to_date, "[]"))
+    if periods:
+        qs = qs.alias(period=EVENT_PERIOD)
+        for period in periods:
+            qs = qs.filter(period__overlap=period)
+
+    if hide_sold_out:
+        # Con el inventario repartido los boletos disponibles están en sus filas
+        qs = qs.filter(
+            Q(
+                inventory_slots=0,
+                total_sold_tickets__lt=F("total_tickets") - F("total_held_tickets"),
+            )
+            | Q(inventory_slots__gt=0) & inventory.has_available_tickets()
+        )
+
+    if search and search_mode == SEARCH_FULL_TEXT:
+        query = build_search_query(search)
+        if query is None:
+            return qs.none()
+        qs = (
+            qs.annotate(search=EVENT_SEARCH_VECTOR)
+            .filter(search=query)
+            .annotate(rank=SearchRank(EVENT_SEARCH_VECTOR, query))
+            .order_by("-rank", "start", "id")
+        )
+    elif search:
+        qs = qs.filter(name__icontains=search)
+    return qs
+
+
 def get_event_by_id(id: str) -> Event:
     """
     Obtiene un evento por su id
@@ -88,6 +203,117 @@ def get_ticket_by_id(id: str) -> Ticket:
         raise GraphQLError("No se encontró un boleto con el id proporcionado")
 
 
+def get_hold_by_id(id: str) -> TicketHold:
+    """
+    Obtiene una reserva por su id, junto con su evento
+    """
+    try:
+        return TicketHold.objects.select_related("event").get(id=id)
+    except TicketHold.DoesNotExist:
+        raise GraphQLError("No se encontró una reserva con el id proporcionado")
+
+
+# Columnas de la exportación de boletos, en orden
+TICKET_EXPORT_FIELDS = ("id", "event_id", "redeemed", "created_at", "updated_at")
+
+
+def export_tickets(event: Event, redeemed: bool | None = None) -> Iterator[tuple]:
+    """
+    Recorre los boletos de un evento, opcionalmente solo los canjeados o los pendientes,
+    con un cursor del lado del servidor que los obtiene por bloques de 'TICKET_EXPORT_CHUNK_SIZE',
+    así la memoria no crece con el número de boletos
+    """
+    qs = Ticket.objects.filter(event=event)
+    if redeemed is not None:
+        qs = qs.filter(redeemed=redeemed)
+
+    # Sigue el índice 'ticket_event_redeemed_idx' para no ordenar todos los boletos
+    qs = qs.order_by("redeemed", "id").values_list(*TICKET_EXPORT_FIELDS)
+    return qs.iterator(chunk_size=settings.TICKET_EXPORT_CHUNK_SIZE)
+
+
+SNAPSHOT_MAGIC = b"TKS1"
+# Identificador del formato, id del evento, versión de los boletos y número de boletos
+SNAPSHOT_HEADER = struct.Struct(">4s16sQI")
+
+
+def build_ticket_snapshot(event: Event) -> bytes:
+    """
+    Genera la lista compacta de los boletos vendidos de un evento: el encabezado 'SNAPSHOT_HEADER'
+    seguido del UUID de cada boleto en 16 bytes, ordenados para buscarlos con búsqueda binaria.
+    Se recorre la tabla de boletos una sola vez con un cursor del lado del servidor.
+    """
+    ids = bytearray()
+    tickets = (
+        Ticket.objects.filter(event=event).order_by("id").values_list("id", flat=True)
+    )
+    # PostgreSQL ordena los UUID byte por byte, igual que se comparan en los dispositivos
+    for ticket_id in tickets.iterator(chunk_size=settings.TICKET_EXPORT_CHUNK_SIZE):
+        ids += ticket_id.bytes
+
+    header = SNAPSHOT_HEADER.pack(
+        SNAPSHOT_MAGIC, event.id.bytes, event.tickets_version, len(ids) // 16
+    )
+    return header + ids
+
+
+def get_ticket_snapshot(event: Event) -> bytes:
+    """
+    Obtiene la lista compacta de la versión actual de los boletos del evento, desde la cache
+    si ya se había generado. Cada venta, reembolso o cancelación cambia la versión.
+    Con el inventario repartido, 'event' debe traer la versión de 'inventory.current_counters',
+    que cuenta las ventas de sus filas.
+    """
+    key = f"events:ticket-snapshot:{event.id}:{event.tickets_version}"
+    snapshot = cache.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    snapshot = build_ticket_snapshot(event)
+    # Solo se guarda si los boletos no cambiaron mientras se generaba
+    if event.inventory_slots:
+        _, version = inventory.current_counters(event)
+    else:
+        version = (
+            Event.objects.filter(pk=event.pk)
+            .values_list("tickets_version", flat=True)
+            .first()
+        )
+    if version == event.tickets_version:
+        cache.set(key, snapshot, timeout=settings.TICKET_SNAPSHOT_CACHE_TTL)
+    return snapshot
+
+
+async def aget_event_by_id(id: str) -> Event:
+    """
+    Versión asíncrona de 'get_event_by_id'
+    """
+    try:
+        return await Event.objects.aget(id=id)
+    except Event.DoesNotExist:
+        raise GraphQLError("No se encontró un evento con el id proporcionado")
+
+
+async def aget_ticket_by_id(id: str) -> Ticket:
+    """
+    Versión asíncrona de 'get_ticket_by_id', que también carga el evento del boleto
+    """
+    try:
+        return await Ticket.objects.select_related("event").aget(id=id)
+    except Ticket.DoesNotExist:
+        raise GraphQLError("No se encontró un boleto con el id proporcionado")
+
+
+async def aget_hold_by_id(id: str) -> TicketHold:
+    """
+    Versión asíncrona de 'get_hold_by_id'
+    """
+    try:
+        return await TicketHold.objects.select_related("event").aget(id=id)
+    except TicketHold.DoesNotExist:
+        raise GraphQLError("No se encontró una reserva con el id proporcionado")
+
+
 def create_event(
     name: str,
     start: date,
@@ -111,14 +337,35 @@ def update_event(event: Event, **kwargs) -> Event:
     validate_all_fields(**kwargs)
     total_tickets = kwargs.get("total_tickets", None)
 
-    if total_tickets and total_tickets < event.total_sold_tickets:
-        raise GraphQLError(
-            "No se pueden reducir el número total de boletos por debajo de los boletos vendidos"
-        )
-
-    [setattr(event, key, value) for key, value in kwargs.items()]
-    event.full_clean()
-    event.save()
+    with transaction.atomic():
+        held = event.total_held_tickets
+        if total_tickets:
+            if event.inventory_slots:
+                # Bloquea las filas del inventario hasta el commit
+                inventory.fold(event)
+            # Se bloquea el evento para que una venta concurrente no supere el nuevo total
+            event.total_sold_tickets, held, event.inventory_slots = (
+                Event.objects.select_for_update()
+                .values_list(
+                    "total_sold_tickets", "total_held_tickets", "inventory_slots"
+                )
+                .get(pk=event.pk)
+            )
+            if event.inventory_slots:
+                # Con el inventario repartido las reservas no se cuentan en el evento
+                held = inventory.held_tickets(event)
+
+        if total_tickets and total_tickets < event.total_sold_tickets + held:
+            raise GraphQLError(
+                "No se pueden reducir el número total de boletos por debajo de los boletos vendidos"
+            )
+
+        [setattr(event, key, value) for key, value in kwargs.items()]
+        event.full_clean()
+        # Solo se guardan los campos recibidos para no sobrescribir los contadores de boletos
+        event.save(update_fields=[*kwargs.keys(), "updated_at"])
+        if total_tickets and event.inventory_slots:
+            inventory.configure(event, event.inventory_slots)
     return event
 
 
@@ -126,6 +373,8 @@ def delete_event(event: Event) -> Event:
     """
     Elimina un evento después de validar las reglas de negocio
     """
+    if event.inventory_slots:
+        inventory.fold(event)
 
     if event.end >= date.today() and event.total_sold_tickets > 0:
         raise GraphQLError(
@@ -136,33 +385,293 @@ def delete_event(event: Event) -> Event:
     return event
 
 
-def sell_ticket(event: Event) -> Ticket:
+class TicketsUnavailable(GraphQLError):
     """
-    Crea un boleto para el evento después de validar las reglas de negocio
+    No quedan boletos disponibles del evento para vender o reservar
     """
-    total_tickets = event.total_tickets
 
-    if event.total_sold_tickets >= total_tickets:
-        raise GraphQLError("No hay boletos disponibles para este evento")
+
+def _claim_tickets(event: Event, quantity: int) -> None:
+    """
+    Aparta boletos del evento con una sola actualización condicional,
+    así nunca se venden más boletos que el total aunque haya ventas concurrentes.
+    Los boletos apartados en reservas pendientes no están disponibles.
+    La fila del evento queda bloqueada hasta el commit, por eso debe ser la última escritura de la transacción.
+    Con el inventario repartido se descuentan de una fila de 'InventorySlot' sin tocar el evento.
+    También registra la venta en la analítica antes de bloquear el evento.
+    """
+    if _claim_from_inventory(event, quantity, sold=True):
+        # Las ventas del inventario repartido se registran al sumarse al evento
+        return
+
+    analytics.record_sales(event.pk, quantity)
+    claimed = Event.objects.filter(
+        pk=event.pk,
+        cancelled_at__isnull=True,
+        inventory_slots=0,
+        total_sold_tickets__lte=F("total_tickets") - F("total_held_tickets") - quantity,
+    ).update(
+        total_sold_tickets=F("total_sold_tickets") + quantity,
+        tickets_version=F("tickets_version") + 1,
+    )
+
+    if not claimed:
+        raise TicketsUnavailable("No hay boletos disponibles para este evento")
+    event.total_sold_tickets += quantity
+    event.tickets_version += 1
+
+
+def _claim_from_inventory(event: Event, quantity: int, sold: bool) -> bool:
+    """
+    Aparta boletos del inventario repartido del evento. Regresa False si el evento no tiene
+    el inventario repartido, o si dejó de tenerlo, para apartarlos con los contadores del evento.
+    """
+    while event.inventory_slots:
+        if inventory.claim(event.pk, quantity, sold):
+            return True
+        # Sin boletos en las filas, se revisa si el inventario se volvió a configurar
+        slots = (
+            Event.objects.filter(pk=event.pk)
+            .values_list("inventory_slots", flat=True)
+            .first()
+        )
+        if slots == event.inventory_slots:
+            raise TicketsUnavailable("No hay boletos disponibles para este evento")
+        event.inventory_slots = slots or 0
+    return False
+
+
+def validate_sellable(event: Event, quantity: int) -> Event:
+    """
+    Valida que se puedan vender o reservar 'quantity' boletos del evento
+    """
+    if quantity <= 0:
+        raise GraphQLError("La cantidad de boletos debe ser mayor que 0")
+
+    # Descarta sin escribir los eventos que ya se veían agotados al leerlos.
+    # Las reservas no se cuentan aquí porque pueden estar vencidas.
+    if event.total_sold_tickets + quantity > event.total_tickets:
+        raise TicketsUnavailable("No hay boletos disponibles para este evento")
 
     if event.end < date.today():
         raise GraphQLError(
             "No se pueden vender boletos para eventos que ya han terminado"
         )
 
-    ticket = Ticket(event=event)
-    ticket.full_clean()
-    ticket.save()
-    return ticket
+    if event.cancelled_at:
+        raise GraphQLError("No se pueden vender boletos para eventos cancelados")
+    return event
 
 
-def redeem_ticket(ticket: Ticket) -> Ticket:
+def sell_tickets(event: Event, quantity: int) -> list[Ticket]:
     """
-    Canjea un boleto después de validar las reglas de negocio
+    Crea varios boletos para el evento después de validar las reglas de negocio.
+    Todos los boletos se insertan con una sola consulta y en una sola transacción.
+    """
+    validate_sellable(event, quantity)
+
+    def sell():
+        with transaction.atomic():
+            tickets = Ticket.objects.bulk_create(
+                [Ticket(event=event) for _ in range(quantity)]
+            )
+            _claim_tickets(event, quantity)
+        return tickets
+
+    return _retry_after_releasing_holds(event, sell)
+
+
+def sell_ticket(event: Event) -> Ticket:
+    """
+    Crea un boleto para el evento después de validar las reglas de negocio
+    """
+    return sell_tickets(event, 1)[0]
+
+
+def _retry_after_releasing_holds(event: Event, operation: Callable):
+    """
+    Ejecuta la venta o reserva 'operation'. Si no hay boletos disponibles, libera las
+    reservas vencidas del evento que el barrido aún no libera y la reintenta una vez.
+    """
+    try:
+        return operation()
+    except TicketsUnavailable:
+        if not release_expired_holds(event=event):
+            raise
+    return operation()
+
+
+def hold_tickets(event: Event, quantity: int) -> TicketHold:
+    """
+    Reserva boletos del evento durante 'TICKET_HOLD_TTL' segundos, sin crearlos.
+    La reserva solo actualiza el contador del evento con la misma condición que
+    '_claim_tickets', así que la fila del evento se bloquea lo mismo que en una venta
+    y no durante el pago.
+    """
+    validate_sellable(event, quantity)
+
+    def hold():
+        expires_at = timezone.now() + timedelta(seconds=settings.TICKET_HOLD_TTL)
+        with transaction.atomic():
+            ticket_hold = TicketHold.objects.create(
+                event=event, quantity=quantity, expires_at=expires_at
+            )
+            if _claim_from_inventory(event, quantity, sold=False):
+                return ticket_hold
+
+            claimed = Event.objects.filter(
+                pk=event.pk,
+                cancelled_at__isnull=True,
+                inventory_slots=0,
+                total_sold_tickets__lte=F("total_tickets")
+                - F("total_held_tickets")
+                - quantity,
+            ).update(total_held_tickets=F("total_held_tickets") + quantity)
+            if not claimed:
+                raise TicketsUnavailable("No hay boletos disponibles para este evento")
+        event.total_held_tickets += quantity
+        return ticket_hold
+
+    return _retry_after_releasing_holds(event, hold)
+
+
+def confirm_hold(hold: TicketHold) -> list[Ticket]:
+    """
+    Confirma una reserva vigente: crea sus boletos y los pasa de reservados a vendidos
+    """
+    with transaction.atomic():
+        # Eliminar la reserva evita confirmarla dos veces o liberarla al mismo tiempo
+        deleted, _ = TicketHold.objects.filter(
+            pk=hold.pk, expires_at__gt=timezone.now()
+        ).delete()
+        if not deleted:
+            raise GraphQLError("La reserva ya venció o ya fue confirmada o liberada")
+
+        tickets = Ticket.objects.bulk_create(
+            [Ticket(event=hold.event) for _ in range(hold.quantity)]
+        )
+        if hold.event.inventory_slots and inventory.confirm(
+            hold.event_id, hold.quantity
+        ):
+            return tickets
+
+        analytics.record_sales(hold.event_id, hold.quantity)
+        updated = Event.objects.filter(
+            pk=hold.event_id, cancelled_at__isnull=True
+        ).update(
+            total_held_tickets=F("total_held_tickets") - hold.quantity,
+            total_sold_tickets=F("total_sold_tickets") + hold.quantity,
+            tickets_version=F("tickets_version") + 1,
+        )
+        if not updated:
+            raise GraphQLError("No se pueden vender boletos para eventos cancelados")
+    return tickets
+
+
+def release_hold(hold: TicketHold) -> TicketHold:
+    """
+    Libera una reserva antes de que venza y devuelve sus boletos a los disponibles
+    """
+    with transaction.atomic():
+        deleted, _ = TicketHold.objects.filter(pk=hold.pk).delete()
+        if not deleted:
+            raise GraphQLError("La reserva ya fue confirmada o liberada")
+        if not (
+            hold.event.inventory_slots
+            and inventory.release(hold.event_id, hold.quantity)
+        ):
+            Event.objects.filter(pk=hold.event_id).update(
+                total_held_tickets=F("total_held_tickets") - hold.quantity
+            )
+    return hold
+
+
+def _release_hold_batch(holds: QuerySet[TicketHold], batch_size: int) -> int:
+    """
+    Libera un bloque de las reservas de 'holds' y regresa cuántas se liberaron.
+    Las reservas bloqueadas por otra transacción se omiten en lugar de esperarlas.
+    """
+    with transaction.atomic():
+        rows = list(
+            holds.select_for_update(skip_locked=True)
+            .order_by("expires_at")
+            .values_list("pk", "event_id", "quantity", "event__inventory_slots")[
+                :batch_size
+            ]
+        )
+        if not rows:
+            return 0
+
+        TicketHold.objects.filter(pk__in=[row[0] for row in rows]).delete()
+        per_event = Counter()
+        sharded = set()
+        for _, event_id, quantity, slots in rows:
+            per_event[event_id] += quantity
+            if slots:
+                sharded.add(event_id)
+        for event_id in sorted(per_event):
+            if event_id in sharded and inventory.release(event_id, per_event[event_id]):
+                continue
+            Event.objects.filter(pk=event_id).update(
+                total_held_tickets=F("total_held_tickets") - per_event[event_id]
+            )
+    return len(rows)
+
+
+def _release_holds(holds: QuerySet[TicketHold], batch_size: int | None = None) -> int:
+    """
+    Libera las reservas de 'holds' por bloques de 'batch_size', cada bloque en su propia
+    transacción, y regresa el número de reservas liberadas
+    """
+    batch_size = batch_size or settings.TICKET_HOLD_SWEEP_BATCH_SIZE
+    released = 0
+    while True:
+        count = _release_hold_batch(holds, batch_size)
+        released += count
+        if count < batch_size:
+            return released
+
+
+def release_expired_holds(
+    event: Event | None = None, batch_size: int | None = None
+) -> int:
+    """
+    Libera las reservas vencidas, de un evento o de todos.
+    Regresa el número de reservas liberadas.
+    """
+    expired = TicketHold.objects.filter(expires_at__lte=timezone.now())
+    if event is not None:
+        expired = expired.filter(event=event)
+    return _release_holds(expired, batch_size)
+
+
+def shard_inventory(event: Event, slots: int) -> Event:
+    """
+    Reparte los boletos disponibles del evento en 'slots' filas para que sus ventas
+    concurrentes no esperen todas a la fila del evento, o con 0 deja de repartirlos
+    """
+    if slots < 0:
+        raise GraphQLError("El número de filas del inventario no puede ser negativo")
+
+    if slots and event.cancelled_at:
+        raise GraphQLError(
+            "No se puede repartir el inventario de eventos cancelados"
+        )
+
+    inventory.configure(event, slots)
+    return event
+
+
+def validate_redeemable(ticket: Ticket) -> Ticket:
+    """
+    Valida que el boleto se pueda canjear
     """
     if ticket.redeemed:
         raise GraphQLError("Este boleto ya ha sido canjeado")
 
+    if ticket.event.cancelled_at:
+        raise GraphQLError("No se pueden canjear boletos para eventos cancelados")
+
     if ticket.event.end < date.today():
         raise GraphQLError(
             "No se pueden canjear boletos para eventos que ya han terminado"
@@ -172,13 +681,91 @@ def redeem_ticket(ticket: Ticket) -> Ticket:
         raise GraphQLError(
             "No se pueden canjear boletos para eventos que aún no han comenzado"
         )
+    return ticket
+
+
+def redeem_ticket(ticket: Ticket) -> Ticket:
+    """
+    Canjea un boleto después de validar las reglas de negocio
+    """
+    validate_redeemable(ticket)
+
+    with transaction.atomic():
+        # La actualización condicional evita contar dos veces un canje concurrente
+        updated = Ticket.objects.filter(pk=ticket.pk, redeemed=False).update(
+            redeemed=True, updated_at=timezone.now()
+        )
+        if not updated:
+            raise GraphQLError("Este boleto ya ha sido canjeado")
+        Event.objects.filter(pk=ticket.event_id).update(
+            total_redeemed_tickets=F("total_redeemed_tickets") + 1
+        )
+        analytics.record_redemptions(Counter([ticket.event_id]))
 
     ticket.redeemed = True
-    ticket.full_clean()
-    ticket.save()
     return ticket
 
 
+def redeem_tickets(ticket_ids: list) -> list[dict]:
+    """
+    Canjea varios boletos con las mismas reglas de negocio que 'redeem_ticket'.
+    Los boletos se leen y se actualizan con una consulta para todo el lote,
+    y se regresa el resultado de cada id en el mismo orden en que se recibieron.
+    """
+    max_batch = settings.REDEEM_TICKETS_MAX_BATCH
+    if len(ticket_ids) > max_batch:
+        raise GraphQLError(f"No se pueden canjear más de {max_batch} boletos a la vez")
+
+    ticket_ids = [uuid.UUID(str(ticket_id)) for ticket_id in ticket_ids]
+    results = []
+    redeemed = {}
+
+    with transaction.atomic():
+        # Se bloquean los boletos en orden para que otro lote no los canjee al mismo tiempo
+        tickets = {
+            ticket.pk: ticket
+            for ticket in Ticket.objects.select_related("event")
+            .select_for_update(of=("self",))
+            .filter(pk__in=ticket_ids)
+            .order_by("pk")
+        }
+
+        for ticket_id in ticket_ids:
+            ticket = tickets.get(ticket_id)
+            error = None
+            try:
+                if ticket is None:
+                    raise GraphQLError("No se encontró un boleto con el id proporcionado")
+                validate_redeemable(ticket)
+                ticket.redeemed = True
+                redeemed[ticket_id] = ticket
+            except GraphQLError as e:
+                error = e.message
+            results.append(
+                {
+                    "ticket_id": ticket_id,
+                    "event_id": ticket.event_id if ticket else None,
+                    "ticket": ticket,
+                    "ok": error is None,
+                    "error": error,
+                }
+            )
+
+        if redeemed:
+            Ticket.objects.filter(pk__in=redeemed).update(
+                redeemed=True, updated_at=timezone.now()
+            )
+            per_event = Counter(ticket.event_id for ticket in redeemed.values())
+            for event_id in sorted(per_event):
+                Event.objects.filter(pk=event_id).update(
+                    total_redeemed_tickets=F("total_redeemed_tickets")
+                    + per_event[event_id]
+                )
+            analytics.record_redemptions(per_event)
+
+    return results
+
+
 def refund_ticket(ticket: Ticket) -> Ticket:
     """
     Reembolsa un boleto después de validar las reglas de negocio
@@ -196,5 +783,100 @@ def refund_ticket(ticket: Ticket) -> Ticket:
             "No se pueden reembolsar boletos para eventos que ya han comenzado"
         )
 
-    ticket.delete()
+    with transaction.atomic():
+        if ticket.event.inventory_slots:
+            # El boleto puede estar contado solo en las filas del inventario
+            inventory.fold(ticket.event)
+        deleted, _ = Ticket.objects.filter(pk=ticket.pk, redeemed=False).delete()
+        if not deleted:
+            get_ticket_by_id(ticket.pk)
+            raise GraphQLError("No se pueden reembolsar boletos canjeados")
+        analytics.record_refunds(ticket.event_id, 1)
+        Event.objects.filter(pk=ticket.event_id).update(
+            total_sold_tickets=F("total_sold_tickets") - 1,
+            tickets_version=F("tickets_version") + 1,
+        )
+        if ticket.event.inventory_slots:
+            inventory.release(ticket.event_id, 1)
+
     return ticket
+
+
+def cancel_event(
+    event: Event,
+    chunk_size: int | None = None,
+    max_chunks: int | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> dict:
+    """
+    Cancela un evento y reembolsa sus boletos no canjeados por bloques de 'chunk_size',
+    cada bloque en su propia transacción para no mantener bloqueos largos.
+    Si se limita con 'max_chunks' o se interrumpe, al volver a llamarla continúa con los boletos restantes.
+    """
+    chunk_size = chunk_size or settings.CANCEL_EVENT_CHUNK_SIZE
+    if chunk_size <= 0:
+        raise GraphQLError("El tamaño del bloque debe ser mayor que 0")
+
+    if not event.cancelled_at:
+        if event.end < date.today():
+            raise GraphQLError("No se pueden cancelar eventos que ya han terminado")
+
+        if event.inventory_slots:
+            # Los contadores del evento vuelven a controlar los boletos y rechazan las ventas
+            inventory.configure(event, 0)
+        event.cancelled_at = timezone.now()
+        Event.objects.filter(pk=event.pk, cancelled_at__isnull=True).update(
+            cancelled_at=event.cancelled_at, updated_at=event.cancelled_at
+        )
+
+    # Las reservas pendientes ya no se pueden confirmar
+    _release_holds(TicketHold.objects.filter(event=event), chunk_size)
+
+    pending = Ticket.objects.filter(event=event, redeemed=False)
+    refunded = 0
+    chunks = 0
+    finished = False
+
+    while max_chunks is None or chunks < max_chunks:
+        with transaction.atomic():
+            ids = list(pending.order_by("pk").values_list("pk", flat=True)[:chunk_size])
+            if not ids:
+                finished = True
+                break
+
+            deleted, _ = Ticket.objects.filter(pk__in=ids, redeemed=False).delete()
+            if deleted:
+                analytics.record_refunds(event.pk, deleted)
+            Event.objects.filter(pk=event.pk).update(
+                total_sold_tickets=F("total_sold_tickets") - deleted,
+                tickets_version=F("tickets_version") + 1,
+            )
+
+        event.total_sold_tickets -= deleted
+        event.tickets_version += 1
+        refunded += deleted
+        chunks += 1
+        if on_progress:
+            on_progress(refunded)
+
+    return {
+        "refunded": refunded,
+        "remaining": 0 if finished else pending.count(),
+    }
+
+
+# Versiones asíncronas de las operaciones de escritura. Las transacciones de Django
+# solo se pueden usar desde código síncrono, así que cada operación se ejecuta completa
+# en el hilo de la petición con 'sync_to_async' sin bloquear el ciclo de eventos.
+acreate_event = sync_to_async(create_event)
+aupdate_event = sync_to_async(update_event)
+adelete_event = sync_to_async(delete_event)
+acancel_event = sync_to_async(cancel_event)
+asell_ticket = sync_to_async(sell_ticket)
+asell_tickets = sync_to_async(sell_tickets)
+ahold_tickets = sync_to_async(hold_tickets)
+aconfirm_hold = sync_to_async(confirm_hold)
+arelease_hold = sync_to_async(release_hold)
+aredeem_ticket = sync_to_async(redeem_ticket)
+aredeem_tickets = sync_to_async(redeem_tickets)
+arefund_ticket = sync_to_async(refund_ticket)
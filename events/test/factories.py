@@ -1,4 +1,5 @@
 import factory
+from django.db.models import F
 from factory.faker import Faker
 from factory.django import DjangoModelFactory
 
@@ -29,3 +30,14 @@ class TicketFactory(DjangoModelFactory):
 
     class Meta:
         model = Ticket
+
+    @classmethod
+    def _create(cls, model_class, *args, **kwargs):
+        ticket = super()._create(model_class, *args, **kwargs)
+        # Mantiene los contadores del evento igual que lo hacen los servicios
+        Event.objects.filter(pk=ticket.event_id).update(
+            total_sold_tickets=F("total_sold_tickets") + 1,
+            total_redeemed_tickets=F("total_redeemed_tickets") + int(ticket.redeemed),
+            tickets_version=F("tickets_version") + 1,
+        )
+        return ticket
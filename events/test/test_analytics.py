@@ -0,0 +1,129 @@
+from datetime import date, datetime, timedelta, timezone
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from freezegun import freeze_time
+from graphene.test import Client
+
+from events import services
+from events.models import EventDailySales, EventHourlyRedemptions
+from ticket_manager.schema import schema
+from .factories import EventFactory, TicketFactory
+
+ANALYTICS_QUERY = """
+query ($id: UUID!) {
+    eventAnalytics(id: $id) {
+        sellThroughRate
+        salesPerDay { day sold refunded }
+        redemptionsPerHour { hour redeemed }
+    }
+}
+"""
+
+
+def upcoming_event(**kwargs):
+    return EventFactory(
+        start=date(2030, 1, 10), end=date(2030, 1, 11), total_tickets=10, **kwargs
+    )
+
+
+def test_sales_and_refunds_are_summarized_per_day(db):
+    event = upcoming_event()
+    with freeze_time("2030-01-01 10:00"):
+        services.sell_tickets(event, 3)
+    with freeze_time("2030-01-02 10:00"):
+        ticket = services.sell_ticket(event)
+        services.refund_ticket(ticket)
+
+    rows = EventDailySales.objects.filter(event=event).order_by("day")
+    assert [(row.day, row.sold, row.refunded) for row in rows] == [
+        (date(2030, 1, 1), 3, 0),
+        (date(2030, 1, 2), 1, 1),
+    ]
+
+
+def test_redemptions_are_summarized_per_hour(db):
+    event = EventFactory(start=date(2030, 1, 1), end=date(2030, 1, 2))
+    tickets = TicketFactory.create_batch(3, event=event)
+
+    with freeze_time("2030-01-01 20:15"):
+        services.redeem_ticket(tickets[0])
+    with freeze_time("2030-01-01 21:05"):
+        services.redeem_tickets([tickets[1].id, tickets[2].id])
+
+    rows = EventHourlyRedemptions.objects.filter(event=event).order_by("hour")
+    assert [(row.hour, row.redeemed) for row in rows] == [
+        (datetime(2030, 1, 1, 20, tzinfo=timezone.utc), 1),
+        (datetime(2030, 1, 1, 21, tzinfo=timezone.utc), 2),
+    ]
+
+
+def test_cancel_event_counts_refunds(db):
+    event = EventFactory(
+        start=date.today() + timedelta(days=1),
+        end=date.today() + timedelta(days=2),
+        total_tickets=10,
+    )
+    services.sell_tickets(event, 4)
+
+    services.cancel_event(event, chunk_size=3)
+
+    row = EventDailySales.objects.get(event=event)
+    assert (row.sold, row.refunded) == (4, 4)
+
+
+def test_event_analytics_query_does_not_read_tickets(db):
+    event = upcoming_event()
+    with freeze_time("2030-01-01 10:00"):
+        services.sell_tickets(event, 4)
+
+    client = Client(schema)
+    with CaptureQueriesContext(connection) as captured:
+        result = client.execute(ANALYTICS_QUERY, variables={"id": str(event.id)})
+
+    assert "errors" not in result
+    assert result["data"]["eventAnalytics"] == {
+        "sellThroughRate": 0.4,
+        "salesPerDay": [{"day": "2030-01-01", "sold": 4, "refunded": 0}],
+        "redemptionsPerHour": [],
+    }
+    assert not any("events_ticket" in query["sql"] for query in captured)
+
+
+def test_backfill_event_analytics(db):
+    event = EventFactory(total_tickets=10)
+    # Los boletos creados con la fábrica no actualizan los resúmenes
+    with freeze_time("2030-01-01 09:00"):
+        TicketFactory(event=event)
+    with freeze_time("2030-01-01 12:00"):
+        ticket = TicketFactory(event=event)
+    with freeze_time("2030-01-03 18:30"):
+        ticket.redeemed = True
+        ticket.save()
+
+    call_command("backfill_event_analytics")
+    # Volver a ejecutarlo no duplica los resúmenes
+    call_command("backfill_event_analytics", str(event.id))
+
+    sales = EventDailySales.objects.get(event=event)
+    assert (sales.day, sales.sold, sales.refunded) == (date(2030, 1, 1), 2, 0)
+    redemptions = EventHourlyRedemptions.objects.get(event=event)
+    assert redemptions.hour == datetime(2030, 1, 3, 18, tzinfo=timezone.utc)
+    assert redemptions.redeemed == 1
+
+
+def test_sale_is_recorded_before_locking_event(db):
+    event = upcoming_event()
+
+    with CaptureQueriesContext(connection) as captured:
+        services.sell_tickets(event, 2)
+
+    writes = [
+        query["sql"]
+        for query in captured
+        if query["sql"].startswith(("INSERT", "UPDATE"))
+    ]
+    # La fila del evento solo queda bloqueada con su última escritura
+    assert writes[-1].startswith('UPDATE "events_event"')
+    assert any("events_eventdailysales" in sql for sql in writes[:-1])
@@ -0,0 +1,48 @@
+from datetime import date, timedelta
+
+from django.core.management import call_command
+
+from events.models import Event
+from .factories import EventFactory, TicketFactory
+
+
+def test_reconcile_ticket_counters(db):
+    event = EventFactory(total_tickets=100)
+    TicketFactory.create_batch(3, event=event)
+    TicketFactory.create_batch(2, event=event, redeemed=True)
+    Event.objects.filter(pk=event.pk).update(
+        total_sold_tickets=50, total_redeemed_tickets=0
+    )
+
+    call_command("reconcile_ticket_counters")
+
+    event.refresh_from_db()
+    assert event.total_sold_tickets == 5
+    assert event.total_redeemed_tickets == 2
+
+
+def test_reconcile_ticket_counters_dry_run(db):
+    event = EventFactory(total_tickets=100)
+    TicketFactory.create_batch(3, event=event)
+    Event.objects.filter(pk=event.pk).update(total_sold_tickets=0)
+
+    call_command("reconcile_ticket_counters", "--dry-run")
+
+    event.refresh_from_db()
+    assert event.total_sold_tickets == 0
+
+
+def test_cancel_event(db):
+    event = EventFactory(
+        total_tickets=100,
+        start=date.today() + timedelta(days=1),
+        end=date.today() + timedelta(days=2),
+    )
+    TicketFactory.create_batch(7, event=event)
+
+    call_command("cancel_event", str(event.id), "--chunk-size", "3")
+
+    event.refresh_from_db()
+    assert event.cancelled_at is not None
+    assert event.total_sold_tickets == 0
+    assert not event.ticket_set.exists()
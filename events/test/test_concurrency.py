@@ -0,0 +1,209 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from graphene.test import Client
+from graphql import GraphQLError
+
+from events import redemption, services
+from events.models import Ticket
+from ticket_manager.schema import schema
+from .factories import EventFactory, TicketFactory
+
+
+def run_concurrently(func, workers, calls):
+    """
+    Ejecuta 'func' desde varios hilos, cada uno con su propia conexión a la base de datos
+    """
+
+    def call(_):
+        try:
+            return func()
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(call, range(calls)))
+
+
+def test_sell_ticket_concurrent_no_oversell(transactional_db):
+    event = EventFactory(
+        total_tickets=30,
+        start=date.today(),
+        end=date.today() + timedelta(days=1),
+    )
+
+    def sell():
+        try:
+            services.sell_ticket(services.get_event_by_id(event.id))
+            return True
+        except GraphQLError:
+            return False
+
+    results = run_concurrently(sell, workers=16, calls=80)
+
+    event.refresh_from_db()
+    assert results.count(True) == 30
+    assert Ticket.objects.filter(event=event).count() == 30
+    assert event.total_sold_tickets == 30
+
+
+def redeem_query(ticket_id) -> str:
+    return f'mutation {{ redeemTicket(ticketId: "{ticket_id}") {{ ok }} }}'
+
+
+def test_redeem_group_commit_batches_redemptions(transactional_db, settings):
+    settings.REDEEM_GROUP_COMMIT = True
+    settings.REDEEM_GROUP_COMMIT_INTERVAL_MS = 50
+    event = EventFactory(
+        total_tickets=100, start=date.today(), end=date.today() + timedelta(days=1)
+    )
+    tickets = TicketFactory.create_batch(20, event=event)
+    pending = iter(tickets)
+    client = Client(schema)
+
+    with mock.patch.object(
+        services, "redeem_tickets", wraps=services.redeem_tickets
+    ) as redeem_tickets:
+        results = run_concurrently(
+            lambda: client.execute(redeem_query(next(pending).id)),
+            workers=20,
+            calls=20,
+        )
+
+    assert all("errors" not in result for result in results)
+    # Los canjes concurrentes se guardan en pocas transacciones
+    assert redeem_tickets.call_count < 20
+    event.refresh_from_db()
+    assert event.total_redeemed_tickets == 20
+    assert Ticket.objects.filter(event=event, redeemed=True).count() == 20
+
+
+def test_redeem_group_commit_detects_double_redemption(transactional_db, settings):
+    settings.REDEEM_GROUP_COMMIT = True
+    event = EventFactory(
+        total_tickets=100, start=date.today(), end=date.today() + timedelta(days=1)
+    )
+    ticket = TicketFactory(event=event)
+    client = Client(schema)
+
+    results = run_concurrently(
+        lambda: client.execute(redeem_query(ticket.id)), workers=8, calls=8
+    )
+
+    assert [result.get("errors") for result in results].count(None) == 1
+    event.refresh_from_db()
+    assert event.total_redeemed_tickets == 1
+
+    # Otro proceso sin la marca en su cache también lo rechaza con la base de datos
+    cache.clear()
+    result = client.execute(redeem_query(ticket.id))
+    assert result["errors"][0]["message"] == "Este boleto ya ha sido canjeado"
+
+
+def test_redeem_group_commit_releases_failed_claims(transactional_db, settings):
+    settings.REDEEM_GROUP_COMMIT = True
+    event = EventFactory(
+        total_tickets=100,
+        start=date.today() + timedelta(days=1),
+        end=date.today() + timedelta(days=2),
+    )
+    ticket = TicketFactory(event=event)
+    client = Client(schema)
+    message = "No se pueden canjear boletos para eventos que aún no han comenzado"
+
+    for _ in range(2):
+        result = client.execute(redeem_query(ticket.id))
+        assert result["errors"][0]["message"] == message
+
+
+def slow_redeem_tickets(seconds):
+    """
+    'services.redeem_tickets' con una pausa de 'seconds' segundos en la base de datos
+    """
+    redeem_tickets = services.redeem_tickets
+
+    def redeem(ticket_ids):
+        time.sleep(seconds)
+        return redeem_tickets(ticket_ids)
+
+    return mock.patch.object(services, "redeem_tickets", side_effect=redeem)
+
+
+@pytest.mark.parametrize("wait_for_flush", [False, True])
+def test_redeem_group_commit_retry_after_timeout(
+    transactional_db, settings, wait_for_flush
+):
+    settings.REDEEM_GROUP_COMMIT = True
+    settings.REDEEM_GROUP_COMMIT_TIMEOUT = 0.3
+    event = EventFactory(
+        total_tickets=100, start=date.today(), end=date.today() + timedelta(days=1)
+    )
+    ticket = TicketFactory(event=event)
+    client = Client(schema)
+
+    with slow_redeem_tickets(0.5):
+        result = client.execute(redeem_query(ticket.id))
+        assert result["errors"][0]["message"] == (
+            "No se pudo confirmar el canje del boleto, intente de nuevo"
+        )
+        if wait_for_flush:
+            redemption.batcher.pending_future(ticket.id).result()
+
+        # El reintento recibe el resultado del lote que seguía en la cola
+        result = client.execute(redeem_query(ticket.id))
+
+    assert "errors" not in result
+    assert result["data"]["redeemTicket"]["ok"]
+    event.refresh_from_db()
+    assert event.total_redeemed_tickets == 1
+    result = client.execute(redeem_query(ticket.id))
+    assert result["errors"][0]["message"] == "Este boleto ya ha sido canjeado"
+
+
+def test_sharded_inventory_concurrent_no_oversell(transactional_db):
+    event = EventFactory(
+        total_tickets=30,
+        start=date.today(),
+        end=date.today() + timedelta(days=1),
+    )
+    services.shard_inventory(event, 4)
+
+    def sell():
+        try:
+            services.sell_ticket(services.get_event_by_id(event.id))
+            return True
+        except GraphQLError:
+            return False
+
+    results = run_concurrently(sell, workers=16, calls=80)
+
+    assert results.count(True) == 30
+    assert Ticket.objects.filter(event=event).count() == 30
+    services.shard_inventory(event, 0)
+    event.refresh_from_db()
+    assert event.total_sold_tickets == 30
+
+
+def test_concurrent_retries_with_idempotency_key_sell_once(transactional_db):
+    event = EventFactory(
+        total_tickets=30,
+        start=date.today(),
+        end=date.today() + timedelta(days=1),
+    )
+    client = Client(schema)
+    query = (
+        f'mutation {{ sellTicket(eventId: "{event.id}", idempotencyKey: "retry") '
+        "{ ticket { id } } }"
+    )
+
+    results = run_concurrently(lambda: client.execute(query), workers=8, calls=8)
+
+    assert all("errors" not in result for result in results)
+    ids = {result["data"]["sellTicket"]["ticket"]["id"] for result in results}
+    assert len(ids) == 1
+    assert Ticket.objects.filter(event=event).count() == 1
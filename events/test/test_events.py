@@ -610,6 +610,92 @@ def test_delete_event_not_finished_and_sold_tickets(db):
     )
 
 
+@freeze_time("2022-09-01")
+def test_cancel_event_resumes_by_chunks(db):
+    event = EventFactory(
+        name="Test Event",
+        total_tickets=100,
+        start="2022-09-10",
+        end="2022-09-11",
+    )
+    TicketFactory.create_batch(5, event=event)
+    TicketFactory(event=event, redeemed=True)
+    client = Client(schema)
+    query = f"""
+    mutation {{
+        cancelEvent(id: "{event.id}", chunkSize: 2, maxChunks: 2) {{
+            ok
+            refunded
+            remaining
+            event {{
+                cancelledAt
+            }}
+        }}
+    }}
+    """
+    result = client.execute(query)
+    assert "errors" not in result
+    assert result["data"]["cancelEvent"]["refunded"] == 4
+    assert result["data"]["cancelEvent"]["remaining"] == 1
+    assert result["data"]["cancelEvent"]["event"]["cancelledAt"] is not None
+
+    result = client.execute(query)
+    assert "errors" not in result
+    assert result["data"]["cancelEvent"]["refunded"] == 1
+    assert result["data"]["cancelEvent"]["remaining"] == 0
+    event.refresh_from_db()
+    assert event.total_sold_tickets == 1
+
+
+@freeze_time("2022-09-12")
+def test_cancel_event_finished(db):
+    event = EventFactory(
+        name="Test Event",
+        total_tickets=100,
+        start="2022-09-10",
+        end="2022-09-11",
+    )
+    client = Client(schema)
+    query = f"""
+    mutation {{
+        cancelEvent(id: "{event.id}") {{
+            ok
+        }}
+    }}
+    """
+    result = client.execute(query)
+    assert "errors" in result
+    assert (
+        result["errors"][0]["message"]
+        == "No se pueden cancelar eventos que ya han terminado"
+    )
+
+
+@freeze_time("2022-09-01")
+def test_sell_ticket_event_cancelled(db):
+    event = EventFactory(
+        name="Test Event",
+        total_tickets=100,
+        start="2022-09-10",
+        end="2022-09-11",
+        cancelled_at="2022-09-01T00:00:00Z",
+    )
+    client = Client(schema)
+    query = f"""
+    mutation {{
+        sellTicket(eventId: "{event.id}") {{
+            ok
+        }}
+    }}
+    """
+    result = client.execute(query)
+    assert "errors" in result
+    assert (
+        result["errors"][0]["message"]
+        == "No se pueden vender boletos para eventos cancelados"
+    )
+
+
 @freeze_time("2010-06-07")
 def test_sell_ticket(db):
     event = EventFactory(
@@ -698,6 +784,86 @@ def test_sell_ticket_no_tickets_available(db):
     )
 
 
+@freeze_time("2010-06-07")
+def test_sell_tickets(db):
+    event = EventFactory(
+        name="Test Event",
+        total_tickets=10,
+        start="2010-06-07",
+        end="2010-06-08",
+    )
+    TicketFactory.create_batch(4, event=event)
+    client = Client(schema)
+    query = f"""
+    mutation {{
+        sellTickets(eventId: "{event.id}", quantity: 6) {{
+            ok
+            tickets {{
+                id
+                event {{
+                    id
+                }}
+            }}
+        }}
+    }}
+    """
+    result = client.execute(query)
+    assert "errors" not in result
+    assert result["data"]["sellTickets"]["ok"] is True
+    assert len(result["data"]["sellTickets"]["tickets"]) == 6
+    event.refresh_from_db()
+    assert event.total_sold_tickets == 10
+
+
+@freeze_time("2010-06-07")
+def test_sell_tickets_not_enough_tickets(db):
+    event = EventFactory(
+        name="Test Event",
+        total_tickets=10,
+        start="2010-06-07",
+        end="2010-06-08",
+    )
+    TicketFactory.create_batch(5, event=event)
+    client = Client(schema)
+    query = f"""
+    mutation {{
+        sellTickets(eventId: "{event.id}", quantity: 6) {{
+            ok
+        }}
+    }}
+    """
+    result = client.execute(query)
+    assert "errors" in result
+    assert (
+        result["errors"][0]["message"] == "No hay boletos disponibles para este evento"
+    )
+    event.refresh_from_db()
+    assert event.total_sold_tickets == 5
+
+
+@freeze_time("2010-06-07")
+def test_sell_tickets_invalid_quantity(db):
+    event = EventFactory(
+        name="Test Event",
+        total_tickets=10,
+        start="2010-06-07",
+        end="2010-06-08",
+    )
+    client = Client(schema)
+    query = f"""
+    mutation {{
+        sellTickets(eventId: "{event.id}", quantity: 0) {{
+            ok
+        }}
+    }}
+    """
+    result = client.execute(query)
+    assert "errors" in result
+    assert (
+        result["errors"][0]["message"] == "La cantidad de boletos debe ser mayor que 0"
+    )
+
+
 @freeze_time("2010-07-07")
 def test_redeem_ticket(db):
     event = EventFactory(
@@ -805,6 +971,93 @@ def test_ticket_redeem_already(db):
     assert result["errors"][0]["message"] == "Este boleto ya ha sido canjeado"
 
 
+@freeze_time("2010-07-07")
+def test_redeem_tickets(db):
+    event = EventFactory(
+        name="Test Event",
+        total_tickets=100,
+        start="2010-07-07",
+        end="2010-07-08",
+    )
+    ticket = TicketFactory(event=event)
+    redeemed_ticket = TicketFactory(event=event, redeemed=True)
+    missing_id = "702adc6c-e30d-4f77-b8b1-4173a8afc329"
+    client = Client(schema)
+    query = f"""
+    mutation {{
+        redeemTickets(ticketIds: [
+            "{ticket.id}", "{redeemed_ticket.id}", "{missing_id}", "{ticket.id}"
+        ]) {{
+            ok
+            results {{
+                ticketId
+                ok
+                error
+            }}
+        }}
+    }}
+    """
+    result = client.execute(query)
+    assert "errors" not in result
+    assert result["data"]["redeemTickets"]["ok"] is False
+    results = result["data"]["redeemTickets"]["results"]
+    assert [r["ok"] for r in results] == [True, False, False, False]
+    assert results[0]["ticketId"] == str(ticket.id)
+    assert results[1]["error"] == "Este boleto ya ha sido canjeado"
+    assert results[2]["error"] == "No se encontró un boleto con el id proporcionado"
+    assert results[3]["error"] == "Este boleto ya ha sido canjeado"
+    event.refresh_from_db()
+    assert event.total_redeemed_tickets == 2
+
+
+@freeze_time("2010-07-06")
+def test_redeem_tickets_event_not_started(db):
+    event = EventFactory(
+        name="Test Event",
+        total_tickets=100,
+        start="2010-07-07",
+        end="2010-07-08",
+    )
+    ticket = TicketFactory(event=event)
+    client = Client(schema)
+    query = f"""
+    mutation {{
+        redeemTickets(ticketIds: ["{ticket.id}"]) {{
+            results {{
+                ok
+                error
+            }}
+        }}
+    }}
+    """
+    result = client.execute(query)
+    assert "errors" not in result
+    assert result["data"]["redeemTickets"]["results"][0] == {
+        "ok": False,
+        "error": "No se pueden canjear boletos para eventos que aún no han comenzado",
+    }
+
+
+def test_redeem_tickets_max_batch(db, settings):
+    settings.REDEEM_TICKETS_MAX_BATCH = 1
+    tickets = TicketFactory.create_batch(2)
+    client = Client(schema)
+    ids = ", ".join(f'"{ticket.id}"' for ticket in tickets)
+    query = f"""
+    mutation {{
+        redeemTickets(ticketIds: [{ids}]) {{
+            ok
+        }}
+    }}
+    """
+    result = client.execute(query)
+    assert "errors" in result
+    assert (
+        result["errors"][0]["message"]
+        == "No se pueden canjear más de 1 boletos a la vez"
+    )
+
+
 @freeze_time("2010-07-08")
 def test_refund_ticket(db):
     event = EventFactory(
@@ -897,3 +1150,224 @@ def test_refund_ticket_event_already_redeemed(db):
     result = client.execute(query)
     assert "errors" in result
     assert result["errors"][0]["message"] == "No se pueden reembolsar boletos canjeados"
+
+
+@freeze_time("2010-07-07")
+def test_ticket_counters(db):
+    event = EventFactory(
+        name="Test Event",
+        total_tickets=100,
+        start="2010-07-07",
+        end="2010-07-08",
+    )
+    ticket = TicketFactory(event=event)
+    client = Client(schema)
+    client.execute(f'mutation {{ sellTicket(eventId: "{event.id}") {{ ok }} }}')
+    client.execute(f'mutation {{ redeemTicket(ticketId: "{ticket.id}") {{ ok }} }}')
+    query = f"""
+    query {{
+        event(id: "{event.id}") {{
+            totalSoldTickets
+            totalRedeemedTickets
+        }}
+    }}
+    """
+    result = client.execute(query)
+    assert "errors" not in result
+    assert result["data"]["event"]["totalSoldTickets"] == 2
+    assert result["data"]["event"]["totalRedeemedTickets"] == 1
+
+
+@freeze_time("2010-07-08")
+def test_refund_ticket_updates_counter(db):
+    event = EventFactory(
+        name="Test Event",
+        total_tickets=100,
+        start="2010-07-09",
+        end="2010-07-10",
+    )
+    ticket = TicketFactory(event=event)
+    client = Client(schema)
+    client.execute(f'mutation {{ refundTicket(ticketId: "{ticket.id}") {{ ok }} }}')
+    event.refresh_from_db()
+    assert event.total_sold_tickets == 0
+
+
+def test_list_events_with_tickets_constant_queries(db, django_assert_num_queries):
+    for event in EventFactory.create_batch(5):
+        TicketFactory.create_batch(3, event=event)
+    client = Client(schema)
+    query = """
+    query {
+        events {
+            id
+            totalSoldTickets
+            totalRedeemedTickets
+            tickets {
+                id
+                event {
+                    id
+                }
+            }
+        }
+    }
+    """
+    with django_assert_num_queries(2):
+        result = client.execute(query)
+    assert "errors" not in result
+    assert len(result["data"]["events"]) == 5
+    assert all(len(event["tickets"]) == 3 for event in result["data"]["events"])
+
+
+def test_list_tickets_with_event_constant_queries(db, django_assert_num_queries):
+    TicketFactory.create_batch(5)
+    client = Client(schema)
+    query = """
+    query {
+        tickets {
+            id
+            event {
+                id
+                name
+            }
+        }
+    }
+    """
+    with django_assert_num_queries(1):
+        result = client.execute(query)
+    assert "errors" not in result
+    assert len(result["data"]["tickets"]) == 5
+
+
+def test_events_connection_keyset_pagination(db):
+    events = [
+        EventFactory(start=start, end="2030-01-01")
+        for start in ["2024-01-03", "2024-01-01", "2024-01-02", "2024-01-01", "2024-01-05"]
+    ]
+    expected = [
+        str(event.id) for event in sorted(events, key=lambda e: (e.start, e.id))
+    ]
+    client = Client(schema)
+    query = """
+    query ($after: String) {
+        eventsConnection(first: 2, after: $after) {
+            totalCount
+            edges {
+                cursor
+                node {
+                    id
+                }
+            }
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+        }
+    }
+    """
+    ids = []
+    after = None
+    has_next_page = True
+    while has_next_page:
+        result = client.execute(query, variables={"after": after})
+        assert "errors" not in result
+        connection = result["data"]["eventsConnection"]
+        assert connection["totalCount"] == 5
+        ids += [edge["node"]["id"] for edge in connection["edges"]]
+        after = connection["pageInfo"]["endCursor"]
+        has_next_page = connection["pageInfo"]["hasNextPage"]
+    assert ids == expected
+
+
+def test_events_connection_invalid_cursor(db):
+    client = Client(schema)
+    query = """
+    query {
+        eventsConnection(after: "invalid") {
+            edges {
+                cursor
+            }
+        }
+    }
+    """
+    result = client.execute(query)
+    assert "errors" in result
+    assert result["errors"][0]["message"] == "El cursor proporcionado no es válido"
+
+
+def test_list_full_text_search_events(db):
+    EventFactory(name="Rock Festival", start="2024-01-01")
+    EventFactory(name="Festival de Rock en Vivo", start="2024-01-02")
+    EventFactory(name="Jazz Night", start="2024-01-01")
+    client = Client(schema)
+    query = """
+    query {
+        events(search: "fest roc", searchMode: FULL_TEXT) {
+            name
+        }
+    }
+    """
+    result = client.execute(query)
+    assert "errors" not in result
+    assert [e["name"] for e in result["data"]["events"]] == [
+        "Rock Festival",
+        "Festival de Rock en Vivo",
+    ]
+
+
+def filtered_event_names(filters: str) -> list[str]:
+    client = Client(schema)
+    result = client.execute(f"query {{ events({filters}) {{ name }} }}")
+    assert "errors" not in result, result["errors"]
+    return [event["name"] for event in result["data"]["events"]]
+
+
+@freeze_time("2030-01-10")
+def test_filter_events_by_dates(db):
+    EventFactory(name="Terminado", start="2030-01-01", end="2030-01-09")
+    EventFactory(name="En curso", start="2030-01-05", end="2030-01-10")
+    EventFactory(name="Hoy", start="2030-01-10", end="2030-01-10")
+    EventFactory(name="Próximo", start="2030-01-11", end="2030-01-12")
+
+    assert filtered_event_names("upcoming: true") == ["Próximo"]
+    assert filtered_event_names('activeOn: "2030-01-10"') == ["En curso", "Hoy"]
+    assert filtered_event_names('fromDate: "2030-01-09", toDate: "2030-01-11"') == [
+        "Terminado",
+        "En curso",
+        "Hoy",
+        "Próximo",
+    ]
+    assert filtered_event_names('fromDate: "2030-01-11"') == ["Próximo"]
+    assert filtered_event_names('toDate: "2030-01-04"') == ["Terminado"]
+
+
+def test_filter_events_hide_sold_out(db):
+    sold_out = EventFactory(name="Agotado", total_tickets=1)
+    TicketFactory(event=sold_out)
+    available = EventFactory(name="Disponible", total_tickets=2)
+    TicketFactory(event=available)
+
+    assert filtered_event_names("hideSoldOut: true") == ["Disponible"]
+
+
+def test_filter_events_invalid_date_range(db):
+    client = Client(schema)
+    result = client.execute(
+        '{ events(fromDate: "2030-01-02", toDate: "2030-01-01") { id } }'
+    )
+    assert result["errors"][0]["message"] == (
+        "La fecha inicial del rango no puede ser mayor que la fecha final"
+    )
+
+
+def test_filter_events_connection_by_dates(db):
+    EventFactory(name="Próximo", start="2999-01-01", end="2999-01-02")
+    EventFactory(name="Terminado", start="2000-01-01", end="2000-01-02")
+    client = Client(schema)
+    result = client.execute(
+        "{ eventsConnection(upcoming: true) { totalCount edges { node { name } } } }"
+    )
+    assert "errors" not in result
+    connection = result["data"]["eventsConnection"]
+    assert connection["totalCount"] == 1
+    assert connection["edges"] == [{"node": {"name": "Próximo"}}]
@@ -0,0 +1,79 @@
+import csv
+import io
+import json
+import uuid
+
+from .factories import EventFactory, TicketFactory
+
+
+def export(client, event_id, **params):
+    return client.get(f"/events/{event_id}/tickets/export/", params)
+
+
+def content(response) -> str:
+    assert response.streaming
+    return b"".join(response.streaming_content).decode()
+
+
+def test_export_csv(db, client):
+    event = EventFactory()
+    tickets = TicketFactory.create_batch(3, event=event)
+    TicketFactory(event=EventFactory())
+
+    response = export(client, event.id)
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "text/csv; charset=utf-8"
+    assert f"boletos-{event.id}.csv" in response["Content-Disposition"]
+    rows = list(csv.DictReader(io.StringIO(content(response))))
+    assert sorted(row["id"] for row in rows) == sorted(str(t.id) for t in tickets)
+    assert {row["event_id"] for row in rows} == {str(event.id)}
+    assert {row["redeemed"] for row in rows} == {"False"}
+
+
+def test_export_ndjson_filtered_by_redeemed(db, client):
+    event = EventFactory()
+    redeemed = TicketFactory(event=event, redeemed=True)
+    TicketFactory.create_batch(2, event=event)
+
+    response = export(client, event.id, format="ndjson", redeemed="true")
+
+    assert response["Content-Type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in content(response).splitlines()]
+    assert rows == [
+        {
+            "id": str(redeemed.id),
+            "event_id": str(event.id),
+            "redeemed": True,
+            "created_at": redeemed.created_at.isoformat(),
+            "updated_at": redeemed.updated_at.isoformat(),
+        }
+    ]
+
+
+def test_export_in_chunks(db, client, settings, django_assert_num_queries):
+    settings.TICKET_EXPORT_CHUNK_SIZE = 2
+    event = EventFactory()
+    TicketFactory.create_batch(5, event=event, redeemed=False)
+
+    response = export(client, event.id, redeemed="false")
+    # La consulta de los boletos se ejecuta mientras se envía la respuesta
+    with django_assert_num_queries(1):
+        chunks = list(response.streaming_content)
+
+    # Encabezado y 5 boletos en bloques de 2 líneas
+    assert len(chunks) == 3
+    assert len(b"".join(chunks).decode().splitlines()) == 6
+
+
+def test_export_errors(db, client):
+    event = EventFactory()
+
+    assert export(client, event.id, format="xml").status_code == 400
+    assert export(client, event.id, redeemed="yes").status_code == 400
+
+    response = export(client, uuid.uuid4())
+    assert response.status_code == 404
+    assert response.json() == {
+        "error": "No se encontró un evento con el id proporcionado"
+    }
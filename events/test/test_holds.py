@@ -0,0 +1,153 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from freezegun import freeze_time
+from graphene.test import Client
+from graphql import GraphQLError
+
+from events import services
+from events.models import Event, Ticket, TicketHold
+from ticket_manager.schema import schema
+from .factories import EventFactory
+
+
+@pytest.fixture
+def event(db):
+    return EventFactory(
+        total_tickets=3,
+        start=date.today() + timedelta(days=1),
+        end=date.today() + timedelta(days=2),
+    )
+
+
+def counters(event: Event) -> tuple[int, int]:
+    event.refresh_from_db()
+    return event.total_sold_tickets, event.total_held_tickets
+
+
+def test_hold_reduces_available_tickets(event):
+    services.hold_tickets(event, 2)
+
+    assert counters(event) == (0, 2)
+    with pytest.raises(GraphQLError, match="No hay boletos disponibles"):
+        services.sell_tickets(event, 2)
+    with pytest.raises(GraphQLError, match="No hay boletos disponibles"):
+        services.hold_tickets(event, 2)
+    services.sell_ticket(event)
+    assert counters(event) == (1, 2)
+
+
+def test_confirm_hold(event):
+    hold = services.hold_tickets(event, 2)
+
+    tickets = services.confirm_hold(hold)
+
+    assert len(tickets) == 2
+    assert Ticket.objects.filter(event=event).count() == 2
+    assert not TicketHold.objects.exists()
+    assert counters(event) == (2, 0)
+    with pytest.raises(GraphQLError, match="ya fue confirmada o liberada"):
+        services.confirm_hold(hold)
+
+
+def test_confirm_expired_hold(event, settings):
+    settings.TICKET_HOLD_TTL = 60
+    hold = services.hold_tickets(event, 1)
+
+    with freeze_time(timezone.now() + timedelta(seconds=61)):
+        with pytest.raises(GraphQLError, match="La reserva ya venció"):
+            services.confirm_hold(hold)
+
+    assert not Ticket.objects.exists()
+
+
+def test_release_hold(event):
+    hold = services.hold_tickets(event, 3)
+
+    services.release_hold(hold)
+
+    assert counters(event) == (0, 0)
+    with pytest.raises(GraphQLError, match="ya fue confirmada o liberada"):
+        services.release_hold(hold)
+
+
+def test_release_expired_holds_command(event, settings):
+    settings.TICKET_HOLD_TTL = 60
+    other = EventFactory(
+        total_tickets=5,
+        start=date.today() + timedelta(days=1),
+        end=date.today() + timedelta(days=2),
+    )
+    services.hold_tickets(event, 1)
+    services.hold_tickets(event, 1)
+    services.hold_tickets(other, 2)
+    with freeze_time(timezone.now() + timedelta(seconds=30)):
+        pending = services.hold_tickets(other, 1)
+
+    with freeze_time(timezone.now() + timedelta(seconds=61)):
+        call_command("release_expired_holds", "--batch-size", "2")
+
+    assert list(TicketHold.objects.all()) == [pending]
+    assert counters(event) == (0, 0)
+    assert counters(other) == (0, 1)
+
+
+def test_sale_releases_expired_holds(event, settings):
+    settings.TICKET_HOLD_TTL = 60
+    services.hold_tickets(event, 3)
+
+    with freeze_time(timezone.now() + timedelta(seconds=61)):
+        services.sell_tickets(event, 3)
+
+    assert not TicketHold.objects.exists()
+    assert counters(event) == (3, 0)
+
+
+def test_cancel_event_releases_holds(event):
+    hold = services.hold_tickets(event, 2)
+
+    services.cancel_event(event)
+
+    assert counters(event) == (0, 0)
+    with pytest.raises(GraphQLError, match="ya fue confirmada o liberada"):
+        services.confirm_hold(hold)
+
+
+def test_update_event_counts_held_tickets(event):
+    services.hold_tickets(event, 2)
+
+    with pytest.raises(GraphQLError, match="por debajo de los boletos vendidos"):
+        services.update_event(event, total_tickets=1)
+
+
+def test_hold_and_confirm_mutations(event):
+    client = Client(schema)
+    result = client.execute(
+        f"""
+        mutation {{
+            holdTickets(eventId: "{event.id}", quantity: 2) {{
+                ok
+                hold {{ id quantity expiresAt }}
+            }}
+        }}
+        """
+    )
+    assert "errors" not in result
+    hold = result["data"]["holdTickets"]["hold"]
+    assert hold["quantity"] == 2
+
+    result = client.execute(
+        f'mutation {{ confirmHold(holdId: "{hold["id"]}") {{ ok tickets {{ id }} }} }}'
+    )
+    assert "errors" not in result
+    assert len(result["data"]["confirmHold"]["tickets"]) == 2
+    assert counters(event) == (2, 0)
+
+    result = client.execute(
+        f'mutation {{ releaseHold(holdId: "{hold["id"]}") {{ ok }} }}'
+    )
+    assert result["errors"][0]["message"] == (
+        "No se encontró una reserva con el id proporcionado"
+    )
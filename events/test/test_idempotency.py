@@ -0,0 +1,155 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient
+from django.utils import timezone
+from freezegun import freeze_time
+from graphene.test import Client
+
+from events.models import IdempotencyKey, Ticket
+from ticket_manager.schema import schema
+from .factories import EventFactory, TicketFactory
+
+SELL_TICKET = """
+mutation ($eventId: UUID!, $key: String) {
+    sellTicket(eventId: $eventId, idempotencyKey: $key) { ok ticket { id } }
+}
+"""
+
+SELL_TICKETS = """
+mutation ($eventId: UUID!, $quantity: Int!, $key: String) {
+    sellTickets(eventId: $eventId, quantity: $quantity, idempotencyKey: $key) {
+        tickets { id }
+    }
+}
+"""
+
+REFUND_TICKET = """
+mutation ($ticketId: UUID!, $key: String) {
+    refundTicket(ticketId: $ticketId, idempotencyKey: $key) { ok ticket { id } }
+}
+"""
+
+
+@pytest.fixture
+def event(db):
+    return EventFactory(
+        total_tickets=3,
+        start=date.today() + timedelta(days=1),
+        end=date.today() + timedelta(days=2),
+    )
+
+
+def sell(event, key, **variables):
+    result = Client(schema).execute(
+        SELL_TICKET, variables={"eventId": str(event.id), "key": key, **variables}
+    )
+    assert "errors" not in result, result
+    return result["data"]["sellTicket"]["ticket"]["id"]
+
+
+def test_retry_replays_sale(event):
+    first = sell(event, "retry-1")
+    retry = sell(event, "retry-1")
+
+    assert retry == first
+    assert Ticket.objects.filter(event=event).count() == 1
+    event.refresh_from_db()
+    assert event.total_sold_tickets == 1
+    # Sin llave cada petición es una venta nueva
+    assert sell(event, None) != first
+
+
+def test_sell_tickets_replay(event):
+    variables = {"eventId": str(event.id), "quantity": 2, "key": "batch-1"}
+    client = Client(schema)
+
+    first = client.execute(SELL_TICKETS, variables=variables)
+    retry = client.execute(SELL_TICKETS, variables=variables)
+
+    assert first["data"] == retry["data"]
+    assert len(first["data"]["sellTickets"]["tickets"]) == 2
+    assert Ticket.objects.filter(event=event).count() == 2
+
+
+def test_key_reused_with_other_arguments(event):
+    sell(event, "reused")
+
+    result = Client(schema).execute(
+        SELL_TICKETS,
+        variables={"eventId": str(event.id), "quantity": 1, "key": "reused"},
+    )
+
+    assert result["errors"][0]["message"] == (
+        "La llave de idempotencia ya se usó con otra operación"
+    )
+
+
+def test_failed_mutation_is_not_stored(event):
+    event.cancelled_at = timezone.now()
+    event.save()
+
+    result = Client(schema).execute(
+        SELL_TICKET, variables={"eventId": str(event.id), "key": "cancelled"}
+    )
+
+    assert result["errors"][0]["message"] == (
+        "No se pueden vender boletos para eventos cancelados"
+    )
+    assert not IdempotencyKey.objects.exists()
+
+
+def test_retry_replays_refund(event):
+    ticket = TicketFactory(event=event)
+    variables = {"ticketId": str(ticket.id), "key": "refund-1"}
+    client = Client(schema)
+
+    first = client.execute(REFUND_TICKET, variables=variables)
+    retry = client.execute(REFUND_TICKET, variables=variables)
+
+    assert "errors" not in retry
+    assert retry["data"] == first["data"]
+    assert not Ticket.objects.exists()
+
+
+def test_expired_key_runs_again(event, settings):
+    settings.IDEMPOTENCY_KEY_TTL = 60
+    first = sell(event, "expiring")
+
+    with freeze_time(timezone.now() + timedelta(seconds=61)):
+        assert sell(event, "expiring") != first
+        call_command("delete_expired_idempotency_keys")
+
+    assert IdempotencyKey.objects.count() == 1
+    assert Ticket.objects.filter(event=event).count() == 2
+
+
+def test_async_view_replays_sale(event):
+    query = """
+    mutation ($eventId: UUID!, $key: String) {
+        sellTicket(eventId: $eventId, idempotencyKey: $key) {
+            ticket { id event { id totalSoldTickets } }
+        }
+    }
+    """
+    body = {"query": query, "variables": {"eventId": str(event.id), "key": "a-1"}}
+
+    def post():
+        response = async_to_sync(AsyncClient().post)(
+            "/graphql/async/", json.dumps(body), content_type="application/json"
+        )
+        return response.json()
+
+    first = post()
+    retry = post()
+
+    assert "errors" not in first
+    assert "errors" not in retry
+    assert retry["data"]["sellTicket"]["ticket"]["id"] == (
+        first["data"]["sellTicket"]["ticket"]["id"]
+    )
+    assert retry["data"]["sellTicket"]["ticket"]["event"]["id"] == str(event.id)
+    assert Ticket.objects.filter(event=event).count() == 1
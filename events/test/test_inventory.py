@@ -0,0 +1,167 @@
+from datetime import date, timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Sum
+from graphene.test import Client
+from graphql import GraphQLError
+
+from events import inventory, services
+from events.models import EventDailySales, InventorySlot, Ticket, TicketHold
+from ticket_manager.schema import schema
+from .factories import EventFactory
+
+
+@pytest.fixture
+def event(db):
+    event = EventFactory(
+        total_tickets=10,
+        start=date.today() + timedelta(days=1),
+        end=date.today() + timedelta(days=2),
+    )
+    services.shard_inventory(event, 4)
+    return event
+
+
+def slots(event) -> list[tuple[int, int]]:
+    rows = InventorySlot.objects.filter(event=event).order_by("slot")
+    return list(rows.values_list("remaining", "sold"))
+
+
+def test_shard_inventory_splits_available_tickets(event):
+    assert event.inventory_slots == 4
+    assert slots(event) == [(3, 0), (3, 0), (2, 0), (2, 0)]
+
+
+def test_sales_are_exact_and_rebalance_empty_slots(event):
+    services.sell_tickets(event, 3)
+    # Ninguna fila tiene 3 boletos después de la venta, así que se vuelven a repartir
+    services.sell_tickets(event, 3)
+    services.sell_tickets(event, 4)
+
+    with pytest.raises(GraphQLError, match="No hay boletos disponibles"):
+        services.sell_ticket(event)
+    assert sum(remaining for remaining, _ in slots(event)) == 0
+    assert Ticket.objects.filter(event=event).count() == 10
+
+
+def test_fold_adds_sales_to_event(event):
+    services.sell_tickets(event, 3)
+    event.refresh_from_db()
+    assert event.total_sold_tickets == 0
+
+    assert inventory.fold(event) == 3
+
+    assert event.total_sold_tickets == 3
+    assert all(sold == 0 for _, sold in slots(event))
+    assert EventDailySales.objects.get(event=event).sold == 3
+
+
+def test_reads_count_sales_without_folding(event):
+    services.sell_tickets(event, 3)
+
+    result = Client(schema).execute(
+        """
+        query ($id: UUID!) {
+            event(id: $id) { totalSoldTickets }
+            eventAnalytics(id: $id) { sellThroughRate }
+        }
+        """,
+        variables={"id": str(event.id)},
+    )
+
+    assert result["data"] == {
+        "event": {"totalSoldTickets": 3},
+        "eventAnalytics": {"sellThroughRate": 0.3},
+    }
+    assert sum(sold for _, sold in slots(event)) == 3
+
+
+def test_hide_sold_out_uses_slots(event):
+    def visible() -> bool:
+        return services.filter_events(hide_sold_out=True).filter(pk=event.pk).exists()
+
+    services.sell_tickets(event, 9)
+    assert visible()
+
+    services.sell_ticket(event)
+    assert not visible()
+    inventory.fold(event)
+    assert not visible()
+
+
+def test_holds_are_claimed_from_slots(event):
+    hold = services.hold_tickets(event, 4)
+    released = services.hold_tickets(event, 2)
+    assert sum(remaining for remaining, _ in slots(event)) == 4
+
+    services.confirm_hold(hold)
+    services.release_hold(released)
+
+    event.refresh_from_db()
+    assert event.total_held_tickets == 0
+    totals = InventorySlot.objects.filter(event=event).aggregate(
+        remaining=Sum("remaining"), sold=Sum("sold")
+    )
+    assert totals == {"remaining": 6, "sold": 4}
+
+
+def test_unshard_counts_pending_holds(event):
+    services.sell_tickets(event, 2)
+    services.hold_tickets(event, 3)
+
+    services.shard_inventory(event, 0)
+
+    event.refresh_from_db()
+    assert (event.total_sold_tickets, event.total_held_tickets) == (2, 3)
+    assert not InventorySlot.objects.exists()
+    services.sell_tickets(event, 5)
+    with pytest.raises(GraphQLError, match="No hay boletos disponibles"):
+        services.sell_ticket(event)
+
+
+def test_refund_returns_ticket_to_slots(event):
+    ticket = services.sell_ticket(event)
+
+    services.refund_ticket(ticket)
+
+    event.refresh_from_db()
+    assert event.total_sold_tickets == 0
+    assert sum(remaining for remaining, _ in slots(event)) == 10
+
+
+def test_update_event_redistributes_tickets(event):
+    services.sell_tickets(event, 4)
+    services.hold_tickets(event, 2)
+
+    with pytest.raises(GraphQLError, match="por debajo de los boletos vendidos"):
+        services.update_event(event, total_tickets=5)
+    services.update_event(event, total_tickets=20)
+
+    assert event.total_sold_tickets == 4
+    assert sum(remaining for remaining, _ in slots(event)) == 14
+
+
+def test_cancel_event_unshards_inventory(event):
+    services.sell_tickets(event, 2)
+    services.hold_tickets(event, 1)
+
+    services.cancel_event(event)
+
+    event.refresh_from_db()
+    assert event.inventory_slots == 0
+    assert (event.total_sold_tickets, event.total_held_tickets) == (0, 0)
+    assert not TicketHold.objects.exists()
+    with pytest.raises(GraphQLError, match="eventos cancelados"):
+        services.shard_inventory(event, 4)
+
+
+def test_inventory_commands(event):
+    services.sell_tickets(event, 3)
+
+    call_command("fold_inventory_slots")
+    event.refresh_from_db()
+    assert event.total_sold_tickets == 3
+
+    call_command("shard_event_inventory", str(event.id), "--slots", "2")
+    assert slots(event) == [(4, 0), (3, 0)]
@@ -0,0 +1,176 @@
+"""
+Pruebas de regresión de los planes de consulta.
+Ejecutan cada operación de GraphQL sobre un volumen grande de datos, obtienen el plan
+de cada consulta con EXPLAIN y fallan si alguna recorre completa la tabla de eventos o de boletos.
+Se pueden omitir con: pytest -m "not queryplan"
+"""
+
+import json
+import random
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from graphene.test import Client
+
+from events.models import Event, Ticket
+from ticket_manager.schema import schema
+
+pytestmark = pytest.mark.queryplan
+
+TOTAL_EVENTS = 20_000
+TICKETS_PER_EVENT = 4
+CHECKED_TABLES = {"events_event", "events_ticket"}
+
+
+def seq_scans(plan: dict) -> list[str]:
+    """
+    Obtiene las tablas que se recorren completas en un plan de EXPLAIN (FORMAT JSON)
+    """
+    tables = []
+    if plan["Node Type"] == "Seq Scan" and plan["Relation Name"] in CHECKED_TABLES:
+        tables.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        tables += seq_scans(child)
+    return tables
+
+
+@pytest.fixture(scope="module")
+def dataset(django_db_setup, django_db_blocker):
+    """
+    Crea los eventos y boletos una sola vez para todas las pruebas del módulo
+    """
+    today = date.today()
+    rng = random.Random(0)
+    with django_db_blocker.unblock():
+        events = [
+            Event(
+                name=f"Evento {i}",
+                start=today + timedelta(days=rng.randint(-300, 300)),
+                end=today + timedelta(days=301),
+                total_tickets=300,
+                total_sold_tickets=TICKETS_PER_EVENT,
+            )
+            for i in range(TOTAL_EVENTS)
+        ]
+        ongoing = Event(
+            name="Evento en curso",
+            start=today,
+            end=today + timedelta(days=1),
+            total_tickets=300,
+            total_sold_tickets=TICKETS_PER_EVENT,
+        )
+        upcoming = Event(
+            name="Evento próximo",
+            start=today + timedelta(days=10),
+            end=today + timedelta(days=11),
+            total_tickets=300,
+            total_sold_tickets=TICKETS_PER_EVENT,
+        )
+        finished = Event(
+            name="Evento terminado",
+            start=today - timedelta(days=11),
+            end=today - timedelta(days=10),
+            total_tickets=300,
+            total_sold_tickets=TICKETS_PER_EVENT,
+        )
+        events += [ongoing, upcoming, finished]
+        Event.objects.bulk_create(events, batch_size=5000)
+        Ticket.objects.bulk_create(
+            [
+                Ticket(id=uuid.uuid4(), event=event)
+                for event in events
+                for _ in range(TICKETS_PER_EVENT)
+            ],
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE events_event, events_ticket")
+
+        yield {
+            "ongoing": ongoing,
+            "upcoming": upcoming,
+            "finished": finished,
+            "ongoing_ticket": ongoing.ticket_set.first(),
+            "upcoming_ticket": upcoming.ticket_set.first(),
+        }
+
+        with connection.cursor() as cursor:
+            cursor.execute("TRUNCATE events_ticket, events_event CASCADE")
+
+
+# El listado completo de boletos ('tickets') y la búsqueda CONTAINS no se incluyen:
+# el primero regresa toda la tabla y la segunda necesita pg_trgm para usar un índice.
+OPERATIONS = {
+    "events": lambda d: "{ events(first: 20) { id name totalSoldTickets } }",
+    "events_with_tickets": lambda d: "{ events(first: 20) { id tickets { id } } }",
+    "events_full_text": lambda d: (
+        '{ events(search: "1234", searchMode: FULL_TEXT, first: 20) { id } }'
+    ),
+    "events_upcoming": lambda d: "{ events(upcoming: true, first: 20) { id } }",
+    "events_active_on": lambda d: (
+        f'{{ events(activeOn: "{d["ongoing"].start}", first: 20) {{ id }} }}'
+    ),
+    "events_between": lambda d: (
+        f'{{ events(fromDate: "{d["finished"].start}", toDate: "{d["finished"].end}", '
+        f"hideSoldOut: true, first: 20) {{ id }} }}"
+    ),
+    "events_connection": lambda d: (
+        "{ eventsConnection(first: 20) { edges { cursor node { id } } } }"
+    ),
+    "event": lambda d: f'{{ event(id: "{d["ongoing"].id}") {{ id tickets {{ id }} }} }}',
+    "tickets_by_event": lambda d: (
+        f'{{ ticketsByEvent(eventId: "{d["ongoing"].id}") {{ id event {{ id }} }} }}'
+    ),
+    "update_event": lambda d: (
+        f'mutation {{ updateEvent(id: "{d["upcoming"].id}", name: "Nuevo", '
+        f'totalTickets: 200, start: "{d["upcoming"].start}", '
+        f'end: "{d["upcoming"].end}") {{ ok }} }}'
+    ),
+    "delete_event": lambda d: (
+        f'mutation {{ deleteEvent(id: "{d["finished"].id}") {{ ok }} }}'
+    ),
+    "cancel_event": lambda d: (
+        f'mutation {{ cancelEvent(id: "{d["upcoming"].id}") {{ ok }} }}'
+    ),
+    "sell_ticket": lambda d: (
+        f'mutation {{ sellTicket(eventId: "{d["upcoming"].id}") {{ ok }} }}'
+    ),
+    "sell_tickets": lambda d: (
+        f'mutation {{ sellTickets(eventId: "{d["upcoming"].id}", quantity: 3) {{ ok }} }}'
+    ),
+    "redeem_ticket": lambda d: (
+        f'mutation {{ redeemTicket(ticketId: "{d["ongoing_ticket"].id}") {{ ok }} }}'
+    ),
+    "redeem_tickets": lambda d: (
+        f'mutation {{ redeemTickets(ticketIds: ["{d["ongoing_ticket"].id}"]) {{ ok }} }}'
+    ),
+    "refund_ticket": lambda d: (
+        f'mutation {{ refundTicket(ticketId: "{d["upcoming_ticket"].id}") {{ ok }} }}'
+    ),
+}
+
+
+@pytest.mark.parametrize("operation", OPERATIONS)
+def test_operation_uses_indexes(db, dataset, operation):
+    client = Client(schema)
+    with CaptureQueriesContext(connection) as captured:
+        result = client.execute(OPERATIONS[operation](dataset))
+    assert "errors" not in result, result["errors"]
+
+    statements = [
+        query["sql"]
+        for query in captured.captured_queries
+        if query["sql"].split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE")
+    ]
+    assert statements
+
+    for sql in statements:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        assert not seq_scans(plan[0]["Plan"]), f"Seq Scan en: {sql}"
@@ -0,0 +1,113 @@
+import bisect
+import uuid
+from datetime import date, timedelta
+
+from django.db.models import Sum
+
+from events import inventory, services
+from events.models import Event, InventorySlot
+
+from .factories import EventFactory, TicketFactory
+
+
+def snapshot(client, event_id, **headers):
+    return client.get(f"/events/{event_id}/tickets/snapshot/", headers=headers)
+
+
+def parse(content: bytes) -> tuple[uuid.UUID, int, list[bytes]]:
+    magic, event_id, version, count = services.SNAPSHOT_HEADER.unpack_from(content)
+    assert magic == services.SNAPSHOT_MAGIC
+    body = content[services.SNAPSHOT_HEADER.size :]
+    assert len(body) == count * 16
+    ids = [body[i : i + 16] for i in range(0, len(body), 16)]
+    return uuid.UUID(bytes=event_id), version, ids
+
+
+def test_snapshot_contains_sorted_ticket_ids(db, client):
+    event = EventFactory()
+    tickets = TicketFactory.create_batch(5, event=event)
+    TicketFactory(event=event, redeemed=True)
+    TicketFactory(event=EventFactory())
+
+    response = snapshot(client, event.id)
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/octet-stream"
+    event_id, version, ids = parse(response.content)
+    assert str(event_id) == str(event.id)
+    assert version == 6
+    assert ids == sorted(ids)
+    assert len(ids) == 6
+    for ticket in tickets:
+        ticket_id = uuid.UUID(str(ticket.id)).bytes
+        assert ids[bisect.bisect_left(ids, ticket_id)] == ticket_id
+
+
+def test_snapshot_is_cached_until_tickets_change(
+    db, client, django_assert_num_queries
+):
+    event = EventFactory(
+        start=date.today() + timedelta(days=10),
+        end=date.today() + timedelta(days=11),
+        total_tickets=10,
+    )
+    ticket = TicketFactory(event=event)
+    first = snapshot(client, event.id)
+
+    # Solo se consulta el evento
+    with django_assert_num_queries(1):
+        assert snapshot(client, event.id).content == first.content
+
+    services.sell_tickets(Event.objects.get(pk=event.pk), 2)
+    _, version, ids = parse(snapshot(client, event.id).content)
+    assert len(ids) == 3
+
+    services.refund_ticket(services.get_ticket_by_id(ticket.id))
+    _, refunded_version, ids = parse(snapshot(client, event.id).content)
+    assert refunded_version > version
+    assert uuid.UUID(str(ticket.id)).bytes not in ids
+
+
+def test_snapshot_not_modified(db, client):
+    event = EventFactory()
+    TicketFactory(event=event)
+    etag = snapshot(client, event.id)["ETag"]
+
+    response = snapshot(client, event.id, if_none_match=etag)
+    assert response.status_code == 304
+
+    TicketFactory(event=event)
+    response = snapshot(client, event.id, if_none_match=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+def test_snapshot_unknown_event(db, client):
+    assert snapshot(client, uuid.uuid4()).status_code == 404
+
+
+def test_snapshot_of_sharded_event_changes_after_sale(db, client):
+    event = EventFactory(
+        start=date.today() + timedelta(days=10),
+        end=date.today() + timedelta(days=11),
+        total_tickets=10,
+    )
+    services.shard_inventory(event, 4)
+    services.sell_ticket(event)
+    etag = snapshot(client, event.id)["ETag"]
+
+    # La venta queda en las filas del inventario, y la lista la cuenta sin sumarla al evento
+    services.sell_ticket(event)
+    response = snapshot(client, event.id, if_none_match=etag)
+
+    assert response.status_code == 200
+    _, version, ids = parse(response.content)
+    assert len(ids) == 2
+    assert response["ETag"] == f'"{event.id}-{version}"'
+    assert InventorySlot.objects.filter(event=event).aggregate(Sum("sold")) == {
+        "sold__sum": 2
+    }
+
+    # Sumar las ventas al evento no cambia la versión de la lista
+    inventory.fold(event)
+    assert snapshot(client, event.id, if_none_match=response["ETag"]).status_code == 304
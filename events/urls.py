@@ -0,0 +1,16 @@
+from django.urls import path
+
+from events import views
+
+urlpatterns = [
+    path(
+        "<uuid:event_id>/tickets/export/",
+        views.export_tickets,
+        name="export_tickets",
+    ),
+    path(
+        "<uuid:event_id>/tickets/snapshot/",
+        views.ticket_snapshot,
+        name="ticket_snapshot",
+    ),
+]
@@ -0,0 +1,128 @@
+import csv
+import json
+import uuid
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from itertools import islice
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_GET
+from graphql import GraphQLError
+
+from events import inventory, services
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+REDEEMED_VALUES = {"true": True, "false": False}
+
+
+class Echo:
+    """
+    Objeto con la interfaz de un archivo que regresa lo que se escribe en él,
+    para que 'csv.writer' genere cada línea sin guardarla
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def format_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def csv_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(services.TICKET_EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([format_value(value) for value in row])
+
+
+def ndjson_lines(rows: Iterable[tuple]) -> Iterator[str]:
+    for row in rows:
+        values = (format_value(value) for value in row)
+        yield json.dumps(dict(zip(services.TICKET_EXPORT_FIELDS, values))) + "\n"
+
+
+def join_lines(lines: Iterator[str], size: int) -> Iterator[str]:
+    """
+    Agrupa las líneas en bloques de 'size' para no escribir la respuesta línea por línea
+    """
+    while chunk := "".join(islice(lines, size)):
+        yield chunk
+
+
+@require_GET
+def export_tickets(request, event_id):
+    """
+    Exporta los boletos de un evento como CSV (por defecto) o NDJSON con '?format=ndjson'.
+    Con '?redeemed=true' o '?redeemed=false' se exportan solo los canjeados o los pendientes.
+    La respuesta se genera mientras se envía, sin cargar todos los boletos en memoria.
+    """
+    export_format = request.GET.get("format", "csv")
+    if export_format not in EXPORT_CONTENT_TYPES:
+        return JsonResponse(
+            {"error": "El formato debe ser 'csv' o 'ndjson'"}, status=400
+        )
+
+    redeemed = request.GET.get("redeemed")
+    if redeemed is not None and redeemed not in REDEEMED_VALUES:
+        return JsonResponse(
+            {"error": "El valor de 'redeemed' debe ser 'true' o 'false'"}, status=400
+        )
+
+    try:
+        event = services.get_event_by_id(event_id)
+    except GraphQLError as e:
+        return JsonResponse({"error": e.message}, status=404)
+
+    rows = services.export_tickets(event, redeemed=REDEEMED_VALUES.get(redeemed))
+    lines = csv_lines(rows) if export_format == "csv" else ndjson_lines(rows)
+    response = StreamingHttpResponse(
+        join_lines(lines, settings.TICKET_EXPORT_CHUNK_SIZE),
+        content_type=EXPORT_CONTENT_TYPES[export_format],
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="boletos-{event.id}.{export_format}"'
+    )
+    return response
+
+
+@require_GET
+def ticket_snapshot(request, event_id):
+    """
+    Lista compacta de los boletos vendidos de un evento para que los lectores de acceso
+    los validen sin conexión (formato en 'services.build_ticket_snapshot').
+    El ETag corresponde a la versión de los boletos; con 'If-None-Match' se regresa 304
+    si no ha habido ventas ni reembolsos desde la última descarga.
+    """
+    try:
+        event = services.get_event_by_id(event_id)
+    except GraphQLError as e:
+        return JsonResponse({"error": e.message}, status=404)
+
+    if event.inventory_slots:
+        # Las ventas del inventario repartido cambian la versión sin sumarse al evento
+        event.total_sold_tickets, event.tickets_version = inventory.current_counters(
+            event
+        )
+    etag = f'"{event.id}-{event.tickets_version}"'
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = HttpResponse(
+        services.get_ticket_snapshot(event), content_type="application/octet-stream"
+    )
+    response["ETag"] = etag
+    response["Content-Disposition"] = (
+        f'attachment; filename="boletos-{event.id}-{event.tickets_version}.bin"'
+    )
+    return response
@@ -0,0 +1,239 @@
+"""
+Esquema de GraphQL para la vista asíncrona ('AsyncGraphQLView').
+Tiene los mismos tipos, campos y reglas de negocio que 'ticket_manager.schema', pero sus resolvers
+son corrutinas que usan el ORM asíncrono de Django, así que los campos hermanos de una consulta
+se resuelven de forma concurrente y el worker puede atender otras peticiones mientras espera
+a la base de datos.
+"""
+
+import graphene
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from events import analytics, redemption, services
+from ticket_manager.response_cache import ainvalidate_events
+from ticket_manager.schema import (
+    EVENTS_PAGE_SIZE,
+    CancelEvent,
+    ConfirmHold,
+    CreateEvent,
+    DeleteEvent,
+    HoldTickets,
+    Query,
+    RedeemTicket,
+    RedeemTickets,
+    RefundTicket,
+    ReleaseHold,
+    SellTicket,
+    SellTickets,
+    UpdateEvent,
+    alist,
+    build_events_connection,
+    events_connection_querysets,
+)
+
+
+class AsyncQuery(Query):
+    class Meta:
+        name = "Query"
+
+    async def resolve_events(root, info, **kwargs):
+        return await alist(Query.resolve_events(root, info, **kwargs))
+
+    async def resolve_events_connection(
+        root, info, first=EVENTS_PAGE_SIZE, after=None, **filters
+    ):
+        qs, page = events_connection_querysets(info, filters, first, after)
+        return build_events_connection(qs, await alist(page), first, after)
+
+    async def resolve_event(root, info, id):
+        return await services.aget_event_by_id(id)
+
+    async def resolve_event_analytics(root, info, id):
+        event = await services.aget_event_by_id(id)
+        return await analytics.aget_event_analytics(event)
+
+    async def resolve_tickets(root, info):
+        return await alist(Query.resolve_tickets(root, info))
+
+    async def resolve_tickets_by_event(root, info, event_id):
+        return await alist(Query.resolve_tickets_by_event(root, info, event_id))
+
+
+class AsyncCreateEvent(CreateEvent):
+    class Meta:
+        name = "CreateEvent"
+
+    async def mutate(self, info, name, start, end, total_tickets):
+        event = await services.acreate_event(name, start, end, total_tickets)
+        await ainvalidate_events(event.id)
+        return CreateEvent(event=event)
+
+
+class AsyncUpdateEvent(UpdateEvent):
+    class Meta:
+        name = "UpdateEvent"
+
+    async def mutate(self, info, id, name, start, end, total_tickets):
+        current_event = await services.aget_event_by_id(id)
+        event = await services.aupdate_event(
+            event=current_event,
+            name=name,
+            start=start,
+            end=end,
+            total_tickets=total_tickets,
+        )
+        await ainvalidate_events(event.id)
+        return UpdateEvent(ok=True, event=event)
+
+
+class AsyncDeleteEvent(DeleteEvent):
+    class Meta:
+        name = "DeleteEvent"
+
+    async def mutate(self, info, id):
+        event = await services.aget_event_by_id(id)
+        await services.adelete_event(event)
+        await ainvalidate_events(id)
+        return DeleteEvent(ok=True)
+
+
+class AsyncCancelEvent(CancelEvent):
+    class Meta:
+        name = "CancelEvent"
+
+    async def mutate(self, info, id, chunk_size=None, max_chunks=None):
+        event = await services.aget_event_by_id(id)
+        progress = await services.acancel_event(
+            event, chunk_size=chunk_size, max_chunks=max_chunks
+        )
+        await ainvalidate_events(event.id)
+        return CancelEvent(ok=True, event=event, **progress)
+
+
+class AsyncSellTicket(SellTicket):
+    class Meta:
+        name = "SellTicket"
+
+    async def mutate(self, info, event_id, idempotency_key=None):
+        if idempotency_key is not None:
+            # La llave y la venta se guardan en la misma transacción, que es síncrona
+            return await sync_to_async(SellTicket.mutate)(
+                self, info, event_id, idempotency_key
+            )
+        event = await services.aget_event_by_id(event_id)
+        ticket = await services.asell_ticket(event)
+        await ainvalidate_events(event.id)
+        return SellTicket(ok=True, ticket=ticket)
+
+
+class AsyncSellTickets(SellTickets):
+    class Meta:
+        name = "SellTickets"
+
+    async def mutate(self, info, event_id, quantity, idempotency_key=None):
+        if idempotency_key is not None:
+            return await sync_to_async(SellTickets.mutate)(
+                self, info, event_id, quantity, idempotency_key
+            )
+        event = await services.aget_event_by_id(event_id)
+        tickets = await services.asell_tickets(event, quantity)
+        await ainvalidate_events(event.id)
+        return SellTickets(ok=True, tickets=tickets)
+
+
+class AsyncHoldTickets(HoldTickets):
+    class Meta:
+        name = "HoldTickets"
+
+    async def mutate(self, info, event_id, quantity):
+        event = await services.aget_event_by_id(event_id)
+        hold = await services.ahold_tickets(event, quantity)
+        await ainvalidate_events(event.id)
+        return HoldTickets(ok=True, hold=hold)
+
+
+class AsyncConfirmHold(ConfirmHold):
+    class Meta:
+        name = "ConfirmHold"
+
+    async def mutate(self, info, hold_id):
+        hold = await services.aget_hold_by_id(hold_id)
+        tickets = await services.aconfirm_hold(hold)
+        await ainvalidate_events(hold.event_id)
+        return ConfirmHold(ok=True, tickets=tickets)
+
+
+class AsyncReleaseHold(ReleaseHold):
+    class Meta:
+        name = "ReleaseHold"
+
+    async def mutate(self, info, hold_id):
+        hold = await services.aget_hold_by_id(hold_id)
+        await services.arelease_hold(hold)
+        await ainvalidate_events(hold.event_id)
+        return ReleaseHold(ok=True)
+
+
+class AsyncRedeemTicket(RedeemTicket):
+    class Meta:
+        name = "RedeemTicket"
+
+    async def mutate(self, info, ticket_id):
+        if settings.REDEEM_GROUP_COMMIT:
+            ticket = await redemption.aredeem(ticket_id)
+        else:
+            ticket = await services.aget_ticket_by_id(ticket_id)
+            await services.aredeem_ticket(ticket)
+        await ainvalidate_events(ticket.event_id)
+        return RedeemTicket(ok=True, ticket=ticket)
+
+
+class AsyncRedeemTickets(RedeemTickets):
+    class Meta:
+        name = "RedeemTickets"
+
+    async def mutate(self, info, ticket_ids):
+        results = await services.aredeem_tickets(ticket_ids)
+        await ainvalidate_events(
+            *{result["event_id"] for result in results if result["ok"]}
+        )
+        return RedeemTickets(
+            ok=all(result["ok"] for result in results), results=results
+        )
+
+
+class AsyncRefundTicket(RefundTicket):
+    class Meta:
+        name = "RefundTicket"
+
+    async def mutate(self, info, ticket_id, idempotency_key=None):
+        if idempotency_key is not None:
+            return await sync_to_async(RefundTicket.mutate)(
+                self, info, ticket_id, idempotency_key
+            )
+        ticket = await services.aget_ticket_by_id(ticket_id)
+        await services.arefund_ticket(ticket)
+        await ainvalidate_events(ticket.event_id)
+        return RefundTicket(ok=True, ticket=ticket)
+
+
+class AsyncMutation(graphene.ObjectType):
+    class Meta:
+        name = "Mutation"
+
+    create_event = AsyncCreateEvent.Field()
+    update_event = AsyncUpdateEvent.Field()
+    delete_event = AsyncDeleteEvent.Field()
+    cancel_event = AsyncCancelEvent.Field()
+    sell_ticket = AsyncSellTicket.Field()
+    sell_tickets = AsyncSellTickets.Field()
+    hold_tickets = AsyncHoldTickets.Field()
+    confirm_hold = AsyncConfirmHold.Field()
+    release_hold = AsyncReleaseHold.Field()
+    redeem_ticket = AsyncRedeemTicket.Field()
+    redeem_tickets = AsyncRedeemTickets.Field()
+    refund_ticket = AsyncRefundTicket.Field()
+
+
+schema = graphene.Schema(query=AsyncQuery, mutation=AsyncMutation)
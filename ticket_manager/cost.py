@@ -0,0 +1,215 @@
+"""
+Análisis estático del costo y la profundidad de las operaciones de GraphQL.
+Se calcula una sola vez por documento, junto con el análisis y la validación,
+para rechazar las operaciones demasiado costosas antes de ejecutar cualquier consulta SQL.
+"""
+
+from dataclasses import dataclass
+
+from django.conf import settings
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLSchema,
+    IntValueNode,
+    OperationDefinitionNode,
+    OperationType,
+    VariableNode,
+    get_named_type,
+    get_nullable_type,
+    is_composite_type,
+    is_list_type,
+)
+
+from ticket_manager.schema import EVENTS_MAX_PAGE_SIZE, EVENTS_PAGE_SIZE
+
+# Costo de los campos que regresan objetos o listas; los escalares no tienen costo
+OBJECT_FIELD_COST = 1
+# Las mutaciones escriben en la base de datos, por eso cuestan más que una lectura
+MUTATION_FIELD_COST = 10
+
+
+@dataclass(frozen=True)
+class OperationCost:
+    cost: int
+    depth: int
+    # El costo depende de un 'first' con variable y se calculó sin conocerla
+    uses_variables: bool = False
+
+
+def field_cost(
+    parent_name: str,
+    field_name: str,
+    field_type,
+    root: bool,
+    operation: OperationType,
+) -> int:
+    """
+    Costo propio del campo, sin contar sus subcampos
+    """
+    overrides = settings.GRAPHQL_FIELD_COSTS
+    key = f"{parent_name}.{field_name}"
+    if key in overrides:
+        return overrides[key]
+    if root and operation == OperationType.MUTATION:
+        return MUTATION_FIELD_COST
+    return OBJECT_FIELD_COST if is_composite_type(get_named_type(field_type)) else 0
+
+
+def list_size(field: FieldNode, field_def, variables: dict | None) -> tuple[int, bool]:
+    """
+    Número de elementos que se esperan de un campo y si depende de una variable.
+    Es el argumento 'first' si se indicó, o el tamaño por defecto del campo.
+    Sin 'variables' un 'first' con variable vale el mayor tamaño que se acepta:
+    el máximo de una conexión o el tamaño por defecto de una lista, que se vuelve
+    a revisar con las variables de cada petición.
+    """
+    connection = "first" in field_def.args and not is_list_type(
+        get_nullable_type(field_def.type)
+    )
+    for argument in field.arguments:
+        if argument.name.value != "first":
+            continue
+        value = argument.value
+        # Un 'first' negativo no resta el costo de otros campos
+        if isinstance(value, IntValueNode):
+            return max(int(value.value), 0), False
+        if isinstance(value, VariableNode):
+            first = None if variables is None else variables.get(value.name.value)
+            if isinstance(first, int):
+                return max(first, 0), True
+            if variables is None:
+                if connection:
+                    return EVENTS_MAX_PAGE_SIZE, True
+                return settings.GRAPHQL_DEFAULT_LIST_SIZE, True
+
+    # 'edges' de una conexión ya se multiplicó con el 'first' de la conexión
+    if field.name.value == "edges":
+        return 1, False
+
+    if connection:
+        return EVENTS_PAGE_SIZE, False
+    if is_list_type(get_nullable_type(field_def.type)):
+        return settings.GRAPHQL_DEFAULT_LIST_SIZE, False
+    return 1, False
+
+
+def selection_cost(
+    schema: GraphQLSchema,
+    parent_type,
+    selection_set,
+    fragments: dict[str, FragmentDefinitionNode],
+    operation: OperationType,
+    variables: dict | None,
+    root: bool = False,
+) -> OperationCost:
+    """
+    Suma el costo de una selección; el de cada campo es su costo propio
+    más el de sus subcampos multiplicado por el número de elementos esperados
+    """
+    cost = 0
+    depth = 0
+    uses_variables = False
+
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            name = selection.name.value
+            # Se ignoran los campos de introspección como '__typename' o '__schema'
+            if name.startswith("__"):
+                continue
+
+            field_def = parent_type.fields[name]
+            own_cost = field_cost(
+                parent_type.name, name, field_def.type, root, operation
+            )
+            cost += own_cost
+            if selection.selection_set:
+                # La profundidad cuenta solo los campos con subcampos
+                children = selection_cost(
+                    schema,
+                    get_named_type(field_def.type),
+                    selection.selection_set,
+                    fragments,
+                    operation,
+                    variables,
+                )
+                size, size_uses_variables = list_size(selection, field_def, variables)
+                cost += size * children.cost
+                depth = max(depth, children.depth + 1)
+                uses_variables = (
+                    uses_variables or size_uses_variables or children.uses_variables
+                )
+            continue
+
+        if isinstance(selection, FragmentSpreadNode):
+            fragment = fragments[selection.name.value]
+        else:
+            fragment = selection
+
+        fragment_type = parent_type
+        if fragment.type_condition:
+            fragment_type = schema.get_type(fragment.type_condition.name.value)
+        nested = selection_cost(
+            schema,
+            fragment_type,
+            fragment.selection_set,
+            fragments,
+            operation,
+            variables,
+            root,
+        )
+        cost += nested.cost
+        depth = max(depth, nested.depth)
+        uses_variables = uses_variables or nested.uses_variables
+
+    return OperationCost(cost=cost, depth=depth, uses_variables=uses_variables)
+
+
+def analyze_document(
+    schema: GraphQLSchema, document: DocumentNode, variables: dict | None = None
+) -> dict[str | None, OperationCost]:
+    """
+    Calcula el costo y la profundidad de cada operación del documento, por nombre de operación.
+    El documento debe estar validado contra el esquema. Sin 'variables' se supone el peor
+    caso de los 'first' con variable y se marca el costo con 'uses_variables'.
+    """
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    costs = {}
+    for definition in document.definitions:
+        if not isinstance(definition, OperationDefinitionNode):
+            continue
+        root_type = schema.get_root_type(definition.operation)
+        name = definition.name.value if definition.name else None
+        costs[name] = selection_cost(
+            schema,
+            root_type,
+            definition.selection_set,
+            fragments,
+            definition.operation,
+            variables,
+            root=True,
+        )
+    return costs
+
+
+def check_cost(operation_cost: OperationCost) -> str | None:
+    """
+    Regresa el motivo por el que se rechaza la operación, o None si está dentro de los límites
+    """
+    if operation_cost.depth > settings.GRAPHQL_MAX_QUERY_DEPTH:
+        return (
+            "La consulta excede la profundidad máxima permitida "
+            f"({operation_cost.depth} > {settings.GRAPHQL_MAX_QUERY_DEPTH})"
+        )
+    if operation_cost.cost > settings.GRAPHQL_MAX_QUERY_COST:
+        return (
+            "La consulta excede el costo máximo permitido "
+            f"({operation_cost.cost} > {settings.GRAPHQL_MAX_QUERY_COST})"
+        )
+    return None
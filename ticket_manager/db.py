@@ -0,0 +1,14 @@
+from django.db import connections
+
+
+def pool_stats() -> dict[str, dict]:
+    """
+    Obtiene las estadísticas del pool de conexiones de cada base de datos que lo tiene activado:
+    conexiones abiertas y disponibles, peticiones en espera, tiempos de espera, etc.
+    """
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        if pool is not None:
+            stats[alias] = pool.get_stats()
+    return stats
@@ -0,0 +1,290 @@
+"""
+Métricas de las peticiones de GraphQL en el formato de texto de Prometheus.
+Cada petición registra su operación, el número y el tiempo de sus consultas SQL,
+su tiempo total y sus errores. Los valores se guardan en memoria por proceso,
+así que con varios procesos Prometheus debe consultar cada uno.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+# Límite de nombres de operación distintos, los clientes pueden enviar cualquier nombre
+MAX_OPERATION_LABELS = 200
+OTHER_OPERATION = "other"
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in labels.values()
+    )
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(labels, escaped))
+    return "{" + pairs + "}"
+
+
+def format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, value: float = 1, **labels) -> None:
+        key = tuple(labels.items())
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def collect(self) -> list[str]:
+        with self.lock:
+            values = dict(self.values)
+        return self.header() + [
+            f"{self.name}{format_labels(dict(key))} {format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple):
+        super().__init__(name, help)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.items())
+        with self.lock:
+            counts, total, count = self.values.get(key, ([0] * len(self.buckets), 0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value, count + 1)
+
+    def collect(self) -> list[str]:
+        with self.lock:
+            values = {
+                key: (list(counts), total, count)
+                for key, (counts, total, count) in self.values.items()
+            }
+        lines = self.header()
+        for key, (counts, total, count) in sorted(values.items()):
+            labels = dict(key)
+            for bound, bucket_count in zip(self.buckets, counts):
+                bucket = format_labels({**labels, "le": format_value(float(bound))})
+                lines.append(f"{self.name}_bucket{bucket} {bucket_count}")
+            bucket = format_labels({**labels, "le": "+Inf"})
+            lines.append(f"{self.name}_bucket{bucket} {count}")
+            lines.append(
+                f"{self.name}_sum{format_labels(labels)} {format_value(total)}"
+            )
+            lines.append(f"{self.name}_count{format_labels(labels)} {count}")
+        return lines
+
+
+def samples(type: str, name: str, help: str, values: dict[tuple, float]) -> list[str]:
+    """
+    Líneas de una métrica con valores que se obtienen al momento de consultarla
+    """
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {type}"]
+    for key, value in sorted(values.items()):
+        lines.append(f"{name}{format_labels(dict(key))} {format_value(value)}")
+    return lines
+
+
+def gauge(name: str, help: str, values: dict[tuple, float]) -> list[str]:
+    return samples("gauge", name, help, values)
+
+
+def counter(name: str, help: str, values: dict[tuple, float]) -> list[str]:
+    """
+    Líneas de un contador que ya se lleva en otro lugar, como los de las caches.
+    Prometheus espera que su nombre termine en '_total'.
+    """
+    return samples("counter", name, help, values)
+
+
+REQUESTS = Counter(
+    "graphql_requests_total", "Peticiones de GraphQL por operación y resultado"
+)
+REQUEST_DURATION = Histogram(
+    "graphql_request_duration_seconds",
+    "Tiempo de ejecución de las operaciones de GraphQL",
+    DURATION_BUCKETS,
+)
+SQL_QUERIES = Histogram(
+    "graphql_sql_queries",
+    "Consultas SQL por operación de GraphQL",
+    QUERY_COUNT_BUCKETS,
+)
+SQL_DURATION = Histogram(
+    "graphql_sql_duration_seconds",
+    "Tiempo de las consultas SQL por operación de GraphQL",
+    DURATION_BUCKETS,
+)
+ERRORS = Counter("graphql_errors_total", "Errores de GraphQL por operación")
+METRICS = [REQUESTS, REQUEST_DURATION, SQL_QUERIES, SQL_DURATION, ERRORS]
+
+
+@dataclass
+class RequestMetrics:
+    operation: str = "unknown"
+    operation_type: str = "unknown"
+    sql_queries: int = 0
+    sql_seconds: float = 0
+    errors: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    duration: float = 0
+
+    def as_extension(self) -> dict:
+        return {
+            "operation": self.operation,
+            "sqlQueries": self.sql_queries,
+            "sqlTimeMs": round(self.sql_seconds * 1000, 2),
+            "totalTimeMs": round((time.perf_counter() - self.started) * 1000, 2),
+            "errors": self.errors,
+        }
+
+
+current_request: ContextVar[RequestMetrics | None] = ContextVar(
+    "graphql_request_metrics", default=None
+)
+operation_labels = set()
+operation_labels_lock = threading.Lock()
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    'execute_wrapper' que suma las consultas SQL a la petición de GraphQL en curso.
+    La petición se toma de una ContextVar, que 'sync_to_async' copia a los hilos
+    donde la vista asíncrona ejecuta las consultas.
+    """
+    metrics = current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_queries += 1
+        metrics.sql_seconds += time.perf_counter() - started
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+def operation_label(operation_ast) -> str:
+    """
+    Nombre de la operación para las métricas, o los campos raíz si no tiene nombre
+    """
+    if operation_ast is None:
+        return "unknown"
+    if operation_ast.name:
+        label = operation_ast.name.value
+    else:
+        label = "+".join(
+            sorted(
+                {
+                    selection.name.value
+                    for selection in operation_ast.selection_set.selections
+                    if hasattr(selection, "name")
+                }
+            )
+        )
+
+    with operation_labels_lock:
+        if label in operation_labels:
+            return label
+        if len(operation_labels) >= MAX_OPERATION_LABELS:
+            return OTHER_OPERATION
+        operation_labels.add(label)
+        return label
+
+
+def set_operation(operation_ast) -> None:
+    """
+    Indica la operación de la petición en curso, una vez que se analizó el documento
+    """
+    metrics = current_request.get()
+    if metrics is not None:
+        metrics.operation = operation_label(operation_ast)
+        if operation_ast is not None:
+            metrics.operation_type = operation_ast.operation.value
+
+
+def finish_result(metrics: RequestMetrics, result):
+    """
+    Cuenta los errores del resultado y, con 'GRAPHQL_RESPONSE_METRICS',
+    agrega las métricas de la petición en 'extensions'
+    """
+    if result is None:
+        return result
+    metrics.errors = len(result.errors or [])
+    if settings.GRAPHQL_RESPONSE_METRICS:
+        extensions = result.extensions or {}
+        result.extensions = {**extensions, "metrics": metrics.as_extension()}
+    return result
+
+
+@contextmanager
+def measure_request():
+    """
+    Mide la petición de GraphQL del bloque y la agrega a las métricas al terminar
+    """
+    metrics = RequestMetrics()
+    token = current_request.set(metrics)
+    try:
+        yield metrics
+    except BaseException:
+        metrics.errors = max(metrics.errors, 1)
+        raise
+    finally:
+        current_request.reset(token)
+        metrics.duration = time.perf_counter() - metrics.started
+        labels = {"operation": metrics.operation, "type": metrics.operation_type}
+        status = "error" if metrics.errors else "ok"
+        REQUESTS.inc(**labels, status=status)
+        REQUEST_DURATION.observe(metrics.duration, **labels)
+        SQL_QUERIES.observe(metrics.sql_queries, **labels)
+        SQL_DURATION.observe(metrics.sql_seconds, **labels)
+        if metrics.errors:
+            ERRORS.inc(metrics.errors, **labels)
+
+
+def render(*extra: list[str]) -> str:
+    """
+    Texto de todas las métricas en el formato de exposición de Prometheus
+    """
+    lines = []
+    for metric in METRICS:
+        lines += metric.collect()
+    for metric_lines in extra:
+        lines += metric_lines
+    return "\n".join(lines) + "\n"
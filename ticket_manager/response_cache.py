@@ -0,0 +1,162 @@
+"""
+Cache de respuestas de las consultas de solo lectura de eventos.
+Cada respuesta se guarda con la versión de los eventos de los que depende:
+'event(id)' depende de la versión de ese evento y los listados de la versión del listado.
+Las mutaciones cambian esas versiones, así que solo se invalidan las respuestas afectadas.
+Las respuestas vencidas se siguen sirviendo durante 'GRAPHQL_RESPONSE_CACHE_STALE_TTL'
+mientras una sola petición las vuelve a calcular.
+"""
+
+import hashlib
+import json
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from graphql import FieldNode, OperationDefinitionNode, OperationType, VariableNode
+
+# Campos raíz cuyas respuestas se pueden guardar en la cache
+LIST_FIELDS = {"events", "eventsConnection"}
+EVENT_FIELD = "event"
+
+LIST_VERSION_KEY = "graphql:version:events"
+KEY_PREFIX = "graphql:response:"
+LOCK_PREFIX = "graphql:refresh:"
+
+
+def event_version_key(event_id) -> str:
+    """
+    Llave de versión del evento. El id se normaliza porque GraphQL acepta el mismo UUID
+    escrito de varias formas; lanza ValueError si no es un UUID.
+    """
+    return f"graphql:version:event:{uuid.UUID(str(event_id))}"
+
+
+def get_versions(keys: list[str]) -> dict[str, str]:
+    """
+    Obtiene la versión actual de cada llave, creándola si no existe
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            versions[key] = cache.get(key)
+    return versions
+
+
+def invalidate_events(*event_ids) -> None:
+    """
+    Invalida las respuestas que dependen de los eventos indicados y de los listados de eventos.
+    Se ejecuta después del commit para que nadie vuelva a guardar datos anteriores.
+    """
+    keys = [LIST_VERSION_KEY, *(event_version_key(event_id) for event_id in event_ids)]
+
+    def bump():
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+# 'transaction.on_commit' usa la conexión, que solo se puede usar desde código síncrono
+ainvalidate_events = sync_to_async(invalidate_events)
+
+
+def dependencies(
+    operation: OperationDefinitionNode, variables: dict | None
+) -> list[str] | None:
+    """
+    Obtiene las llaves de versión de las que depende la operación,
+    o None si la operación no se puede guardar en la cache
+    """
+    if operation.operation != OperationType.QUERY:
+        return None
+
+    keys = set()
+    for selection in operation.selection_set.selections:
+        if not isinstance(selection, FieldNode):
+            return None
+        name = selection.name.value
+        if name == "__typename":
+            continue
+        if name in LIST_FIELDS:
+            keys.add(LIST_VERSION_KEY)
+        elif name == EVENT_FIELD:
+            argument = next(a for a in selection.arguments if a.name.value == "id")
+            value = argument.value
+            if isinstance(value, VariableNode):
+                event_id = (variables or {}).get(value.name.value)
+            else:
+                event_id = value.value
+            try:
+                keys.add(event_version_key(event_id))
+            except ValueError:
+                # El id no es válido y la consulta regresa un error que no se guarda
+                return None
+        else:
+            return None
+    return sorted(keys)
+
+
+def response_key(document_hash: str, operation_name, variables, versions: dict) -> str:
+    payload = json.dumps(
+        [document_hash, operation_name, variables, versions],
+        sort_keys=True,
+        default=str,
+    )
+    return KEY_PREFIX + hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Busca y guarda la respuesta de una operación. 'lookup' regresa los datos en cache,
+    o None cuando la petición actual debe ejecutar la operación y luego llamar a 'store'.
+    """
+
+    hits = 0
+    stale_hits = 0
+    misses = 0
+
+    def __init__(self, document_hash, operation, operation_name, variables):
+        self.key = None
+        keys = dependencies(operation, variables)
+        if keys is None or not settings.GRAPHQL_RESPONSE_CACHE_TTL:
+            return
+        versions = get_versions(keys)
+        self.key = response_key(document_hash, operation_name, variables, versions)
+
+    @property
+    def enabled(self) -> bool:
+        return self.key is not None
+
+    def lookup(self):
+        if not self.enabled:
+            return None
+
+        entry = cache.get(self.key)
+        if entry is None:
+            ResponseCache.misses += 1
+            return None
+
+        if entry["fresh_until"] > time.time():
+            ResponseCache.hits += 1
+            return entry["data"]
+
+        # Respuesta vencida: solo la petición que obtiene el candado la vuelve a calcular
+        lock_timeout = settings.GRAPHQL_RESPONSE_CACHE_STALE_TTL
+        if cache.add(LOCK_PREFIX + self.key, 1, timeout=lock_timeout):
+            ResponseCache.misses += 1
+            return None
+        ResponseCache.stale_hits += 1
+        return entry["data"]
+
+    def store(self, data) -> None:
+        if not self.enabled:
+            return
+        ttl = settings.GRAPHQL_RESPONSE_CACHE_TTL
+        entry = {"data": data, "fresh_until": time.time() + ttl}
+        timeout = ttl + settings.GRAPHQL_RESPONSE_CACHE_STALE_TTL
+        cache.set(self.key, entry, timeout=timeout)
+        cache.delete(LOCK_PREFIX + self.key)
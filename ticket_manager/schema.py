@@ -1,8 +1,75 @@
+import asyncio
+import base64
+import binascii
+import uuid
+from datetime import date
+
 import graphene
+from django.conf import settings
+from django.db.models import QuerySet
 from graphene_django.types import DjangoObjectType
-
-from events.models import Event, Ticket
-from events import services
+from graphql import FieldNode, FragmentSpreadNode, GraphQLError
+
+from events.models import (
+    Event,
+    EventDailySales,
+    EventHourlyRedemptions,
+    Ticket,
+    TicketHold,
+)
+from events import analytics, idempotency, inventory, redemption, services
+from ticket_manager.response_cache import invalidate_events
+
+
+def selected_fields(info, *path: str) -> set[str]:
+    """
+    Obtiene los nombres de los campos que se pidieron dentro del campo que se está resolviendo,
+    o dentro de la ruta 'path' de subcampos, para cargar de antemano solo las relaciones que se van a usar
+    """
+
+    def collect(selection_set, fields):
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                fields.append(selection)
+            elif isinstance(selection, FragmentSpreadNode):
+                collect(info.fragments[selection.name.value].selection_set, fields)
+            else:
+                collect(selection.selection_set, fields)
+        return fields
+
+    nodes = list(info.field_nodes)
+    for name in (*path, None):
+        fields = []
+        for node in nodes:
+            if node.selection_set:
+                collect(node.selection_set, fields)
+        if name is None:
+            return {field.name.value for field in fields}
+        nodes = [field for field in fields if field.name.value == name]
+
+
+def in_event_loop() -> bool:
+    """
+    Indica si la consulta se ejecuta en la vista asíncrona, donde el ORM
+    solo se puede usar con sus métodos asíncronos
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+async def alist(qs: QuerySet) -> list:
+    """
+    Evalúa un queryset con el ORM asíncrono
+    """
+    return [obj async for obj in qs]
+
+
+async def total_sold(counters) -> int:
+    sold, _ = await counters
+    return sold
 
 
 class TicketType(DjangoObjectType):
@@ -27,38 +94,192 @@ class EventType(DjangoObjectType):
             "total_tickets",
             "total_sold_tickets",
             "total_redeemed_tickets",
+            "cancelled_at",
         )
 
+    def resolve_total_sold_tickets(self, info):
+        if not self.inventory_slots:
+            return self.total_sold_tickets
+        # Las ventas del inventario repartido que aún no se suman al evento
+        if in_event_loop():
+            return total_sold(inventory.acurrent_counters(self))
+        return inventory.current_counters(self)[0]
+
     def resolve_tickets(self, info):
-        return Ticket.objects.filter(event=self)
+        # Usa los boletos precargados por 'Query.resolve_events' cuando existen
+        tickets = self.ticket_set.all()
+        if in_event_loop():
+            return alist(tickets)
+        return tickets
+
+
+class TicketHoldType(DjangoObjectType):
+    class Meta:
+        model = TicketHold
+        fields = ("id", "event", "quantity", "expires_at")
+
+
+class DailySalesType(DjangoObjectType):
+    class Meta:
+        model = EventDailySales
+        fields = ("day", "sold", "refunded")
+
+
+class HourlyRedemptionsType(DjangoObjectType):
+    class Meta:
+        model = EventHourlyRedemptions
+        fields = ("hour", "redeemed")
+
+
+class EventAnalyticsType(graphene.ObjectType):
+    event = graphene.Field(EventType)
+    sell_through_rate = graphene.Float()
+    sales_per_day = graphene.List(DailySalesType)
+    redemptions_per_hour = graphene.List(HourlyRedemptionsType)
+
+
+class EventSearchMode(graphene.Enum):
+    CONTAINS = services.SEARCH_CONTAINS
+    FULL_TEXT = services.SEARCH_FULL_TEXT
+
+
+class EventConnection(graphene.relay.Connection):
+    total_count = graphene.Int()
+
+    class Meta:
+        node = EventType
+
+    def resolve_total_count(self, info):
+        # Solo se cuenta cuando el cliente pide 'totalCount'
+        if in_event_loop():
+            return self.queryset.acount()
+        return self.queryset.count()
+
+
+EVENTS_PAGE_SIZE = 20
+EVENTS_MAX_PAGE_SIZE = 100
+
+
+def encode_event_cursor(event: Event) -> str:
+    """
+    Codifica la posición del evento en el orden (start, id) como cursor opaco
+    """
+    value = f"{event.start.isoformat()}|{event.id}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_event_cursor(cursor: str) -> tuple[date, uuid.UUID]:
+    """
+    Obtiene la fecha de inicio y el id de un cursor generado por 'encode_event_cursor'
+    """
+    try:
+        start, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return date.fromisoformat(start), uuid.UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise GraphQLError("El cursor proporcionado no es válido")
+
+
+def event_filter_arguments() -> dict:
+    """
+    Argumentos de los filtros de 'services.filter_events', comunes a 'events' y 'eventsConnection'
+    """
+    return {
+        "search": graphene.String(),
+        "search_mode": EventSearchMode(),
+        "upcoming": graphene.Boolean(description="Solo eventos que aún no comienzan"),
+        "active_on": graphene.Date(
+            description="Solo eventos que comenzaron y no han terminado en la fecha"
+        ),
+        "from_date": graphene.Date(
+            description="Solo eventos que terminan en esta fecha o después"
+        ),
+        "to_date": graphene.Date(
+            description="Solo eventos que comienzan en esta fecha o antes"
+        ),
+        "hide_sold_out": graphene.Boolean(
+            description="Omite los eventos sin boletos disponibles"
+        ),
+    }
+
+
+def events_connection_querysets(
+    info, filters: dict, first: int, after: str | None
+) -> tuple[QuerySet[Event], QuerySet[Event]]:
+    """
+    Construye el queryset de todos los eventos que cumplen con los filtros
+    y el de la página pedida, que incluye un evento de más para saber si hay otra página
+    """
+    if first <= 0 or first > EVENTS_MAX_PAGE_SIZE:
+        raise GraphQLError(
+            f"El valor de 'first' debe estar entre 1 y {EVENTS_MAX_PAGE_SIZE}"
+        )
+
+    # El cursor sigue el orden (start, id), por eso aquí no se ordena por relevancia
+    qs = services.filter_events(**filters).order_by("start", "id")
+    page = qs
+
+    if after:
+        # Paginación por llave: sigue el índice (start, id) sin importar la profundidad
+        start, id = decode_event_cursor(after)
+        page = page.filter(start__gte=start).exclude(start=start, id__lte=id)
+
+    if "tickets" in selected_fields(info, "edges", "node"):
+        page = page.prefetch_related("ticket_set")
+
+    return qs, page[: first + 1]
+
+
+def build_events_connection(
+    qs: QuerySet[Event], events: list[Event], first: int, after: str | None
+) -> EventConnection:
+    """
+    Construye la conexión a partir de los eventos de la página ya evaluados
+    """
+    edges = [
+        EventConnection.Edge(node=event, cursor=encode_event_cursor(event))
+        for event in events[:first]
+    ]
+    connection = EventConnection(
+        edges=edges,
+        page_info=graphene.relay.PageInfo(
+            has_next_page=len(events) > first,
+            has_previous_page=after is not None,
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+    )
+    connection.queryset = qs
+    return connection
 
 
 class Query(graphene.ObjectType):
     events = graphene.List(
         EventType,
-        search=graphene.String(),
+        **event_filter_arguments(),
         first=graphene.Int(),
         skip=graphene.Int(),
     )
+    events_connection = graphene.Field(
+        EventConnection,
+        **event_filter_arguments(),
+        first=graphene.Int(),
+        after=graphene.String(),
+    )
     event = graphene.Field(EventType, id=graphene.UUID(required=True))
     tickets = graphene.List(TicketType)
-    tickets_by_event = graphene.Field(
+    tickets_by_event = graphene.List(
         TicketType,
         event_id=graphene.UUID(required=True),
     )
+    event_analytics = graphene.Field(
+        EventAnalyticsType, id=graphene.UUID(required=True)
+    )
 
-    def resolve_events(
-        root,
-        info,
-        search=None,
-        first=None,
-        skip=None,
-        **kwargs,
-    ):
-        qs = Event.objects.all()
+    def resolve_events(root, info, first=None, skip=None, **filters):
+        qs = services.filter_events(**filters)
 
-        if search:
-            qs = qs.filter(name__icontains=search)
+        if "tickets" in selected_fields(info):
+            qs = qs.prefetch_related("ticket_set")
 
         if skip:
             qs = qs[skip:]
@@ -68,15 +289,30 @@ class Query(graphene.ObjectType):
 
         return qs
 
+    def resolve_events_connection(
+        root, info, first=EVENTS_PAGE_SIZE, after=None, **filters
+    ):
+        qs, page = events_connection_querysets(info, filters, first, after)
+        return build_events_connection(qs, list(page), first, after)
+
     def resolve_event(root, info, id):
         return services.get_event_by_id(id)
 
+    def resolve_event_analytics(root, info, id):
+        return analytics.get_event_analytics(services.get_event_by_id(id))
+
     def resolve_tickets(root, info):
-        return Ticket.objects.all()
+        qs = Ticket.objects.all()
+        if "event" in selected_fields(info):
+            qs = qs.select_related("event")
+        return qs
 
     def resolve_tickets_by_event(root, info, event_id):
         try:
-            return Ticket.objects.filter(event__id=event_id)
+            qs = Ticket.objects.filter(event__id=event_id)
+            if "event" in selected_fields(info):
+                qs = qs.select_related("event")
+            return qs
         except Ticket.DoesNotExist:
             return None
 
@@ -92,6 +328,7 @@ class CreateEvent(graphene.Mutation):
 
     def mutate(self, info, name, start, end, total_tickets):
         event = services.create_event(name, start, end, total_tickets)
+        invalidate_events(event.id)
         return CreateEvent(event=event)
 
 
@@ -115,6 +352,7 @@ class UpdateEvent(graphene.Mutation):
             end=end,
             total_tickets=total_tickets,
         )
+        invalidate_events(event.id)
         return UpdateEvent(ok=True, event=event)
 
 
@@ -127,9 +365,30 @@ class DeleteEvent(graphene.Mutation):
     def mutate(self, info, id):
         event = services.get_event_by_id(id)
         services.delete_event(event)
+        invalidate_events(id)
         return DeleteEvent(ok=True)
 
 
+class CancelEvent(graphene.Mutation):
+    ok = graphene.Boolean()
+    event = graphene.Field(EventType)
+    refunded = graphene.Int()
+    remaining = graphene.Int()
+
+    class Arguments:
+        id = graphene.UUID(required=True)
+        chunk_size = graphene.Int()
+        max_chunks = graphene.Int()
+
+    def mutate(self, info, id, chunk_size=None, max_chunks=None):
+        event = services.get_event_by_id(id)
+        progress = services.cancel_event(
+            event, chunk_size=chunk_size, max_chunks=max_chunks
+        )
+        invalidate_events(event.id)
+        return CancelEvent(ok=True, event=event, **progress)
+
+
 class SellTicket(graphene.Mutation):
     ok = graphene.Boolean()
     ticket = graphene.Field(TicketType)
@@ -137,13 +396,88 @@ class SellTicket(graphene.Mutation):
 
     class Arguments:
         event_id = graphene.UUID(required=True)
+        idempotency_key = graphene.String()
 
-    def mutate(self, info, event_id):
-        event = services.get_event_by_id(event_id)
-        ticket = services.sell_ticket(event)
+    def mutate(self, info, event_id, idempotency_key=None):
+        def sell():
+            event = services.get_event_by_id(event_id)
+            ticket = services.sell_ticket(event)
+            invalidate_events(event.id)
+            return [ticket]
+
+        [ticket] = idempotency.run(
+            idempotency_key, "sellTicket", {"event_id": event_id}, sell
+        )
         return SellTicket(ok=True, ticket=ticket)
 
 
+class SellTickets(graphene.Mutation):
+    ok = graphene.Boolean()
+    tickets = graphene.List(TicketType)
+
+    class Arguments:
+        event_id = graphene.UUID(required=True)
+        quantity = graphene.Int(required=True)
+        idempotency_key = graphene.String()
+
+    def mutate(self, info, event_id, quantity, idempotency_key=None):
+        def sell():
+            event = services.get_event_by_id(event_id)
+            tickets = services.sell_tickets(event, quantity)
+            invalidate_events(event.id)
+            return tickets
+
+        tickets = idempotency.run(
+            idempotency_key,
+            "sellTickets",
+            {"event_id": event_id, "quantity": quantity},
+            sell,
+        )
+        return SellTickets(ok=True, tickets=tickets)
+
+
+class HoldTickets(graphene.Mutation):
+    ok = graphene.Boolean()
+    hold = graphene.Field(TicketHoldType)
+
+    class Arguments:
+        event_id = graphene.UUID(required=True)
+        quantity = graphene.Int(required=True)
+
+    def mutate(self, info, event_id, quantity):
+        event = services.get_event_by_id(event_id)
+        hold = services.hold_tickets(event, quantity)
+        invalidate_events(event.id)
+        return HoldTickets(ok=True, hold=hold)
+
+
+class ConfirmHold(graphene.Mutation):
+    ok = graphene.Boolean()
+    tickets = graphene.List(TicketType)
+
+    class Arguments:
+        hold_id = graphene.UUID(required=True)
+
+    def mutate(self, info, hold_id):
+        hold = services.get_hold_by_id(hold_id)
+        tickets = services.confirm_hold(hold)
+        invalidate_events(hold.event_id)
+        return ConfirmHold(ok=True, tickets=tickets)
+
+
+class ReleaseHold(graphene.Mutation):
+    ok = graphene.Boolean()
+
+    class Arguments:
+        hold_id = graphene.UUID(required=True)
+
+    def mutate(self, info, hold_id):
+        hold = services.get_hold_by_id(hold_id)
+        services.release_hold(hold)
+        invalidate_events(hold.event_id)
+        return ReleaseHold(ok=True)
+
+
 class RedeemTicket(graphene.Mutation):
     ok = graphene.Boolean()
     ticket = graphene.Field(TicketType)
@@ -152,21 +486,55 @@ class RedeemTicket(graphene.Mutation):
         ticket_id = graphene.UUID(required=True)
 
     def mutate(self, info, ticket_id):
-        ticket = services.get_ticket_by_id(ticket_id)
-        services.redeem_ticket(ticket)
+        if settings.REDEEM_GROUP_COMMIT:
+            ticket = redemption.redeem(ticket_id)
+        else:
+            ticket = services.get_ticket_by_id(ticket_id)
+            services.redeem_ticket(ticket)
+        invalidate_events(ticket.event_id)
         return RedeemTicket(ok=True, ticket=ticket)
 
 
+class RedeemTicketResult(graphene.ObjectType):
+    ticket_id = graphene.UUID()
+    ok = graphene.Boolean()
+    error = graphene.String()
+
+
+class RedeemTickets(graphene.Mutation):
+    ok = graphene.Boolean()
+    results = graphene.List(RedeemTicketResult)
+
+    class Arguments:
+        ticket_ids = graphene.List(graphene.NonNull(graphene.UUID), required=True)
+
+    def mutate(self, info, ticket_ids):
+        results = services.redeem_tickets(ticket_ids)
+        invalidate_events(*{result["event_id"] for result in results if result["ok"]})
+        return RedeemTickets(
+            ok=all(result["ok"] for result in results), results=results
+        )
+
+
 class RefundTicket(graphene.Mutation):
     ok = graphene.Boolean()
     ticket = graphene.Field(TicketType)
 
     class Arguments:
         ticket_id = graphene.UUID(required=True)
-
-    def mutate(self, info, ticket_id):
-        ticket = services.get_ticket_by_id(ticket_id)
-        services.refund_ticket(ticket)
+        idempotency_key = graphene.String()
+
+    def mutate(self, info, ticket_id, idempotency_key=None):
+        def refund():
+            ticket = services.get_ticket_by_id(ticket_id)
+            services.refund_ticket(ticket)
+            invalidate_events(ticket.event_id)
+            return [ticket]
+
+        # El reintento de un reembolso ya hecho regresa el boleto que se reembolsó
+        [ticket] = idempotency.run(
+            idempotency_key, "refundTicket", {"ticket_id": ticket_id}, refund
+        )
         return RefundTicket(ok=True, ticket=ticket)
 
 
@@ -174,8 +542,14 @@ class Mutation(graphene.ObjectType):
     create_event = CreateEvent.Field()
     update_event = UpdateEvent.Field()
     delete_event = DeleteEvent.Field()
+    cancel_event = CancelEvent.Field()
     sell_ticket = SellTicket.Field()
+    sell_tickets = SellTickets.Field()
+    hold_tickets = HoldTickets.Field()
+    confirm_hold = ConfirmHold.Field()
+    release_hold = ReleaseHold.Field()
     redeem_ticket = RedeemTicket.Field()
+    redeem_tickets = RedeemTickets.Field()
     refund_ticket = RefundTicket.Field()
 
 
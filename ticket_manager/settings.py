@@ -43,6 +43,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "graphene_django",
     "events",
 ]
@@ -92,6 +93,36 @@ DATABASES = {
     },
 }
 
+# Conexiones a la base de datos
+# https://docs.djangoproject.com/en/5.1/ref/databases/#connection-pool
+# Con DB_POOL cada proceso mantiene un pool de psycopg 3 y las peticiones toman una conexión
+# ya abierta en lugar de conectarse a PostgreSQL cada vez.
+# Sin pool, DB_CONN_MAX_AGE mantiene abierta la conexión de cada hilo entre peticiones.
+# En ambos casos se revisa la conexión antes de usarla y se descartan las que el servidor cerró.
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = env.bool(
+    "DB_CONN_HEALTH_CHECKS", default=True
+)
+if env.bool("DB_POOL", default=False):
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": env.int("DB_POOL_MIN_SIZE", default=2),
+            # Debe ser al menos el número de hilos que atienden peticiones en el proceso
+            "max_size": env.int("DB_POOL_MAX_SIZE", default=10),
+            # Segundos que una petición espera una conexión libre antes de fallar
+            "timeout": env.float("DB_POOL_TIMEOUT", default=10),
+            # Segundos que se conserva una conexión sin uso por encima de 'min_size'
+            "max_idle": env.float("DB_POOL_MAX_IDLE", default=600),
+            "max_lifetime": env.float("DB_POOL_MAX_LIFETIME", default=3600),
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = env.int("DB_CONN_MAX_AGE", default=0)
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# En producción se debe usar una cache compartida entre procesos, por ejemplo redis://
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -127,5 +158,62 @@ MEDIA_URL = "/media/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Máximo de boletos que se pueden canjear en una sola llamada a 'redeemTickets'
+REDEEM_TICKETS_MAX_BATCH = env.int("REDEEM_TICKETS_MAX_BATCH", default=100)
+
+# Canje con commit agrupado: los canjes de cada proceso se guardan por lotes
+# cada REDEEM_GROUP_COMMIT_INTERVAL_MS milisegundos (ver events/redemption.py)
+REDEEM_GROUP_COMMIT = env.bool("REDEEM_GROUP_COMMIT", default=False)
+REDEEM_GROUP_COMMIT_INTERVAL_MS = env.int("REDEEM_GROUP_COMMIT_INTERVAL_MS", default=20)
+# Segundos que una petición espera a que se guarde su lote
+REDEEM_GROUP_COMMIT_TIMEOUT = env.int("REDEEM_GROUP_COMMIT_TIMEOUT", default=5)
+
+# Segundos que duran las reservas de boletos antes de vencer
+TICKET_HOLD_TTL = env.int("TICKET_HOLD_TTL", default=600)
+# Reservas vencidas que se liberan por transacción
+TICKET_HOLD_SWEEP_BATCH_SIZE = env.int("TICKET_HOLD_SWEEP_BATCH_SIZE", default=500)
+
+# Segundos que se conserva el resultado de una mutación con llave de idempotencia
+IDEMPOTENCY_KEY_TTL = env.int("IDEMPOTENCY_KEY_TTL", default=86400)
+
+# Boletos que se reembolsan por transacción al cancelar un evento
+CANCEL_EVENT_CHUNK_SIZE = env.int("CANCEL_EVENT_CHUNK_SIZE", default=500)
+
+# Boletos que se obtienen de la base de datos por bloque al exportarlos
+TICKET_EXPORT_CHUNK_SIZE = env.int("TICKET_EXPORT_CHUNK_SIZE", default=2000)
+
+# Segundos que se conserva en la cache la lista compacta de boletos de una versión de un evento
+TICKET_SNAPSHOT_CACHE_TTL = env.int("TICKET_SNAPSHOT_CACHE_TTL", default=24 * 60 * 60)
+
 # Graphene settings
-GRAPHENE = {"SCHEMA": "ticket_manager.schema.schema"}
+GRAPHENE = {
+    "SCHEMA": "ticket_manager.schema.schema",
+    "MIDDLEWARE": ["ticket_manager.tracing.TracingMiddleware"],
+}
+
+# Fracción de las peticiones de GraphQL en que se mide cada resolver (0 a 1)
+GRAPHQL_TRACE_SAMPLE_RATE = env.float("GRAPHQL_TRACE_SAMPLE_RATE", default=0.01)
+# Milisegundos a partir de los cuales una petición se registra en el log con su traza
+GRAPHQL_SLOW_REQUEST_MS = env.int("GRAPHQL_SLOW_REQUEST_MS", default=1000)
+
+# Documentos de GraphQL analizados y validados que se conservan en memoria por proceso
+GRAPHQL_DOCUMENT_CACHE_SIZE = env.int("GRAPHQL_DOCUMENT_CACHE_SIZE", default=500)
+
+# Límites del análisis de costo de las operaciones de GraphQL
+GRAPHQL_MAX_QUERY_COST = env.int("GRAPHQL_MAX_QUERY_COST", default=10000)
+GRAPHQL_MAX_QUERY_DEPTH = env.int("GRAPHQL_MAX_QUERY_DEPTH", default=8)
+# Elementos que se suponen en una lista cuando la consulta no indica 'first'
+GRAPHQL_DEFAULT_LIST_SIZE = env.int("GRAPHQL_DEFAULT_LIST_SIZE", default=100)
+# Costos propios de campos específicos, por ejemplo {"Query.events": 5}
+GRAPHQL_FIELD_COSTS = {}
+
+# Segundos que una respuesta de las consultas de eventos se considera vigente (0 la desactiva)
+GRAPHQL_RESPONSE_CACHE_TTL = env.int("GRAPHQL_RESPONSE_CACHE_TTL", default=30)
+# Segundos adicionales en que se sirve la respuesta vencida mientras se vuelve a calcular
+GRAPHQL_RESPONSE_CACHE_STALE_TTL = env.int("GRAPHQL_RESPONSE_CACHE_STALE_TTL", default=60)
+
+# Incluye el número y el tiempo de las consultas SQL en 'extensions' de cada respuesta
+GRAPHQL_RESPONSE_METRICS = env.bool("GRAPHQL_RESPONSE_METRICS", default=False)
+
+# Archivo JSON con las consultas persistidas, de la forma {"<sha256>": "<consulta>"}
+GRAPHQL_PERSISTED_QUERIES_FILE = env("GRAPHQL_PERSISTED_QUERIES_FILE", default=None)
@@ -0,0 +1,152 @@
+import json
+from datetime import date
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from events import services
+from events.models import Ticket
+from events.test.factories import EventFactory, TicketFactory
+from ticket_manager.async_schema import schema as async_schema
+from ticket_manager.schema import schema
+from ticket_manager.views import document_cache
+
+
+@pytest.fixture
+def async_client():
+    return AsyncClient()
+
+
+def post_graphql(async_client, query, variables=None):
+    response = async_to_sync(async_client.post)(
+        "/graphql/async/",
+        json.dumps({"query": query, "variables": variables}),
+        content_type="application/json",
+    )
+    return response.status_code, response.json()
+
+
+def test_async_schema_matches_sync_schema():
+    assert str(async_schema) == str(schema)
+
+
+def test_document_cache_is_per_schema(db, client, async_client):
+    document_cache.clear()
+    query = "{ events { id } }"
+    client.post(
+        "/graphql/", json.dumps({"query": query}), content_type="application/json"
+    )
+    post_graphql(async_client, query)
+
+    # Cada vista valida la consulta con su propio esquema
+    assert document_cache.hits == 0
+    assert {key[0] for key in document_cache.entries} == {
+        schema.graphql_schema,
+        async_schema.graphql_schema,
+    }
+
+
+def test_events_with_tickets(db, async_client, django_assert_num_queries):
+    for event in EventFactory.create_batch(3):
+        TicketFactory.create_batch(2, event=event)
+
+    with django_assert_num_queries(2):
+        status, result = post_graphql(
+            async_client, "{ events { id totalSoldTickets tickets { id } } }"
+        )
+
+    assert status == 200
+    assert len(result["data"]["events"]) == 3
+    assert all(len(event["tickets"]) == 2 for event in result["data"]["events"])
+
+
+def test_sibling_fields(db, async_client):
+    event = EventFactory()
+    TicketFactory.create_batch(2, event=event)
+
+    status, result = post_graphql(
+        async_client,
+        """
+        query ($id: UUID!) {
+            event(id: $id) { name tickets { id } }
+            ticketsByEvent(eventId: $id) { id event { id } }
+            eventsConnection(first: 1) { totalCount edges { node { id } } }
+        }
+        """,
+        {"id": str(event.id)},
+    )
+
+    assert status == 200
+    assert "errors" not in result
+    assert len(result["data"]["event"]["tickets"]) == 2
+    assert len(result["data"]["ticketsByEvent"]) == 2
+    assert result["data"]["eventsConnection"]["totalCount"] == 1
+
+
+def test_sell_tickets(db, async_client):
+    event = EventFactory(start="2030-01-01", end="2030-01-02", total_tickets=10)
+
+    status, result = post_graphql(
+        async_client,
+        f'mutation {{ sellTickets(eventId: "{event.id}", quantity: 3) '
+        "{ ok tickets { event { totalSoldTickets } } } }",
+    )
+
+    assert status == 200
+    assert result["data"]["sellTickets"]["ok"]
+    assert len(result["data"]["sellTickets"]["tickets"]) == 3
+    assert Ticket.objects.filter(event=event).count() == 3
+
+
+def test_confirm_hold_with_event(db, async_client):
+    event = EventFactory(
+        start=date(2030, 1, 1), end=date(2030, 1, 2), total_tickets=10
+    )
+    hold = services.hold_tickets(event, 2)
+
+    status, result = post_graphql(
+        async_client,
+        f'mutation {{ confirmHold(holdId: "{hold.id}") '
+        "{ ok tickets { event { id totalSoldTickets } } } }",
+    )
+
+    assert status == 200
+    assert "errors" not in result
+    tickets = result["data"]["confirmHold"]["tickets"]
+    assert [ticket["event"]["id"] for ticket in tickets] == [str(event.id)] * 2
+
+
+def test_sharded_event_counts_slot_sales(db, async_client):
+    event = EventFactory(
+        start=date(2030, 1, 1), end=date(2030, 1, 2), total_tickets=10
+    )
+    services.shard_inventory(event, 4)
+    services.sell_tickets(event, 3)
+
+    status, result = post_graphql(
+        async_client,
+        "query ($id: UUID!) { event(id: $id) { totalSoldTickets } }",
+        {"id": str(event.id)},
+    )
+
+    assert status == 200
+    assert result["data"]["event"]["totalSoldTickets"] == 3
+
+
+def test_business_errors_are_reported(db, async_client):
+    event = EventFactory(total_tickets=1)
+    TicketFactory(event=event)
+
+    status, result = post_graphql(
+        async_client, f'mutation {{ sellTicket(eventId: "{event.id}") {{ ok }} }}'
+    )
+
+    assert status == 200
+    assert result["errors"][0]["message"] == "No hay boletos disponibles para este evento"
+
+
+def test_invalid_query_returns_400(db, async_client):
+    status, result = post_graphql(async_client, "{ events { unknownField } }")
+    assert status == 400
+    assert result["errors"]
@@ -0,0 +1,154 @@
+import json
+
+import pytest
+from graphql import parse
+
+from ticket_manager.cost import OperationCost, analyze_document
+from ticket_manager.schema import schema
+from ticket_manager.views import document_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_document_cache():
+    document_cache.clear()
+
+
+def analyze(query):
+    return analyze_document(schema.graphql_schema, parse(query))
+
+
+def test_cost_uses_first_as_list_multiplier():
+    costs = analyze("query Events { events(first: 10) { id tickets { id } } }")
+    # events: 1 + 10 * (tickets: 1 + 100 * 0)
+    assert costs["Events"] == OperationCost(cost=11, depth=2)
+
+
+def test_cost_uses_default_list_size(settings):
+    settings.GRAPHQL_DEFAULT_LIST_SIZE = 50
+    costs = analyze("{ events { tickets { event { id } } } }")
+    # events: 1 + 50 * (tickets: 1 + 50 * (event: 1))
+    assert costs[None] == OperationCost(cost=2551, depth=3)
+
+
+def test_cost_of_connection_and_fragments():
+    costs = analyze(
+        """
+        query Page { eventsConnection(first: 5) { edges { node { ...EventFields } } } }
+        fragment EventFields on EventType { id tickets { id } }
+        """
+    )
+    # eventsConnection: 1 + 5 * (edges: 1 + (node: 1 + (tickets: 1)))
+    assert costs["Page"] == OperationCost(cost=16, depth=4)
+
+
+CONNECTION_TICKETS = """
+query Page($n: Int) {
+    eventsConnection%s { edges { node { tickets { event { tickets { id } } } } } }
+}
+"""
+
+
+def test_connection_without_first_uses_page_size():
+    costs = analyze(CONNECTION_TICKETS % "")
+    # eventsConnection: 1 + 20 * (edges: 1 + (node: 1 + (tickets: 1 + 100 * 2)))
+    assert costs["Page"] == OperationCost(cost=4061, depth=6)
+
+
+def test_connection_first_variable_uses_max_page_size():
+    literal = analyze(CONNECTION_TICKETS % "(first: 100)")["Page"]
+    variable = analyze(CONNECTION_TICKETS % "(first: $n)")["Page"]
+
+    assert variable.cost == literal.cost == 20301
+    assert variable.uses_variables
+    with_variables = analyze_document(
+        schema.graphql_schema, parse(CONNECTION_TICKETS % "(first: $n)"), {"n": 5}
+    )["Page"]
+    assert with_variables.cost == 1 + 5 * 203
+
+
+def test_list_first_variable_is_checked_with_variables():
+    document = parse("query Events($n: Int) { events(first: $n) { tickets { id } } }")
+
+    [static] = analyze_document(schema.graphql_schema, document).values()
+    [large] = analyze_document(schema.graphql_schema, document, {"n": 1000}).values()
+
+    assert static == OperationCost(cost=101, depth=2, uses_variables=True)
+    assert large.cost == 1001
+
+
+NESTED_TICKETS = "{ tickets { event { tickets { id } } } }"
+
+
+def test_negative_first_does_not_reduce_cost():
+    expensive = analyze("{ b: events %s }" % NESTED_TICKETS)[None]
+
+    literal = analyze(
+        "{ a: events(first: -1000) %s b: events %s }" % (NESTED_TICKETS, NESTED_TICKETS)
+    )[None]
+    document = parse(
+        "query ($n: Int) { a: events(first: $n) %s b: events %s }"
+        % (NESTED_TICKETS, NESTED_TICKETS)
+    )
+    variable = analyze_document(schema.graphql_schema, document, {"n": -1000})[None]
+
+    # 'a' solo cuesta su propio campo
+    assert literal.cost == variable.cost == expensive.cost + 1
+
+
+def test_field_cost_overrides(settings):
+    settings.GRAPHQL_FIELD_COSTS = {"Query.event": 40}
+    costs = analyze('{ event(id: "702adc6c-e30d-4f77-b8b1-4173a8afc329") { id } }')
+    assert costs[None].cost == 40
+
+
+def test_introspection_is_not_counted():
+    costs = analyze("{ __schema { types { name fields { name } } } }")
+    assert costs[None] == OperationCost(cost=0, depth=0)
+
+
+def test_view_rejects_expensive_operation(db, client, settings):
+    settings.GRAPHQL_MAX_QUERY_COST = 100
+    response = client.post(
+        "/graphql/",
+        json.dumps({"query": "{ events { tickets { id } } }"}),
+        content_type="application/json",
+    )
+    assert response.status_code == 400
+    assert response.json()["errors"][0]["message"] == (
+        "La consulta excede el costo máximo permitido (101 > 100)"
+    )
+
+
+def test_view_rejects_deep_operation(db, client, settings):
+    settings.GRAPHQL_MAX_QUERY_DEPTH = 3
+    response = client.post(
+        "/graphql/",
+        json.dumps(
+            {"query": "{ events(first: 1) { tickets { event { tickets { id } } } } }"}
+        ),
+        content_type="application/json",
+    )
+    assert response.status_code == 400
+    assert response.json()["errors"][0]["message"] == (
+        "La consulta excede la profundidad máxima permitida (4 > 3)"
+    )
+
+
+def test_view_checks_cost_with_variables(db, client, settings):
+    settings.GRAPHQL_MAX_QUERY_COST = 500
+    query = "query Events($n: Int) { events(first: $n) { tickets { id } } }"
+
+    def post(n):
+        return client.post(
+            "/graphql/",
+            json.dumps({"query": query, "variables": {"n": n}}),
+            content_type="application/json",
+        )
+
+    assert post(10).status_code == 200
+    # El documento ya está en la cache, pero el costo se revisa con las nuevas variables
+    response = post(1000)
+    assert response.status_code == 400
+    assert response.json()["errors"][0]["message"] == (
+        "La consulta excede el costo máximo permitido (1001 > 500)"
+    )
@@ -0,0 +1,21 @@
+from unittest import mock
+
+from django.db import connections
+
+from ticket_manager.db import pool_stats
+
+STATS = {"pool_size": 4, "pool_available": 3, "requests_waiting": 0}
+
+
+def test_pool_stats_without_pool():
+    with mock.patch.object(type(connections["default"]), "pool", None):
+        assert pool_stats() == {}
+
+
+def test_pool_stats_endpoint(client):
+    pool = mock.Mock(get_stats=mock.Mock(return_value=STATS))
+    with mock.patch.object(type(connections["default"]), "pool", pool):
+        response = client.get("/stats/db-pool/")
+
+    assert response.status_code == 200
+    assert response.json() == {"default": STATS}
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from events.test.factories import EventFactory, TicketFactory
+from ticket_manager.metrics import Histogram
+from ticket_manager.views import document_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_document_cache():
+    document_cache.clear()
+
+
+def post_graphql(client, query, path="/graphql/"):
+    return client.post(
+        path, json.dumps({"query": query}), content_type="application/json"
+    ).json()
+
+
+def test_response_metrics_disabled_by_default(db, client):
+    result = post_graphql(client, "{ events { id } }")
+
+    assert "extensions" not in result
+
+
+def test_response_metrics_count_sql_queries(db, client, settings):
+    settings.GRAPHQL_RESPONSE_METRICS = True
+    event = EventFactory()
+    TicketFactory.create_batch(2, event=event)
+
+    query = "query EventTickets { events { id tickets { id } } }"
+    result = post_graphql(client, query)
+
+    metrics = result["extensions"]["metrics"]
+    assert metrics["operation"] == "EventTickets"
+    # Una consulta para los eventos y otra para los boletos de todos los eventos
+    assert metrics["sqlQueries"] == 2
+    assert metrics["errors"] == 0
+    assert metrics["totalTimeMs"] >= metrics["sqlTimeMs"]
+
+
+def test_response_metrics_count_errors(db, client, settings):
+    settings.GRAPHQL_RESPONSE_METRICS = True
+
+    event_id = "00000000-0000-0000-0000-000000000000"
+    result = post_graphql(
+        client, f'mutation {{ sellTicket(eventId: "{event_id}") {{ ok }} }}'
+    )
+
+    assert result["errors"]
+    assert result["extensions"]["metrics"]["errors"] == len(result["errors"])
+
+
+def test_metrics_endpoint(db, client):
+    EventFactory()
+    post_graphql(client, "query ListEvents { events { id } }")
+    post_graphql(client, "query ListEvents { events { id } }")
+
+    response = client.get("/metrics")
+    content = response.content.decode()
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    assert "# TYPE graphql_request_duration_seconds histogram" in content
+    bucket = 'graphql_sql_queries_bucket{operation="ListEvents",type="query",le="+Inf"}'
+    assert bucket in content
+    assert "# TYPE graphql_cache_hits_total counter" in content
+    assert "# TYPE graphql_cache_misses_total counter" in content
+    assert 'graphql_cache_hits_total{cache="document"} 1' in content
+    assert 'graphql_cache_hits_total{cache="response"} ' in content
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("latency_seconds", "Latencia", (0.1, 1))
+    histogram.observe(0.05, operation="a")
+    histogram.observe(0.5, operation="a")
+    histogram.observe(5, operation="a")
+
+    assert histogram.collect() == [
+        "# HELP latency_seconds Latencia",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{operation="a",le="0.1"} 1',
+        'latency_seconds_bucket{operation="a",le="1.0"} 2',
+        'latency_seconds_bucket{operation="a",le="+Inf"} 3',
+        'latency_seconds_sum{operation="a"} 5.55',
+        'latency_seconds_count{operation="a"} 3',
+    ]
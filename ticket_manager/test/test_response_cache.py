@@ -0,0 +1,134 @@
+import json
+import time
+from unittest import mock
+
+import pytest
+
+from events.test.factories import EventFactory
+from ticket_manager.response_cache import ResponseCache
+from ticket_manager.views import document_cache
+
+EVENT_QUERY = """
+query ($id: UUID!) {
+    event(id: $id) {
+        name
+        totalSoldTickets
+    }
+}
+"""
+
+
+@pytest.fixture(autouse=True)
+def clear_document_cache():
+    document_cache.clear()
+
+
+def post_graphql(client, query, variables=None):
+    return client.post(
+        "/graphql/",
+        json.dumps({"query": query, "variables": variables}),
+        content_type="application/json",
+    ).json()
+
+
+def test_events_are_served_from_cache(db, client, django_assert_num_queries):
+    EventFactory.create_batch(3)
+    first = post_graphql(client, "{ events { id name } }")
+
+    with django_assert_num_queries(0):
+        second = post_graphql(client, "query {\n  events { id name }\n}")
+
+    assert first == second
+    assert len(second["data"]["events"]) == 3
+
+
+def test_mutation_invalidates_only_affected_event(
+    db, client, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    event = EventFactory(start="2030-01-01", end="2030-01-02", total_tickets=10)
+    other = EventFactory(start="2030-01-01", end="2030-01-02", total_tickets=10)
+    post_graphql(client, EVENT_QUERY, {"id": str(event.id)})
+    post_graphql(client, EVENT_QUERY, {"id": str(other.id)})
+
+    # La invalidación se ejecuta después del commit de la mutación
+    with django_capture_on_commit_callbacks(execute=True):
+        post_graphql(
+            client, f'mutation {{ sellTicket(eventId: "{event.id}") {{ ok }} }}'
+        )
+
+    result = post_graphql(client, EVENT_QUERY, {"id": str(event.id)})
+    assert result["data"]["event"]["totalSoldTickets"] == 1
+    with django_assert_num_queries(0):
+        post_graphql(client, EVENT_QUERY, {"id": str(other.id)})
+
+
+def test_event_id_is_normalized(db, client, django_capture_on_commit_callbacks):
+    event = EventFactory(start="2030-01-01", end="2030-01-02", total_tickets=10)
+    event_id = str(event.id).upper().replace("-", "")
+    post_graphql(client, EVENT_QUERY, {"id": event_id})
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post_graphql(
+            client, f'mutation {{ sellTicket(eventId: "{event.id}") {{ ok }} }}'
+        )
+
+    # La respuesta guardada con otra forma del mismo id también se invalida
+    result = post_graphql(client, EVENT_QUERY, {"id": event_id})
+    assert result["data"]["event"]["totalSoldTickets"] == 1
+
+
+def test_invalid_event_id_is_not_cached(db, client):
+    misses = ResponseCache.misses
+    result = post_graphql(client, EVENT_QUERY, {"id": "no-es-un-uuid"})
+
+    assert result["errors"]
+    assert ResponseCache.misses == misses
+
+
+def test_mutation_invalidates_event_lists(
+    db, client, django_capture_on_commit_callbacks
+):
+    event = EventFactory(name="Antes")
+    post_graphql(client, "{ events { name } }")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        post_graphql(
+            client,
+            f'mutation {{ updateEvent(id: "{event.id}", name: "Despues", '
+            f'start: "2030-01-01", end: "2030-01-02", totalTickets: 10) {{ ok }} }}',
+        )
+
+    result = post_graphql(client, "{ events { name } }")
+    assert result["data"]["events"] == [{"name": "Despues"}]
+
+
+def test_stale_response_is_served_while_revalidating(
+    db, client, settings, django_assert_num_queries
+):
+    settings.GRAPHQL_RESPONSE_CACHE_TTL = 10
+    EventFactory(name="Evento")
+    post_graphql(client, "{ events { name } }")
+    later = time.time() + 20
+
+    with mock.patch("ticket_manager.response_cache.time.time", return_value=later):
+        # La primera petición después del vencimiento vuelve a calcular la respuesta
+        with django_assert_num_queries(1):
+            post_graphql(client, "{ events { name } }")
+
+    with mock.patch(
+        "ticket_manager.response_cache.time.time", return_value=later + 20
+    ), mock.patch("ticket_manager.response_cache.cache.add", return_value=False):
+        # Mientras otra petición la recalcula, se sirve la respuesta vencida
+        with django_assert_num_queries(0):
+            result = post_graphql(client, "{ events { name } }")
+
+    assert result["data"]["events"] == [{"name": "Evento"}]
+
+
+def test_queries_with_other_fields_are_not_cached(
+    db, client, django_assert_num_queries
+):
+    EventFactory()
+    post_graphql(client, "{ tickets { id } }")
+    with django_assert_num_queries(1):
+        post_graphql(client, "{ tickets { id } }")
@@ -0,0 +1,88 @@
+import json
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from events.test.factories import EventFactory, TicketFactory
+from ticket_manager.views import document_cache
+
+QUERY = "query EventTickets { events { id name tickets { id } } }"
+
+
+@pytest.fixture(autouse=True)
+def clear_document_cache():
+    document_cache.clear()
+
+
+@pytest.fixture
+def events(db):
+    for event in EventFactory.create_batch(3):
+        TicketFactory.create_batch(2, event=event)
+
+
+def post_graphql(client, query):
+    return client.post(
+        "/graphql/", json.dumps({"query": query}), content_type="application/json"
+    )
+
+
+def test_unsampled_request_has_no_server_timing(events, client, settings):
+    settings.GRAPHQL_TRACE_SAMPLE_RATE = 0
+
+    response = post_graphql(client, QUERY)
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response
+
+
+def test_sampled_request_has_server_timing(events, client, settings):
+    settings.GRAPHQL_TRACE_SAMPLE_RATE = 1
+
+    response = post_graphql(client, QUERY)
+
+    timing = response["Server-Timing"]
+    assert timing.startswith("graphql;dur=")
+    # Los eventos y sus boletos se obtienen con dos consultas en el resolver de 'events'
+    assert 'Query.events;desc="1x 2 sql"' in timing
+    assert 'EventType.tickets;desc="3x 0 sql"' in timing
+
+
+def test_slow_request_logs_trace(events, client, settings, caplog):
+    settings.GRAPHQL_TRACE_SAMPLE_RATE = 1
+    settings.GRAPHQL_SLOW_REQUEST_MS = 0
+
+    with caplog.at_level(logging.WARNING, logger="ticket_manager.tracing"):
+        post_graphql(client, QUERY)
+
+    [record] = caplog.records
+    message = record.getMessage()
+    assert "operación EventTickets" in message
+    assert "\nQuery.events calls=1 " in message
+    assert "\n  EventType.tickets calls=3 " in message
+    assert "\n    TicketType.id calls=6 " in message
+
+
+def test_slow_unsampled_request_is_logged(events, client, settings, caplog):
+    settings.GRAPHQL_TRACE_SAMPLE_RATE = 0
+    settings.GRAPHQL_SLOW_REQUEST_MS = 0
+
+    with caplog.at_level(logging.WARNING, logger="ticket_manager.tracing"):
+        post_graphql(client, QUERY)
+
+    [record] = caplog.records
+    assert "sin traza" in record.getMessage()
+
+
+def test_async_view_server_timing(events, settings):
+    settings.GRAPHQL_TRACE_SAMPLE_RATE = 1
+
+    response = async_to_sync(AsyncClient().post)(
+        "/graphql/async/",
+        json.dumps({"query": QUERY}),
+        content_type="application/json",
+    )
+
+    assert response.status_code == 200
+    assert "EventType.tickets" in response["Server-Timing"]
@@ -0,0 +1,85 @@
+import json
+from unittest import mock
+
+import pytest
+
+from events.test.factories import EventFactory
+from ticket_manager import views
+from ticket_manager.views import document_cache, query_hash
+
+EVENTS_QUERY = "query { events { id name } }"
+
+
+@pytest.fixture(autouse=True)
+def clear_document_cache():
+    document_cache.clear()
+    views.load_persisted_queries.cache_clear()
+
+
+def post_graphql(client, body):
+    return client.post(
+        "/graphql/", json.dumps(body), content_type="application/json"
+    )
+
+
+def test_document_is_parsed_once(db, client):
+    EventFactory.create_batch(2)
+
+    with mock.patch.object(views, "parse", wraps=views.parse) as parse:
+        first = post_graphql(client, {"query": EVENTS_QUERY})
+        second = post_graphql(client, {"query": EVENTS_QUERY})
+
+    assert first.status_code == 200
+    assert first.json() == second.json()
+    assert len(second.json()["data"]["events"]) == 2
+    assert parse.call_count == 1
+    assert document_cache.hits == 1
+
+
+def test_document_cache_is_bounded(db, client, settings):
+    settings.GRAPHQL_DOCUMENT_CACHE_SIZE = 2
+
+    for first in range(1, 4):
+        post_graphql(client, {"query": f"query {{ events(first: {first}) {{ id }} }}"})
+
+    assert len(document_cache.entries) == 2
+
+
+def test_invalid_document_returns_errors(db, client):
+    response = post_graphql(client, {"query": "query { events { unknownField } }"})
+    assert response.status_code == 400
+    assert "errors" in response.json()
+
+
+def test_persisted_query(db, client, settings, tmp_path):
+    EventFactory.create_batch(3)
+    queries = tmp_path / "persisted_queries.json"
+    queries.write_text(json.dumps({query_hash(EVENTS_QUERY): EVENTS_QUERY}))
+    settings.GRAPHQL_PERSISTED_QUERIES_FILE = str(queries)
+
+    response = post_graphql(
+        client,
+        {
+            "extensions": {
+                "persistedQuery": {"version": 1, "sha256Hash": query_hash(EVENTS_QUERY)}
+            }
+        },
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]["events"]) == 3
+
+
+def test_persisted_query_not_found(db, client, settings, tmp_path):
+    queries = tmp_path / "persisted_queries.json"
+    queries.write_text(json.dumps({}))
+    settings.GRAPHQL_PERSISTED_QUERIES_FILE = str(queries)
+
+    response = post_graphql(
+        client, {"extensions": {"persistedQuery": {"sha256Hash": "abc"}}}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["errors"][0]["message"] == (
+        "No se encontró una consulta persistida con el hash proporcionado"
+    )
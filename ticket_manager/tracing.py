@@ -0,0 +1,185 @@
+"""
+Trazas por resolver de las peticiones de GraphQL.
+Una fracción de las peticiones ('GRAPHQL_TRACE_SAMPLE_RATE') mide cada resolver y las
+consultas SQL que ejecuta. Los tiempos se agrupan por la ruta del campo sin los índices
+de las listas, así que un N+1 se ve como un campo que se resolvió muchas veces con una
+consulta cada vez. Las peticiones con traza regresan los resolvers más lentos en el
+encabezado 'Server-Timing', y las que exceden 'GRAPHQL_SLOW_REQUEST_MS' se registran
+en el log con su árbol completo.
+"""
+
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from inspect import isawaitable
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from ticket_manager.metrics import current_request
+from ticket_manager.schema import in_event_loop
+
+logger = logging.getLogger(__name__)
+
+# Resolvers que se incluyen en el encabezado 'Server-Timing', los de mayor tiempo total
+SERVER_TIMING_SPANS = 10
+
+
+@dataclass
+class Span:
+    """
+    Tiempo acumulado de un campo en todas las veces que se resolvió durante la petición.
+    Las consultas SQL incluyen las de los subcampos que se resolvieron dentro del resolver.
+    """
+
+    field: str
+    calls: int = 0
+    seconds: float = 0
+    max_seconds: float = 0
+    sql_queries: int = 0
+    children: dict = field(default_factory=dict)
+
+
+class Trace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.operation = None
+        self.root = Span(field="")
+
+    def span(self, info) -> Span:
+        # Los índices de las listas se omiten para agrupar los elementos en un solo nodo
+        keys = [key for key in info.path.as_list() if not isinstance(key, int)]
+        span = self.root
+        for key in keys[:-1]:
+            if key not in span.children:
+                span.children[key] = Span(field=key)
+            span = span.children[key]
+        if keys[-1] not in span.children:
+            name = f"{info.parent_type.name}.{info.field_name}"
+            span.children[keys[-1]] = Span(field=name)
+        return span.children[keys[-1]]
+
+    def record(self, info, started: float, sql_queries: int) -> None:
+        seconds = time.perf_counter() - started
+        span = self.span(info)
+        span.calls += 1
+        span.seconds += seconds
+        span.max_seconds = max(span.max_seconds, seconds)
+        span.sql_queries += max(sql_count() - sql_queries, 0)
+        if self.operation is None and info.operation.name:
+            self.operation = info.operation.name.value
+
+    async def arecord(self, info, result, started: float, sql_queries: int):
+        try:
+            return await result
+        finally:
+            self.record(info, started, sql_queries)
+
+    @property
+    def duration(self) -> float:
+        return time.perf_counter() - self.started
+
+    def spans(self) -> list[Span]:
+        pending = list(self.root.children.values())
+        spans = []
+        while pending:
+            span = pending.pop()
+            spans.append(span)
+            pending += span.children.values()
+        return spans
+
+    def server_timing(self) -> str:
+        entries = [f"graphql;dur={self.duration * 1000:.2f}"]
+        slowest = sorted(self.spans(), key=lambda span: span.seconds, reverse=True)
+        for span in slowest[:SERVER_TIMING_SPANS]:
+            entries.append(
+                f'{span.field};desc="{span.calls}x {span.sql_queries} sql";'
+                f"dur={span.seconds * 1000:.2f}"
+            )
+        return ", ".join(entries)
+
+    def render(self) -> str:
+        """
+        Árbol de la traza, un campo por línea con sus llamadas, tiempo total,
+        tiempo máximo de una llamada y consultas SQL
+        """
+        lines = []
+
+        def visit(span: Span, depth: int):
+            lines.append(
+                f"{'  ' * depth}{span.field} calls={span.calls} "
+                f"total={span.seconds * 1000:.2f}ms max={span.max_seconds * 1000:.2f}ms "
+                f"sql={span.sql_queries}"
+            )
+            for child in span.children.values():
+                visit(child, depth + 1)
+
+        for span in self.root.children.values():
+            visit(span, 0)
+        return "\n".join(lines)
+
+
+def sql_count() -> int:
+    metrics = current_request.get()
+    return metrics.sql_queries if metrics is not None else 0
+
+
+def start(request) -> None:
+    """
+    Decide si se traza la petición e inicia su traza
+    """
+    request.graphql_started = time.perf_counter()
+    sampled = random.random() < settings.GRAPHQL_TRACE_SAMPLE_RATE
+    request.graphql_trace = Trace() if sampled else None
+
+
+def finish(request, response) -> None:
+    """
+    Agrega el encabezado 'Server-Timing' y registra la petición si fue lenta
+    """
+    trace = getattr(request, "graphql_trace", None)
+    if trace is not None:
+        response["Server-Timing"] = trace.server_timing()
+
+    duration_ms = (time.perf_counter() - request.graphql_started) * 1000
+    if duration_ms < settings.GRAPHQL_SLOW_REQUEST_MS:
+        return
+    if trace is None:
+        logger.warning(
+            "Petición de GraphQL lenta (%.2f ms) sin traza en %s",
+            duration_ms,
+            request.path,
+        )
+        return
+    logger.warning(
+        "Petición de GraphQL lenta (%.2f ms) en %s, operación %s:\n%s",
+        duration_ms,
+        request.path,
+        trace.operation or "sin nombre",
+        trace.render(),
+    )
+
+
+class TracingMiddleware:
+    """
+    Middleware de Graphene que mide cada resolver de las peticiones con traza.
+    En las demás solo llama al resolver.
+    """
+
+    def resolve(self, next, root, info, **kwargs):
+        trace = getattr(info.context, "graphql_trace", None)
+        if trace is None:
+            return next(root, info, **kwargs)
+
+        sql_queries = sql_count()
+        started = time.perf_counter()
+        result = next(root, info, **kwargs)
+        if isawaitable(result):
+            return trace.arecord(info, result, started, sql_queries)
+        # Los resolvers regresan QuerySets sin evaluar; se evalúan aquí para que la
+        # consulta se cuente en el campo que la generó y no después al recorrer la lista
+        if isinstance(result, QuerySet) and not in_event_loop():
+            len(result)
+        trace.record(info, started, sql_queries)
+        return result
@@ -17,12 +17,26 @@ Including another URLconf
 
 from django.conf import settings
 from django.conf.urls.static import static
-from django.urls import path
-from graphene_django.views import GraphQLView
+from django.urls import include, path
 from django.views.decorators.csrf import csrf_exempt
 
+from ticket_manager.async_schema import schema as async_schema
+from ticket_manager.views import (
+    AsyncGraphQLView,
+    CachedGraphQLView,
+    database_pool_stats,
+    prometheus_metrics,
+)
+
 urlpatterns = [
-    path("graphql/", csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path("graphql/", csrf_exempt(CachedGraphQLView.as_view(graphiql=True))),
+    path(
+        "graphql/async/",
+        csrf_exempt(AsyncGraphQLView.as_view(schema=async_schema)),
+    ),
+    path("events/", include("events.urls")),
+    path("stats/db-pool/", database_pool_stats),
+    path("metrics", prometheus_metrics),
 ]
 
 urlpatterns += static(
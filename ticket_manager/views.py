@@ -0,0 +1,503 @@
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    JsonResponse,
+)
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView, HttpError
+from graphql import (
+    ExecutionResult,
+    GraphQLError,
+    OperationType,
+    execute,
+    get_operation_ast,
+    parse,
+    print_ast,
+    validate,
+    validate_schema,
+)
+from graphql.language import DocumentNode
+
+from ticket_manager import metrics, tracing
+from ticket_manager.cost import OperationCost, analyze_document, check_cost
+from ticket_manager.db import pool_stats
+from ticket_manager.response_cache import ResponseCache
+
+
+@dataclass
+class ParsedDocument:
+    """
+    Resultado de analizar y validar una consulta, que se guarda en la cache de documentos
+    """
+
+    document: DocumentNode | None
+    errors: list[GraphQLError]
+    costs: dict[str | None, OperationCost] = field(default_factory=dict)
+    # Hash de la consulta normalizada, sin espacios ni comentarios
+    normalized_hash: str | None = None
+
+
+class DocumentCache:
+    """
+    Cache LRU de documentos de GraphQL ya analizados y validados, por esquema y hash
+    de la consulta. Los clientes envían casi siempre las mismas operaciones, así que se evita
+    volver a analizarlas y validarlas contra el esquema en cada petición.
+    Las vistas síncrona y asíncrona comparten la cache con esquemas distintos, por eso
+    el esquema es parte de la llave.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: tuple, entry) -> None:
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.GRAPHQL_DOCUMENT_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+document_cache = DocumentCache()
+
+
+def query_hash(query: str) -> str:
+    """
+    Hash SHA-256 de la consulta, el mismo que usan los clientes para las consultas persistidas
+    """
+    return hashlib.sha256(query.encode()).hexdigest()
+
+
+@functools.lru_cache
+def load_persisted_queries(path: str) -> dict[str, str]:
+    """
+    Carga el archivo JSON de consultas persistidas, con la forma {"<sha256>": "<consulta>"}.
+    Se descartan las entradas cuyo hash no corresponde con la consulta.
+    """
+    with open(path, encoding="utf-8") as file:
+        queries = json.load(file)
+    return {key: query for key, query in queries.items() if query_hash(query) == key}
+
+
+def get_persisted_query(sha256_hash: str) -> str | None:
+    """
+    Obtiene una consulta registrada de antemano por su hash
+    """
+    path = settings.GRAPHQL_PERSISTED_QUERIES_FILE
+    if not path:
+        return None
+    return load_persisted_queries(str(path)).get(sha256_hash)
+
+
+def database_pool_stats(request):
+    """
+    Estadísticas del pool de conexiones a la base de datos de este proceso
+    """
+    return JsonResponse(pool_stats())
+
+
+def prometheus_metrics(request):
+    """
+    Métricas de este proceso en el formato de texto de Prometheus: las de las peticiones
+    de GraphQL, las de las caches de documentos y respuestas y las del pool de conexiones
+    """
+    cache_hits = [
+        ((("cache", "document"),), document_cache.hits),
+        ((("cache", "response"),), ResponseCache.hits),
+        ((("cache", "response_stale"),), ResponseCache.stale_hits),
+    ]
+    cache_misses = [
+        ((("cache", "document"),), document_cache.misses),
+        ((("cache", "response"),), ResponseCache.misses),
+    ]
+    pool_samples = {}
+    for alias, stats in pool_stats().items():
+        for name, value in stats.items():
+            pool_samples[(("alias", alias), ("stat", name))] = value
+
+    content = metrics.render(
+        metrics.counter(
+            "graphql_cache_hits_total",
+            "Aciertos de las caches de GraphQL",
+            dict(cache_hits),
+        ),
+        metrics.counter(
+            "graphql_cache_misses_total",
+            "Fallos de las caches de GraphQL",
+            dict(cache_misses),
+        ),
+        metrics.gauge(
+            "graphql_document_cache_size",
+            "Documentos analizados en la cache de documentos",
+            {(): len(document_cache.entries)},
+        ),
+        metrics.gauge(
+            "db_pool", "Estadísticas del pool de conexiones de psycopg", pool_samples
+        ),
+    )
+    return HttpResponse(content, content_type="text/plain; version=0.0.4")
+
+
+class CachedGraphQLView(GraphQLView):
+    """
+    Vista de GraphQL que reutiliza los documentos analizados y validados, y que acepta
+    consultas persistidas: el cliente envía solo el hash en
+    'extensions.persistedQuery.sha256Hash' en lugar del texto de la consulta.
+    Las operaciones que exceden el costo o la profundidad máxima se rechazan sin ejecutarse.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        tracing.start(request)
+        response = super().dispatch(request, *args, **kwargs)
+        tracing.finish(request, response)
+        return response
+
+    def get_graphql_params(self, request, data):
+        query, variables, operation_name, id = super().get_graphql_params(
+            request, data
+        )
+
+        if not query:
+            sha256_hash = self.get_persisted_query_hash(request, data)
+            if sha256_hash:
+                query = get_persisted_query(sha256_hash)
+                if query is None:
+                    raise HttpError(
+                        HttpResponseBadRequest(
+                            "No se encontró una consulta persistida con el hash proporcionado"
+                        )
+                    )
+
+        return query, variables, operation_name, id
+
+    @staticmethod
+    def get_persisted_query_hash(request, data) -> str | None:
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+        if not isinstance(extensions, dict):
+            return None
+        return (extensions.get("persistedQuery") or {}).get("sha256Hash")
+
+    def get_document(self, query: str) -> ParsedDocument:
+        """
+        Analiza y valida la consulta, o la toma de la cache si ya se había procesado
+        """
+        schema = self.schema.graphql_schema
+        key = (schema, query_hash(query))
+        entry = document_cache.get(key)
+        if entry is not None:
+            return entry
+
+        try:
+            document = parse(query)
+        except GraphQLError as e:
+            return ParsedDocument(document=None, errors=[e])
+
+        errors = validate(
+            schema,
+            document,
+            self.validation_rules,
+            graphene_settings.MAX_VALIDATION_ERRORS,
+        )
+        entry = ParsedDocument(
+            document=document,
+            errors=errors,
+            costs={} if errors else analyze_document(schema, document),
+            normalized_hash=query_hash(print_ast(document)),
+        )
+        document_cache.set(key, entry)
+        return entry
+
+    def prepare_operation(
+        self, request, query, variables, operation_name, show_graphiql
+    ):
+        """
+        Analiza, valida y revisa el costo de la operación, y busca su respuesta en la cache.
+        Regresa (resultado, None, None) cuando ya no hay que ejecutarla,
+        o (None, documento, cache de respuestas) para ejecutarla.
+        """
+        # Se ejecuta en el hilo de las consultas de la petición, también en la vista asíncrona
+        metrics.install_query_recorder(connection)
+
+        if not query:
+            if show_graphiql:
+                return None, None, None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            result = ExecutionResult(data=None, errors=schema_validation_errors)
+            return result, None, None
+
+        parsed = self.get_document(query)
+        document, validation_errors = parsed.document, parsed.errors
+        if document is None:
+            return ExecutionResult(errors=validation_errors), None, None
+
+        operation_ast = get_operation_ast(document, operation_name)
+        metrics.set_operation(operation_ast)
+
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None, None, None
+
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    "Can only perform a {} operation from a POST request.".format(
+                        operation_ast.operation.value
+                    ),
+                )
+            )
+
+        if validation_errors:
+            return ExecutionResult(data=None, errors=validation_errors), None, None
+
+        response_cache = None
+        if operation_ast is not None:
+            name = operation_ast.name.value if operation_ast.name else None
+            operation_cost = parsed.costs[name]
+            if operation_cost.uses_variables:
+                # El 'first' de una lista depende de las variables de esta petición
+                costs = analyze_document(schema, document, variables or {})
+                operation_cost = costs[name]
+            rejection = check_cost(operation_cost)
+            if rejection:
+                result = ExecutionResult(data=None, errors=[GraphQLError(rejection)])
+                return result, None, None
+
+            response_cache = ResponseCache(
+                parsed.normalized_hash, operation_ast, name, variables
+            )
+            data = response_cache.lookup()
+            if data is not None:
+                return ExecutionResult(data=data), None, None
+
+        return None, document, response_cache
+
+    def get_execute_options(self, request, variables, operation_name) -> dict:
+        execute_options = {
+            "root_value": self.get_root_value(request),
+            "context_value": self.get_context(request),
+            "variable_values": variables,
+            "operation_name": operation_name,
+            "middleware": self.get_middleware(request),
+        }
+        if self.execution_context_class:
+            execute_options["execution_context_class"] = self.execution_context_class
+        return execute_options
+
+    def get_response(self, request, data, show_graphiql=False):
+        # Igual que GraphQLView.get_response, pero incluye 'extensions' en la respuesta
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        status_code = 200
+        if execution_result:
+            if execution_result.errors:
+                set_rollback()
+            response, status_code = self.build_response(execution_result)
+
+            if self.batch:
+                response["id"] = id
+                response["status"] = status_code
+
+            result = self.json_encode(request, response, pretty=show_graphiql)
+        else:
+            result = None
+
+        return result, status_code
+
+    def build_response(self, execution_result) -> tuple[dict, int]:
+        status_code = 200
+        response = {}
+        if execution_result.errors:
+            response["errors"] = [self.format_error(e) for e in execution_result.errors]
+
+        if execution_result.errors and any(
+            not getattr(e, "path", None) for e in execution_result.errors
+        ):
+            status_code = 400
+        else:
+            response["data"] = execution_result.data
+
+        if execution_result.extensions:
+            response["extensions"] = execution_result.extensions
+        return response, status_code
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        with metrics.measure_request() as request_metrics:
+            result = self.run_graphql_request(
+                request, query, variables, operation_name, show_graphiql
+            )
+            return metrics.finish_result(request_metrics, result)
+
+    def run_graphql_request(
+        self, request, query, variables, operation_name, show_graphiql
+    ):
+        # Igual que GraphQLView.execute_graphql_request, pero el análisis, la validación
+        # y el costo del documento se toman de la cache, al igual que las respuestas
+        # de las consultas de eventos
+        result, document, response_cache = self.prepare_operation(
+            request, query, variables, operation_name, show_graphiql
+        )
+        if document is None:
+            return result
+
+        schema = self.schema.graphql_schema
+        operation_ast = get_operation_ast(document, operation_name)
+        try:
+            execute_options = self.get_execute_options(
+                request, variables, operation_name
+            )
+
+            if (
+                operation_ast is not None
+                and operation_ast.operation == OperationType.MUTATION
+                and (
+                    graphene_settings.ATOMIC_MUTATIONS is True
+                    or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+                )
+            ):
+                with transaction.atomic():
+                    result = execute(schema, document, **execute_options)
+                    if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                        transaction.set_rollback(True)
+                return result
+
+            result = execute(schema, document, **execute_options)
+            if response_cache is not None and not result.errors:
+                response_cache.store(result.data)
+            return result
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+
+class AsyncGraphQLView(CachedGraphQLView):
+    """
+    Versión asíncrona de la vista para ASGI, que se usa con el esquema de
+    'ticket_manager.async_schema'. Mientras una petición espera a la base de datos,
+    el mismo worker atiende otras. No muestra GraphiQL ni acepta lotes de operaciones,
+    y las mutaciones no se envuelven en una transacción con ATOMIC_MUTATIONS.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        tracing.start(request)
+        response = await self.adispatch(request)
+        tracing.finish(request, response)
+        return response
+
+    async def adispatch(self, request):
+        try:
+            if request.method.lower() not in ("get", "post"):
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ["GET", "POST"], "GraphQL only supports GET and POST requests."
+                    )
+                )
+
+            data = self.parse_body(request)
+            result, status_code = await self.aget_response(request, data)
+            return HttpResponse(
+                status=status_code, content=result, content_type="application/json"
+            )
+
+        except HttpError as e:
+            response = e.response
+            response["Content-Type"] = "application/json"
+            response.content = self.json_encode(
+                request, {"errors": [self.format_error(e)]}
+            )
+            return response
+
+    async def aget_response(self, request, data):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = await self.aexecute_graphql_request(
+            request, data, query, variables, operation_name
+        )
+        response, status_code = self.build_response(execution_result)
+        return self.json_encode(request, response), status_code
+
+    async def aexecute_graphql_request(
+        self, request, data, query, variables, operation_name
+    ):
+        with metrics.measure_request() as request_metrics:
+            result = await self.arun_graphql_request(
+                request, query, variables, operation_name
+            )
+            return metrics.finish_result(request_metrics, result)
+
+    async def arun_graphql_request(self, request, query, variables, operation_name):
+        # La cache de respuestas puede estar en otro servidor, por eso se consulta en un hilo
+        result, document, response_cache = await sync_to_async(self.prepare_operation)(
+            request, query, variables, operation_name, False
+        )
+        if document is None:
+            return result
+
+        try:
+            result = execute(
+                self.schema.graphql_schema,
+                document,
+                **self.get_execute_options(request, variables, operation_name),
+            )
+            if isawaitable(result):
+                result = await result
+            if response_cache is not None and not result.errors:
+                await sync_to_async(response_cache.store)(result.data)
+            return result
+        except Exception as e:
+            return ExecutionResult(errors=[e])